@@ -7,6 +7,7 @@ from iceberg.core import (
     Color,
     Colors,
     Renderer,
+    RenderProfiler,
     PathStyle,
     FontStyle,
     Corner,
@@ -42,8 +43,14 @@ from iceberg.primitives import (
     Tex,
     MathTex,
     Brace,
+    compile_tex_batch,
+    compile_tex_batch_svgs,
+    prefetch_tex,
+    prefetch_tex_async,
     Typst,
     MathTypst,
+    prefetch_typst,
+    prefetch_typst_async,
     Blur,
     Opacity,
     Image,
@@ -61,6 +68,7 @@ if _MATPLOTLIB_INSTALLED:
 
 from iceberg.arrows import (
     Arrow,
+    ArrowBundle,
     ArrowHead,
     ArrowHeadStyle,
     ArrowAlignDirection,
@@ -68,8 +76,11 @@ from iceberg.arrows import (
     ArrowPath,
 )
 
-from iceberg.animation import tween, EaseType
-from iceberg.animation.scene import Playbook, Animated, Scene, Frozen
+from iceberg.animation import tween, EaseType, TweenPlan, cubic_bezier
+from iceberg.animation.scene import Playbook, Animated, Scene, Frozen, Timeline
+from iceberg.animation.encoders import VideoEncoder, PipeEncoder
+from iceberg.animation.preview import preview, PreviewServer
+from iceberg.cache import AssetCache, configure_cache, get_cache
 
 __all__ = [
     "Drawable",
@@ -78,6 +89,7 @@ __all__ = [
     "Color",
     "Colors",
     "Renderer",
+    "RenderProfiler",
     "PathStyle",
     "FontStyle",
     "Corner",
@@ -116,21 +128,38 @@ __all__ = [
     "SmoothPath",
     "MatplotlibFigure",
     "Arrow",
+    "ArrowBundle",
     "ArrowHead",
     "ArrowHeadStyle",
     "ArrowAlignDirection",
     "LabelArrow",
     "tween",
     "EaseType",
+    "TweenPlan",
+    "cubic_bezier",
     "Playbook",
     "Animated",
     "Scene",
     "Frozen",
+    "Timeline",
+    "VideoEncoder",
+    "PipeEncoder",
+    "preview",
+    "PreviewServer",
+    "AssetCache",
+    "configure_cache",
+    "get_cache",
     "ArrowPath",
     "Point",
     "CubicBezier",
     "SVGPath",
     "Brace",
+    "compile_tex_batch",
+    "compile_tex_batch_svgs",
+    "prefetch_tex",
+    "prefetch_tex_async",
+    "prefetch_typst",
+    "prefetch_typst_async",
 ]
 
 # Expose commonly used classes and enums directly in the iceberg namespace.
@@ -1 +1,3 @@
-from .tween import EaseType, tween
+from .tween import EaseType, TweenPlan, tween
+from .ease import cubic_bezier
+from .encoders import Encoder, VideoEncoder, PipeEncoder
@@ -1,20 +1,83 @@
+"""Easing functions.
+
+Every easing function accepts either a single progress value or a numpy array of
+progress values, returning an array, so that a whole timeline can be eased in one call.
+"""
+
 import math
 from enum import Enum
 
+import numpy as np
+
+# The easing functions are plain `math` functions, which are the fastest for the single
+# values that `Animated` eases on every frame. Arrays are dispatched to the numpy
+# versions below, which handle both branches of the piecewise functions at once.
+
+
+def _ease_in_out_quad_array(x):
+    x = x * 2
+    y = x - 1
+    return np.where(x < 1, x * x / 2, -(y * (y - 2) - 1) / 2)
+
+
+def _ease_in_out_cubic_array(x):
+    x = x * 2
+    y = x - 2
+    return np.where(x < 1, x * x * x / 2, (y * y * y + 2) / 2)
+
+
+def _ease_in_out_quart_array(x):
+    x = x * 2
+    y = x - 2
+    return np.where(x < 1, x * x * x * x / 2, -(y * y * y * y - 2) / 2)
+
+
+def _ease_in_out_quint_array(x):
+    x = x * 2
+    y = x - 2
+    return np.where(x < 1, x * x * x * x * x / 2, (y * y * y * y * y + 2) / 2)
+
+
+def _ease_in_out_expo_array(x):
+    x = x * 2
+    return np.where(
+        x < 1,
+        np.power(2, 10 * (x - 1)) / 2,
+        (-np.power(2, -10 * (x - 1)) + 2) / 2,
+    )
+
+
+def _ease_in_out_circ_array(x):
+    x = x * 2
+    # Clip each branch to its own domain, so the unused branch doesn't produce NaNs.
+    a = np.minimum(x, 1)
+    b = np.maximum(x, 1) - 2
+    return np.where(
+        x < 1,
+        -(np.sqrt(1 - a * a) - 1) / 2,
+        (np.sqrt(1 - b * b) + 1) / 2,
+    )
+
 
 def linear(x):
     return x
 
 
 def ease_in_sine(x):
+    if isinstance(x, np.ndarray):
+        return -np.cos(x * np.pi / 2) + 1
     return -math.cos(x * math.pi / 2) + 1
 
 
 def ease_out_sine(x):
+    if isinstance(x, np.ndarray):
+        return np.sin(x * np.pi / 2)
     return math.sin(x * math.pi / 2)
 
 
 def ease_in_out_sine(x):
+    if isinstance(x, np.ndarray):
+        return -(np.cos(np.pi * x) - 1) / 2
     return -(math.cos(math.pi * x) - 1) / 2
 
 
@@ -27,6 +90,8 @@ def ease_out_quad(x):
 
 
 def ease_in_out_quad(x):
+    if isinstance(x, np.ndarray):
+        return _ease_in_out_quad_array(x)
     x *= 2
     if x < 1:
         return x * x / 2
@@ -40,11 +105,14 @@ def ease_in_cubic(x):
 
 
 def ease_out_cubic(x):
-    x -= 1
+    # Not in place, so that arrays of the caller aren't modified.
+    x = x - 1
     return x * x * x + 1
 
 
 def ease_in_out_cubic(x):
+    if isinstance(x, np.ndarray):
+        return _ease_in_out_cubic_array(x)
     x *= 2
     if x < 1:
         return x * x * x / 2
@@ -58,11 +126,13 @@ def ease_in_quart(x):
 
 
 def ease_out_quart(x):
-    x -= 1
+    x = x - 1
     return -(x * x * x * x - 1)
 
 
 def ease_in_out_quart(x):
+    if isinstance(x, np.ndarray):
+        return _ease_in_out_quart_array(x)
     x *= 2
     if x < 1:
         return x * x * x * x / 2
@@ -76,11 +146,13 @@ def ease_in_quint(x):
 
 
 def ease_out_quint(x):
-    x -= 1
+    x = x - 1
     return x * x * x * x * x + 1
 
 
 def ease_in_out_quint(x):
+    if isinstance(x, np.ndarray):
+        return _ease_in_out_quint_array(x)
     x *= 2
     if x < 1:
         return x * x * x * x * x / 2
@@ -90,32 +162,43 @@ def ease_in_out_quint(x):
 
 
 def ease_in_expo(x):
+    if isinstance(x, np.ndarray):
+        return np.power(2, 10 * (x - 1))
     return math.pow(2, 10 * (x - 1))
 
 
 def ease_out_expo(x):
+    if isinstance(x, np.ndarray):
+        return -np.power(2, -10 * x) + 1
     return -math.pow(2, -10 * x) + 1
 
 
 def ease_in_out_expo(x):
+    if isinstance(x, np.ndarray):
+        return _ease_in_out_expo_array(x)
     x *= 2
     if x < 1:
         return math.pow(2, 10 * (x - 1)) / 2
     else:
-        x -= 1
-        return -math.pow(2, -10 * x) - 1
+        return (-math.pow(2, -10 * (x - 1)) + 2) / 2
 
 
 def ease_in_circ(x):
+    if isinstance(x, np.ndarray):
+        return 1 - np.sqrt(1 - x * x)
     return 1 - math.sqrt(1 - x * x)
 
 
 def ease_out_circ(x):
+    if isinstance(x, np.ndarray):
+        return np.sqrt(1 - (x - 1) * (x - 1))
     x -= 1
     return math.sqrt(1 - x * x)
 
 
 def ease_in_out_circ(x):
+    if isinstance(x, np.ndarray):
+        return _ease_in_out_circ_array(x)
     x *= 2
     if x < 1:
         return -(math.sqrt(1 - x * x) - 1) / 2
@@ -124,6 +207,53 @@ def ease_in_out_circ(x):
         return (math.sqrt(1 - x * x) + 1) / 2
 
 
+def cubic_bezier(
+    x1: float, y1: float, x2: float, y2: float, resolution: int = 1024
+):
+    """Create a CSS-style cubic bezier easing function.
+
+    The curve goes from (0, 0) to (1, 1) with the control points (x1, y1) and (x2, y2),
+    like the CSS `cubic-bezier()` timing function. The curve is sampled once into a
+    lookup table, so evaluating the easing function is a linear interpolation in that
+    table instead of solving for the curve parameter on every call.
+
+    Example:
+        >>> ease = cubic_bezier(0.25, 0.1, 0.25, 1.0)  # CSS `ease`.
+        >>> Animated(states, 1.0, ease_fns=ease)
+
+    Args:
+        x1: The x coordinate of the first control point, between 0 and 1.
+        y1: The y coordinate of the first control point.
+        x2: The x coordinate of the second control point, between 0 and 1.
+        y2: The y coordinate of the second control point.
+        resolution: The number of segments in the lookup table.
+
+    Returns:
+        The easing function.
+
+    Raises:
+        ValueError: If x1 or x2 are not between 0 and 1.
+    """
+
+    if not (0 <= x1 <= 1 and 0 <= x2 <= 1):
+        raise ValueError("The x coordinates of the control points must be in [0, 1].")
+
+    s = np.linspace(0, 1, resolution + 1)
+    inv = 1 - s
+
+    # Bernstein form of the curve, the end points are (0, 0) and (1, 1).
+    xs = 3 * inv * inv * s * x1 + 3 * inv * s * s * x2 + s * s * s
+    ys = 3 * inv * inv * s * y1 + 3 * inv * s * s * y2 + s * s * s
+
+    # x(s) is monotonic for control points in [0, 1], so the table can be inverted.
+    def ease(x):
+        if isinstance(x, np.ndarray):
+            return np.interp(x, xs, ys)
+        return float(np.interp(x, xs, ys))
+
+    return ease
+
+
 class EaseType(Enum):
     LINEAR = linear
     EASE_IN_SINE = ease_in_sine
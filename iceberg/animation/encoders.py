@@ -0,0 +1,220 @@
+"""Video encoders used by `Scene.render`."""
+
+import subprocess
+import sys
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Sequence
+
+import av
+import numpy as np
+
+from iceberg.core.profiler import RenderProfiler, profile_stage
+
+
+class VideoWriter(ABC):
+    """Receives the rendered frames of a single video."""
+
+    # Set by `Scene.render` to time the conversion and encoding of the frames.
+    profiler: Optional[RenderProfiler] = None
+
+    @abstractmethod
+    def write(self, pixels: np.ndarray) -> None:
+        """Write a frame.
+
+        Args:
+            pixels: The RGBA pixels of the frame as a (height, width, 4) uint8 array.
+        """
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        """Flush the remaining frames and close the video."""
+        pass
+
+
+class Encoder(ABC):
+    """Base class for the video encoders that `Scene.render` can use."""
+
+    # Whether the encoder writes a video file that can be remuxed by chunked rendering.
+    writes_container = False
+
+    @abstractmethod
+    def open(self, filename: str, width: int, height: int, fps: float) -> VideoWriter:
+        """Start encoding a video.
+
+        Args:
+            filename: The filename of the video.
+            width: The width of the frames.
+            height: The height of the frames.
+            fps: The frames per second.
+
+        Returns:
+            The writer to send the frames to.
+        """
+        pass
+
+
+class _PyAVWriter(VideoWriter):
+    def __init__(
+        self,
+        encoder: "VideoEncoder",
+        filename: str,
+        width: int,
+        height: int,
+        fps: float,
+    ):
+        options = dict(encoder.options)
+        if encoder.crf is not None:
+            options["crf"] = str(encoder.crf)
+        if encoder.preset is not None:
+            options["preset"] = encoder.preset
+
+        self._container = av.open(filename, mode="w")
+        self._stream = self._container.add_stream(
+            encoder.codec, rate=fps, options=options
+        )
+        self._stream.width = width
+        self._stream.height = height
+        self._stream.pix_fmt = encoder.pix_fmt
+
+        if encoder.bit_rate is not None:
+            self._stream.bit_rate = encoder.bit_rate
+        if encoder.threads is not None:
+            self._stream.codec_context.thread_count = encoder.threads
+
+    def write(self, pixels: np.ndarray) -> None:
+        # The RGBA frame is converted to the stream's pixel format by the encoder in a
+        # single pass, the alpha channel is dropped.
+        with profile_stage(self.profiler, "convert"):
+            frame = av.VideoFrame.from_ndarray(pixels, format="rgba")
+
+        with profile_stage(self.profiler, "encode"):
+            for packet in self._stream.encode(frame):
+                self._container.mux(packet)
+
+    def close(self) -> None:
+        with profile_stage(self.profiler, "encode"):
+            # Flush stream
+            for packet in self._stream.encode():
+                self._container.mux(packet)
+            self._container.close()
+
+
+class VideoEncoder(Encoder):
+    """Encode videos in-process with PyAV (FFmpeg)."""
+
+    writes_container = True
+
+    def __init__(
+        self,
+        codec: str = "libx264",
+        crf: Optional[int] = None,
+        bit_rate: Optional[int] = None,
+        preset: Optional[str] = None,
+        threads: Optional[int] = None,
+        pix_fmt: str = "yuv420p",
+        options: Optional[Dict[str, str]] = None,
+    ):
+        """Encode videos in-process with PyAV (FFmpeg).
+
+        Args:
+            codec: The FFmpeg codec to use, e.g. "libx264", "libx265" or "libvpx-vp9".
+            crf: The constant rate factor, lower is better quality. Codec default if None.
+            bit_rate: The target bit rate in bits per second. Codec default if None.
+            preset: The codec preset, e.g. "ultrafast" to "veryslow" for libx264.
+            threads: The number of encoding threads, 0 lets the codec decide.
+            pix_fmt: The pixel format of the encoded video.
+            options: Any other codec options, passed to FFmpeg as-is.
+        """
+
+        self.codec = codec
+        self.crf = crf
+        self.bit_rate = bit_rate
+        self.preset = preset
+        self.threads = threads
+        self.pix_fmt = pix_fmt
+        self.options = options or {}
+
+    @classmethod
+    def preview(cls) -> "VideoEncoder":
+        """A fast, lower quality encoder for previews."""
+
+        return cls(preset="ultrafast", crf=28, threads=0)
+
+    def open(self, filename: str, width: int, height: int, fps: float) -> VideoWriter:
+        return _PyAVWriter(self, filename, width, height, fps)
+
+
+class _PipeWriter(VideoWriter):
+    def __init__(self, encoder: "PipeEncoder", stream, process=None):
+        self._encoder = encoder
+        self._stream = stream
+        self._process = process
+
+    def write(self, pixels: np.ndarray) -> None:
+        with profile_stage(self.profiler, "convert"):
+            if self._encoder.pix_fmt == "rgb24":
+                pixels = pixels[:, :, :3]
+            data = np.ascontiguousarray(pixels).data
+
+        with profile_stage(self.profiler, "encode"):
+            self._stream.write(data)
+
+    def close(self) -> None:
+        with profile_stage(self.profiler, "encode"):
+            self._stream.flush()
+
+        if self._process is None:
+            return
+
+        self._stream.close()
+        if self._process.wait() != 0:
+            raise RuntimeError(
+                f"Encoder process exited with code {self._process.returncode}."
+            )
+
+
+class PipeEncoder(Encoder):
+    """Stream raw frames to an external encoder process, or to stdout."""
+
+    def __init__(self, command: Optional[Sequence[str]] = None, pix_fmt: str = "rgba"):
+        """Stream raw frames to an external encoder process, or to stdout.
+
+        The arguments of the command can contain the placeholders `{filename}`,
+        `{width}`, `{height}`, `{fps}` and `{pix_fmt}`.
+
+        Example:
+            >>> PipeEncoder([
+            >>>     "ffmpeg", "-y", "-f", "rawvideo", "-pix_fmt", "{pix_fmt}",
+            >>>     "-s", "{width}x{height}", "-r", "{fps}", "-i", "-",
+            >>>     "-c:v", "libx264", "-preset", "fast", "{filename}",
+            >>> ])
+
+        Args:
+            command: The command of the encoder process, which reads frames from its
+                stdin. If None, the raw frames are written to stdout.
+            pix_fmt: The pixel format of the raw frames, either "rgba" or "rgb24".
+        """
+
+        if pix_fmt not in ("rgba", "rgb24"):
+            raise ValueError(f"Unsupported raw pixel format: {pix_fmt}.")
+
+        self.command = command
+        self.pix_fmt = pix_fmt
+
+    def open(self, filename: str, width: int, height: int, fps: float) -> VideoWriter:
+        if self.command is None:
+            return _PipeWriter(self, sys.stdout.buffer)
+
+        command = [
+            argument.format(
+                filename=filename,
+                width=width,
+                height=height,
+                fps=fps,
+                pix_fmt=self.pix_fmt,
+            )
+            for argument in self.command
+        ]
+        process = subprocess.Popen(command, stdin=subprocess.PIPE)
+        return _PipeWriter(self, process.stdin, process)
@@ -0,0 +1,348 @@
+"""A local HTTP server to preview scenes while iterating on them."""
+
+import collections
+import http.server
+import io
+import json
+import threading
+import time
+import urllib.parse
+import webbrowser
+from typing import Optional, Union
+
+from absl import logging
+from PIL import Image
+
+from iceberg import Renderer
+from iceberg.animation.scene import Playbook, Scene
+
+_MJPEG_BOUNDARY = "icebergframe"
+
+_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>iceberg preview</title>
+<style>
+  body { background: #1e1e1e; color: #ddd; font-family: sans-serif; margin: 20px; }
+  #frame { max-width: 100%; background: #333; display: block; margin-bottom: 10px; }
+  #scrub { width: 100%; }
+</style>
+</head>
+<body>
+<img id="frame">
+<input id="scrub" type="range" min="0" value="0" step="1">
+<button id="play">Play</button> <span id="time"></span>
+<script>
+const frame = document.getElementById("frame");
+const scrub = document.getElementById("scrub");
+const play = document.getElementById("play");
+const label = document.getElementById("time");
+let info = null;
+let playing = false;
+
+function show(index) {
+  label.textContent = (index / info.fps).toFixed(2) + "s / " + info.duration.toFixed(2) + "s";
+  frame.src = "/frame?index=" + index;
+}
+
+fetch("/info").then(r => r.json()).then(data => {
+  info = data;
+  scrub.max = info.frames - 1;
+  show(0);
+});
+
+scrub.addEventListener("input", () => {
+  if (playing) { playing = false; play.textContent = "Play"; }
+  show(scrub.value);
+});
+
+play.addEventListener("click", () => {
+  playing = !playing;
+  play.textContent = playing ? "Pause" : "Play";
+  if (playing) {
+    frame.src = "/stream?index=" + scrub.value;
+  } else {
+    show(scrub.value);
+  }
+});
+</script>
+</body>
+</html>
+"""
+
+
+class PreviewServer(object):
+    """A local HTTP server that renders the frames of a scene on demand.
+
+    Frames are rendered at the requested scrub position only, kept in an LRU cache
+    and prefetched ahead of the playhead by a background worker. Playback is streamed
+    as MJPEG.
+    """
+
+    def __init__(
+        self,
+        scene: Union[Scene, Playbook],
+        fps: int = 30,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        cache_size: int = 512,
+        prefetch: int = 30,
+        jpeg_quality: int = 85,
+        renderer: Renderer = None,
+    ):
+        """A local HTTP server that renders the frames of a scene on demand.
+
+        Args:
+            scene: The scene or playbook to preview.
+            fps: The frames per second of the preview.
+            host: The host to listen on.
+            port: The port to listen on, 0 picks a free port.
+            cache_size: The maximum number of rendered frames to keep in memory.
+            prefetch: The number of frames to render ahead of the playhead.
+            jpeg_quality: The JPEG quality of the frames, between 1 and 95.
+            renderer: The renderer to use. If not specified, a default renderer is used.
+        """
+
+        if isinstance(scene, Playbook):
+            scene = scene.combined_scene
+
+        self._scene = scene
+        self._fps = fps
+        self._total_frames = max(1, int(fps * scene.duration))
+        self._cache_size = cache_size
+        self._prefetch = prefetch
+        self._jpeg_quality = jpeg_quality
+        self._renderer = renderer or Renderer()
+        self._bounds = None
+
+        # Rendering goes through a single renderer, so it is serialized by this lock.
+        self._render_lock = threading.Lock()
+        self._cache_lock = threading.Lock()
+        self._cache = collections.OrderedDict()
+
+        self._playhead = 0
+        self._playhead_changed = threading.Event()
+        self._stopped = threading.Event()
+
+        self._server = http.server.ThreadingHTTPServer((host, port), _make_handler(self))
+        self._server.daemon_threads = True
+        self._server_thread = None
+        self._prefetch_thread = None
+
+    @property
+    def url(self) -> str:
+        """The URL of the preview page."""
+
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    @property
+    def fps(self) -> int:
+        return self._fps
+
+    @property
+    def total_frames(self) -> int:
+        return self._total_frames
+
+    def start(self) -> "PreviewServer":
+        """Start serving in background threads."""
+
+        self._server_thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True
+        )
+        self._server_thread.start()
+
+        self._prefetch_thread = threading.Thread(target=self._prefetch_loop, daemon=True)
+        self._prefetch_thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the server and the prefetch worker."""
+
+        self._stopped.set()
+        self._playhead_changed.set()
+        self._server.shutdown()
+        self._server.server_close()
+
+    def frame(self, index: int) -> bytes:
+        """Get a frame as JPEG, rendering it if it is not cached.
+
+        Args:
+            index: The index of the frame.
+
+        Returns:
+            The JPEG encoded frame.
+        """
+
+        index = min(max(index, 0), self._total_frames - 1)
+        self._move_playhead(index)
+
+        cached = self._cached_frame(index)
+        if cached is not None:
+            return cached
+
+        return self._render_frame(index)
+
+    def _cached_frame(self, index: int) -> Optional[bytes]:
+        with self._cache_lock:
+            if index in self._cache:
+                self._cache.move_to_end(index)
+                return self._cache[index]
+        return None
+
+    def _render_frame(self, index: int) -> bytes:
+        with self._render_lock:
+            # Another thread may have rendered it while we were waiting.
+            cached = self._cached_frame(index)
+            if cached is not None:
+                return cached
+
+            if self._bounds is None:
+                self._bounds = self._scene.render_bounds()
+
+            pixels = self._scene.render_frame(
+                index / self._fps, self._bounds, self._renderer
+            )
+
+        image = Image.fromarray(pixels, mode="RGBA").convert("RGB")
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG", quality=self._jpeg_quality)
+        jpeg = buffer.getvalue()
+
+        with self._cache_lock:
+            self._cache[index] = jpeg
+            self._cache.move_to_end(index)
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+
+        return jpeg
+
+    def _move_playhead(self, index: int) -> None:
+        self._playhead = index
+        self._playhead_changed.set()
+
+    def _prefetch_loop(self) -> None:
+        while not self._stopped.is_set():
+            self._playhead_changed.wait()
+            self._playhead_changed.clear()
+
+            playhead = self._playhead
+            for offset in range(1, self._prefetch + 1):
+                # Start over as soon as the playhead moves.
+                if self._stopped.is_set() or self._playhead_changed.is_set():
+                    break
+
+                index = (playhead + offset) % self._total_frames
+                if self._cached_frame(index) is None:
+                    self._render_frame(index)
+
+
+def _make_handler(server: PreviewServer):
+    class _Handler(http.server.BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, content_type: str, body: bytes) -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Cache-Control", "no-store")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _frame_index(self, query) -> int:
+            if "index" in query:
+                return int(query["index"][0])
+            if "t" in query:
+                return int(float(query["t"][0]) * server.fps)
+            return 0
+
+        def do_GET(self):
+            url = urllib.parse.urlparse(self.path)
+            query = urllib.parse.parse_qs(url.query)
+
+            if url.path == "/":
+                self._send("text/html; charset=utf-8", _PAGE.encode("utf-8"))
+            elif url.path == "/info":
+                info = {
+                    "fps": server.fps,
+                    "frames": server.total_frames,
+                    "duration": server.total_frames / server.fps,
+                }
+                self._send("application/json", json.dumps(info).encode("utf-8"))
+            elif url.path == "/frame":
+                self._send("image/jpeg", server.frame(self._frame_index(query)))
+            elif url.path == "/stream":
+                self._stream(self._frame_index(query))
+            else:
+                self.send_error(404)
+
+        def _stream(self, index: int) -> None:
+            self.send_response(200)
+            self.send_header(
+                "Content-Type",
+                f"multipart/x-mixed-replace; boundary={_MJPEG_BOUNDARY}",
+            )
+            self.send_header("Cache-Control", "no-store")
+            self.end_headers()
+
+            frame_duration = 1 / server.fps
+            next_frame_time = time.monotonic()
+
+            try:
+                while True:
+                    jpeg = server.frame(index)
+                    self.wfile.write(
+                        (
+                            f"--{_MJPEG_BOUNDARY}\r\n"
+                            "Content-Type: image/jpeg\r\n"
+                            f"Content-Length: {len(jpeg)}\r\n\r\n"
+                        ).encode("ascii")
+                    )
+                    self.wfile.write(jpeg)
+                    self.wfile.write(b"\r\n")
+
+                    index = (index + 1) % server.total_frames
+
+                    # Play in real time, unless rendering can't keep up.
+                    next_frame_time += frame_duration
+                    time.sleep(max(0, next_frame_time - time.monotonic()))
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+    return _Handler
+
+
+def preview(
+    scene: Union[Scene, Playbook],
+    fps: int = 30,
+    port: int = 0,
+    open_browser: bool = True,
+    **kwargs,
+) -> PreviewServer:
+    """Preview a scene in the browser, with timeline scrubbing.
+
+    Starts a local HTTP server in the background and returns immediately. Frames are
+    only rendered when they are requested, so the first frame shows up without
+    rendering the whole video. Call `stop()` on the returned server when done.
+
+    Args:
+        scene: The scene or playbook to preview.
+        fps: The frames per second of the preview.
+        port: The port to listen on, 0 picks a free port.
+        open_browser: Whether to open the preview page in the browser.
+        kwargs: Other arguments passed to `PreviewServer`.
+
+    Returns:
+        The running preview server.
+    """
+
+    server = PreviewServer(scene, fps=fps, port=port, **kwargs).start()
+
+    if open_browser:
+        webbrowser.open(server.url)
+    else:
+        logging.info(f"Previewing at {server.url}")
+
+    return server
@@ -1,5 +1,9 @@
+import bisect
+import json
+import os
+import weakref
 from abc import ABC, abstractmethod
-from typing import Callable, Sequence, Union
+from typing import Callable, List, Sequence, Tuple, Union
 
 import av
 import numpy as np
@@ -8,8 +12,11 @@ from absl import logging
 from PIL import Image
 
 from iceberg import Drawable, DrawableWithChild, Renderer
-from iceberg.animation import EaseType, tween
+from iceberg.animation import EaseType, TweenPlan
+from iceberg.animation.encoders import Encoder, VideoEncoder
 from iceberg.core import Bounds, dont_animate
+from iceberg.core.profiler import RenderProfiler, profile_stage
+from iceberg.primitives.latex import build_with_tex_batch
 
 
 class Animated(Drawable):
@@ -78,6 +85,7 @@ class Animated(Drawable):
         ), "Every pair of states must have an ease."
 
         self._states = self.states
+        self._plans = [None] * len(self._durations)
         self._total_duration = sum(self._durations) + self.start_time
         self._start_time = self.start_time
         self.cursor = 0
@@ -110,11 +118,12 @@ class Animated(Drawable):
                 break
             time_so_far += duration
 
-        # Animate between the states.
+        # Animate between the states, compiling the tween plan on first use.
+        if self._plans[i] is None:
+            self._plans[i] = TweenPlan(self._states[i], self._states[i + 1])
+
         progress = (t - time_so_far) / duration
-        return tween(
-            self._states[i], self._states[i + 1], progress, ease_fn=self._ease_fns[i]
-        )
+        return self._plans[i](self._ease_fns[i](progress))
 
     @property
     def bounds(self) -> Bounds:
@@ -129,6 +138,9 @@ class Animated(Drawable):
         drawable.set_time(self._time)
         drawable.draw(canvas)
 
+    def at(self, t: float) -> Drawable:
+        return self._get_drawable_at_t(t).at(t)
+
     def frozen(self, t: float = None):
         """Get a frozen version of this drawable at time t.
 
@@ -145,21 +157,50 @@ class Animated(Drawable):
         return self._get_drawable_at_t(t)
 
 
+# Durations found by `_get_drawable_duration`, keyed by the id of the drawable. The
+# entries hold a weak reference to the drawable, so they disappear together with it.
+_duration_cache = {}
+
+
+def _find_animated(drawable: Drawable, found: List["Animated"]) -> None:
+    if isinstance(drawable, Animated):
+        found.append(drawable)
+
+    for child in drawable.children:
+        # Static subtrees can't contain any animation.
+        if child.is_time_dependent:
+            _find_animated(child, found)
+
+
 def _get_drawable_duration(drawable: Drawable) -> float:
     """Gets the duration of a drawable by finding the longest duration of any animated drawable.
 
+    The duration is cached for each drawable, so it is only computed once.
+
     Args:
         drawable: The drawable to find the duration of.
 
     Returns:
         The duration of the drawable.
     """
+
+    key = id(drawable)
+    entry = _duration_cache.get(key)
+    if entry is not None and entry[0]() is drawable:
+        return entry[1]
+
+    current_animated: List[Animated] = []
+    if drawable.is_time_dependent:
+        _find_animated(drawable, current_animated)
+
     duration = 0
-    current_animated: Sequence[Animated] = drawable.find_all(
-        lambda d: isinstance(d, Animated)
-    )
     for animated in current_animated:
         duration = max(duration, animated.total_duration)
+
+    def _evict(_, key=key):
+        _duration_cache.pop(key, None)
+
+    _duration_cache[key] = (weakref.ref(drawable, _evict), duration)
     return duration
 
 
@@ -180,22 +221,86 @@ class Frozen(DrawableWithChild):
         if self.__t is None:
             self.__t = _get_drawable_duration(self.child)
 
-    def _time_freeze(self):
-        self.child.set_time(self.__t)
+        # Resolved lazily on first access, then reused for every frame.
+        self.__frozen = None
+
+    @property
+    def frozen(self) -> Drawable:
+        """The static drawable tree of the child at the frozen time."""
+
+        if self.__frozen is None:
+            self.__frozen = self.child.at(self.__t)
+        return self.__frozen
+
+    def set_time(self, t: float):
+        # The frozen tree doesn't depend on the time of the scene.
+        self._time = t
+
+    def at(self, t: float) -> Drawable:
+        return self.frozen
 
     @property
     def bounds(self) -> Bounds:
-        self._time_freeze()
-        return self.child.bounds
+        return self.frozen.bounds
 
     @property
     def children(self) -> Sequence[Drawable]:
-        self._time_freeze()
-        return self.child.children
+        return self.frozen.children
 
     def draw(self, canvas):
-        self._time_freeze()
-        self.child.draw(canvas)
+        self.frozen.draw(canvas)
+
+
+def _write_json_atomic(filename: str, data) -> None:
+    temp_filename = filename + ".tmp"
+    with open(temp_filename, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(temp_filename, filename)
+
+
+def _add_stream_from_template(container, template):
+    # The template API was renamed in newer versions of PyAV.
+    if hasattr(container, "add_stream_from_template"):
+        return container.add_stream_from_template(template)
+    return container.add_stream(template=template)
+
+
+def _concat_videos(
+    filenames: Sequence[str], durations: Sequence[float], filename: str
+) -> None:
+    """Concatenate videos encoded with the same settings, without re-encoding them.
+
+    Args:
+        filenames: The videos to concatenate, in order.
+        durations: The duration of each video in seconds.
+        filename: The filename to write the concatenated video to.
+    """
+
+    output = av.open(filename, mode="w")
+    output_stream = None
+    offset = 0.0
+
+    for segment_filename, duration in zip(filenames, durations):
+        with av.open(segment_filename) as segment:
+            segment_stream = segment.streams.video[0]
+
+            if output_stream is None:
+                output_stream = _add_stream_from_template(output, segment_stream)
+
+            for packet in segment.demux(segment_stream):
+                # Skip the empty packets used to signal the end of the stream.
+                if packet.dts is None:
+                    continue
+
+                shift = int(round(offset / packet.time_base))
+                packet.pts += shift
+                packet.dts += shift
+                packet.stream = output_stream
+                output.mux(packet)
+
+            offset += duration
+
+    output.close()
 
 
 class Scene(object):
@@ -230,13 +335,7 @@ class Scene(object):
     def __add__(self, other: "Scene") -> "Scene":
         """Concatenates two scenes together."""
 
-        def _make_frame(t: float) -> Drawable:
-            if t < self.duration:
-                return self.make_frame(t)
-            else:
-                return other.make_frame(t - self.duration)
-
-        return Scene(self.duration + other.duration, _make_frame)
+        return Timeline([self, other])
 
     def concat(self, scene: "Scene") -> "Scene":
         """Concatenates two scenes together."""
@@ -256,14 +355,36 @@ class Scene(object):
         renderer: Renderer = None,
         fps: int = 60,
         progress_bar: bool = True,
+        frame_range: Tuple[int, int] = None,
+        chunk_duration: float = None,
+        encoder: Encoder = None,
+        profiler: RenderProfiler = None,
     ) -> None:
         """Renders the scene to a file.
 
+        In chunked mode (when `chunk_duration` is set), the video is rendered into
+        fixed-length segment files in the `<filename>.chunks` directory, alongside a
+        manifest of the completed segments. Rendering again skips segments that were
+        already completed, so a crashed render resumes where it stopped. Once every
+        segment exists, they are concatenated into `filename` without re-encoding.
+
         Args:
             filename: The filename to render to.
             renderer: The renderer to use. If not specified, a default renderer will be used.
             fps: The frames per second to render at.
             progress_bar: Whether to show a progress bar while rendering.
+            frame_range: The range of frames `(start, end)` to render, end excluded. If not
+                specified, all frames are rendered. In chunked mode, only the segments
+                overlapping this range are rendered, and they are always re-rendered,
+                which is useful to update only the edited part of a long video.
+            chunk_duration: If specified, render in chunked mode with segments of this
+                duration in seconds. Not supported for GIFs.
+            encoder: The video encoder to use, e.g. `VideoEncoder.preview()` for fast
+                previews or a `PipeEncoder` to stream raw frames to another process. If
+                not specified, libx264 with its default settings is used. Not supported
+                for GIFs, which are always written with Pillow.
+            profiler: If specified, the time spent in each stage of rendering every frame
+                is recorded with this profiler, see `RenderProfiler`.
         """
         _IS_GIF = False
 
@@ -280,68 +401,273 @@ class Scene(object):
 
         total_frames = int(fps * self.duration)
 
+        if frame_range is not None:
+            start_frame, end_frame = frame_range
+            if not 0 <= start_frame <= end_frame <= total_frames:
+                raise ValueError(
+                    f"Invalid frame range {frame_range} for a scene with {total_frames} frames."
+                )
+
         if renderer is None:
             renderer = Renderer()
 
-        bounds = None
+        if _IS_GIF and encoder is not None:
+            raise ValueError("Video encoders are not supported for GIFs.")
 
-        pil_images = []
-        container = None
-        stream = None
+        if encoder is None:
+            encoder = VideoEncoder()
 
-        if not _IS_GIF:
-            container = av.open(filename, mode="w")
-            stream = container.add_stream("libx264", rate=fps)
-
-        for frame_index in tqdm.trange(total_frames, disable=not progress_bar):
-            t = frame_index / fps
-            frame_drawable = self.make_frame(t)
+        if chunk_duration is not None:
+            if _IS_GIF:
+                raise ValueError("Chunked rendering is not supported for GIFs.")
 
-            if bounds is None:
-                bounds = frame_drawable.bounds.round()
+            if not encoder.writes_container:
+                raise ValueError(
+                    f"Chunked rendering is not supported with {type(encoder).__name__}."
+                )
 
-                if not _IS_GIF:
-                    # Force width to be a multiple of 2
-                    if bounds.width % 2 != 0:
-                        bounds = Bounds(
-                            top=bounds.top,
-                            left=bounds.left,
-                            size=(bounds.width - 1, bounds.height),
-                        )
+        # The stages are timed through the renderer, which every frame goes through.
+        with renderer.use_profiler(profiler):
+            if chunk_duration is not None:
+                self._render_chunked(
+                    filename,
+                    encoder,
+                    renderer,
+                    fps,
+                    progress_bar,
+                    total_frames,
+                    frame_range,
+                    chunk_duration,
+                )
+                return
 
-                    stream.width = bounds.width
-                    stream.height = bounds.height
+            if frame_range is None:
+                frame_range = (0, total_frames)
 
-            frame_drawable = frame_drawable.crop(bounds)
-            renderer.render(frame_drawable)
-            frame_pixels = renderer.get_rendered_image()
+            bounds = self.render_bounds(force_even_width=not _IS_GIF)
+            frame_indices = range(*frame_range)
 
             if not _IS_GIF:
-                frame_pixels = np.round(frame_pixels[:, :, :3]).astype(np.uint8)
-                frame = av.VideoFrame.from_ndarray(frame_pixels, format="rgb24")
-                for packet in stream.encode(frame):
-                    container.mux(packet)
+                with tqdm.tqdm(
+                    total=len(frame_indices), disable=not progress_bar
+                ) as pbar:
+                    self._encode_video(
+                        filename,
+                        encoder,
+                        frame_indices,
+                        fps,
+                        bounds,
+                        renderer,
+                        pbar.update,
+                    )
+                return
+
+            pil_images = []
+            profiler = renderer.profiler
+
+            for frame_index in tqdm.tqdm(frame_indices, disable=not progress_bar):
+                if profiler is not None:
+                    profiler.begin_frame(frame_index)
+
+                frame_pixels = self.render_frame(frame_index / fps, bounds, renderer)
+                with profile_stage(profiler, "convert"):
+                    pil_images.append(Image.fromarray(frame_pixels, mode="RGBA"))
+
+                if profiler is not None:
+                    profiler.end_frame()
 
-            if _IS_GIF:
-                pil_images.append(Image.fromarray(frame_pixels, mode="RGBA"))
+            assert len(pil_images) > 1, "No frames were rendered."
+            with profile_stage(profiler, "encode"):
+                pil_images[0].save(
+                    filename,
+                    save_all=True,
+                    append_images=pil_images[1:],
+                    duration=1000 // fps,
+                    loop=0,
+                    disposal=2,
+                )
 
-        if not _IS_GIF:
-            # Flush stream
-            for packet in stream.encode():
-                container.mux(packet)
-            container.close()
+    def render_bounds(self, force_even_width: bool = False) -> Bounds:
+        """The bounds of every rendered frame, taken from the first frame.
 
-        if _IS_GIF:
-            assert len(pil_images) > 1, "No frames were rendered."
-            pil_images[0].save(
-                filename,
-                save_all=True,
-                append_images=pil_images[1:],
-                duration=1000 // fps,
-                loop=0,
-                disposal=2,
+        Args:
+            force_even_width: Whether to shrink the bounds to an even width, which most
+                video codecs require.
+
+        Returns:
+            The bounds of the frames.
+        """
+
+        bounds = self.make_frame(0).bounds.round()
+
+        # Force width to be a multiple of 2
+        if force_even_width and bounds.width % 2 != 0:
+            bounds = Bounds(
+                top=bounds.top,
+                left=bounds.left,
+                size=(bounds.width - 1, bounds.height),
             )
 
+        return bounds
+
+    def render_frame(
+        self, t: float, bounds: Bounds = None, renderer: Renderer = None
+    ) -> np.ndarray:
+        """Renders the frame at time t to pixels.
+
+        Args:
+            t: The time in seconds.
+            bounds: The bounds to crop the frame to. If not specified, the bounds of the
+                first frame are used, see `render_bounds`.
+            renderer: The renderer to use. If not specified, a default renderer will be used.
+
+        Returns:
+            The RGBA pixels of the frame.
+        """
+
+        if bounds is None:
+            bounds = self.render_bounds()
+
+        if renderer is None:
+            renderer = Renderer()
+
+        with profile_stage(renderer.profiler, "make_frame"):
+            frame_drawable = self.make_frame(t).crop(bounds)
+        renderer.render(frame_drawable)
+        return renderer.get_rendered_image()
+
+    def _encode_video(
+        self,
+        filename: str,
+        encoder: Encoder,
+        frame_indices: Sequence[int],
+        fps: int,
+        bounds: Bounds,
+        renderer: Renderer,
+        on_frame: Callable[[], None] = None,
+    ) -> None:
+        """Encode the given frames into a single video."""
+
+        profiler = renderer.profiler
+        writer = encoder.open(filename, bounds.width, bounds.height, fps)
+        writer.profiler = profiler
+
+        for frame_index in frame_indices:
+            if profiler is not None:
+                profiler.begin_frame(frame_index)
+
+            writer.write(
+                self.render_frame(frame_index / fps, bounds, renderer)
+            )
+
+            if profiler is not None:
+                profiler.end_frame()
+
+            if on_frame is not None:
+                on_frame()
+
+        writer.close()
+
+    def _render_chunked(
+        self,
+        filename: str,
+        encoder: Encoder,
+        renderer: Renderer,
+        fps: int,
+        progress_bar: bool,
+        total_frames: int,
+        frame_range: Tuple[int, int],
+        chunk_duration: float,
+    ) -> None:
+        bounds = self.render_bounds(force_even_width=True)
+        chunk_frames = max(1, int(round(chunk_duration * fps)))
+
+        chunk_directory = filename + ".chunks"
+        os.makedirs(chunk_directory, exist_ok=True)
+        manifest_filename = os.path.join(chunk_directory, "manifest.json")
+
+        # Segments rendered with different settings can't be reused.
+        config = {
+            "fps": fps,
+            "total_frames": total_frames,
+            "chunk_frames": chunk_frames,
+            "width": bounds.width,
+            "height": bounds.height,
+        }
+        manifest = {"config": config, "segments": {}}
+
+        if os.path.exists(manifest_filename):
+            with open(manifest_filename, "r") as f:
+                previous_manifest = json.load(f)
+
+            if previous_manifest["config"] == config:
+                manifest = previous_manifest
+            else:
+                logging.warning(
+                    f"Render settings changed since {manifest_filename} was written, "
+                    "rendering all segments again."
+                )
+
+        def _segment_filename(name: str) -> str:
+            return os.path.join(chunk_directory, name)
+
+        segments = []
+        manifest_ranges = []
+        to_render = []
+
+        for index, start in enumerate(range(0, total_frames, chunk_frames)):
+            end = min(start + chunk_frames, total_frames)
+            name = f"segment_{index:05d}.mp4"
+            segments.append(name)
+            manifest_ranges.append((start, end))
+
+            if frame_range is not None:
+                if start < frame_range[1] and end > frame_range[0]:
+                    to_render.append((name, start, end))
+            elif name not in manifest["segments"] or not os.path.exists(
+                _segment_filename(name)
+            ):
+                to_render.append((name, start, end))
+
+        total_to_render = sum(end - start for _, start, end in to_render)
+
+        with tqdm.tqdm(total=total_to_render, disable=not progress_bar) as pbar:
+            for name, start, end in to_render:
+                # Write to a temporary file first, so that a crash never leaves a
+                # partially written segment behind.
+                temp_filename = _segment_filename("incomplete_" + name)
+                self._encode_video(
+                    temp_filename,
+                    encoder,
+                    range(start, end),
+                    fps,
+                    bounds,
+                    renderer,
+                    pbar.update,
+                )
+                os.replace(temp_filename, _segment_filename(name))
+
+                manifest["segments"][name] = [start, end]
+                _write_json_atomic(manifest_filename, manifest)
+
+        missing = [
+            name
+            for name in segments
+            if name not in manifest["segments"]
+            or not os.path.exists(_segment_filename(name))
+        ]
+        if missing:
+            logging.info(
+                f"{len(missing)} segments are not rendered yet, not writing {filename}."
+            )
+            return
+
+        _concat_videos(
+            [_segment_filename(name) for name in segments],
+            [(end - start) / fps for start, end in manifest_ranges],
+            filename,
+        )
+
     def ipython_display(
         self, fps: int = 60, loop: bool = True, display_format: str = "mp4"
     ) -> None:
@@ -371,6 +697,66 @@ class Scene(object):
             display(HTML(f'<img src="data:image/gif;base64,{b64}" />'))
 
 
+class Timeline(Scene):
+    """A flat sequence of scenes played one after the other.
+
+    Concatenating scenes with `+` creates a timeline. Timelines never nest: adding
+    timelines together splices their segments into a single flat list, and a frame
+    is looked up with a binary search over the segment start times. Evaluating a frame
+    therefore costs O(log N) for N scenes, however the timeline was built.
+    """
+
+    def __init__(self, scenes: Sequence[Scene]):
+        """A flat sequence of scenes played one after the other.
+
+        Args:
+            scenes: The scenes to play in order. Timelines in this sequence are
+                flattened into their segments.
+        """
+
+        self._scenes = []
+        for scene in scenes:
+            if isinstance(scene, Timeline):
+                self._scenes.extend(scene._scenes)
+            else:
+                self._scenes.append(scene)
+
+        assert len(self._scenes) > 0, "A timeline needs at least one scene."
+
+        self._start_times = []
+        duration = 0
+        for scene in self._scenes:
+            self._start_times.append(duration)
+            duration += scene.duration
+
+        super().__init__(duration, self.make_frame)
+
+    @property
+    def segments(self) -> Sequence[Tuple[float, Scene]]:
+        """The (start_time, scene) segments of the timeline."""
+
+        return list(zip(self._start_times, self._scenes))
+
+    def make_frame(self, t: float) -> Drawable:
+        """Returns the drawable at time t."""
+
+        # Find the last segment starting at or before t. Times before the start or after
+        # the end are passed to the first or last scene respectively.
+        index = bisect.bisect_right(self._start_times, t) - 1
+        index = min(max(index, 0), len(self._scenes) - 1)
+        return self._scenes[index].make_frame(t - self._start_times[index])
+
+    def freeze(self, duration: float) -> Scene:
+        """Freezes the last frame of the timeline for a given duration."""
+
+        return self._scenes[-1].freeze(duration)
+
+    def reverse(self) -> "Timeline":
+        """Reverses the timeline."""
+
+        return Timeline([scene.reverse() for scene in reversed(self._scenes)])
+
+
 class Playbook(ABC):
     """A playbook is an easy way to create linear animations.
 
@@ -378,11 +764,25 @@ class Playbook(ABC):
     to the timeline. Users must implement the timeline method to create a linear sequence of
     """
 
-    def __init__(self) -> None:
-        self._cursor = 0
-        self._scenes = []
+    def __init__(self, batch_tex: bool = False) -> None:
+        """Builds the timeline of the playbook.
 
-        self.timeline()
+        Args:
+            batch_tex: Whether to compile all the LaTeX of the timeline at once, instead
+                of one expression at a time. The timeline is then dry-run first, with
+                placeholders for the expressions, so `timeline` is called twice and must
+                work with the placeholders, see `build_with_tex_batch`.
+        """
+
+        def _build_timeline():
+            self._cursor = 0
+            self._scenes = []
+            self.timeline()
+
+        if batch_tex:
+            build_with_tex_batch(_build_timeline)
+        else:
+            _build_timeline()
 
     @property
     def combined_scene(self) -> Scene:
@@ -390,28 +790,21 @@ class Playbook(ABC):
 
         assert len(self._scenes) > 0, "No scenes have been added to the playbook."
 
-        # Add all the scenes together.
-        scene = self._scenes[0]
-        for next_scene in self._scenes[1:]:
-            scene += next_scene
-
-        return scene
+        return Timeline(self._scenes)
 
     def frozen(self, drawable: Drawable, t: float = None) -> Drawable:
         """Returns a frozen drawable at time t. If t is not specified, the end of the animation is
         returned.
 
         Args:
+            drawable: The drawable to freeze.
             t: The time in seconds, or None to return the end of the animation.
 
         Returns:
             The frozen drawable at time t.
         """
 
-        if t is None:
-            t = self._get_drawable_duration()
-
-        return self._get_drawable_at_t(t)
+        return Frozen(child=drawable, t=t)
 
     def freeze(self, duration: float):
         """Freezes the last scene for a given duration."""
@@ -444,10 +837,10 @@ class Playbook(ABC):
         if duration is None:
             duration = _get_drawable_duration(drawable)
 
-        # Build the scene.
+        # Build the scene. Frames are evaluated without mutating the drawable, so they
+        # can be evaluated in any order, or concurrently.
         def _make_frame(t: float) -> Drawable:
-            drawable.set_time(t)
-            return drawable
+            return drawable.at(t)
 
         scene = Scene(duration, _make_frame)
         self._scenes.append(scene)
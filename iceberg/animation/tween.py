@@ -1,6 +1,7 @@
 import dataclasses
 import typing
-from typing import Sequence
+import weakref
+from typing import Any, Dict, List, Sequence, Tuple
 
 import numpy as np
 
@@ -16,6 +17,9 @@ _PRIMITIVE_INTERPOLATORS = {
 }
 
 
+_NUMBER_TYPES = (int, float, np.number)
+
+
 def _field_names(fields):
     return set(field.name for field in fields)
 
@@ -24,13 +28,158 @@ def _should_not_animate(field):
     return field.metadata.get("iceberg_dont_animate", False)
 
 
-def _interpolate(sceneA, sceneB, t, a_type=None, b_type=None):
-    # Recursively walk through the scene graph and interpolate between the two scenes.
-    # Use the fact that everything is a dataclass, so we can use dataclasses.asdict
-    # to get a dictionary representation of the scene.
+def _field_interpolator(field):
+    return field.metadata.get("iceberg_interpolator", None)
+
+
+def _leaves_equal(a, b) -> bool:
+    """Whether two leaf values are known to be equal, without raising."""
+
+    if a is b:
+        return True
+
+    if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        return (
+            isinstance(a, np.ndarray)
+            and isinstance(b, np.ndarray)
+            and a.shape == b.shape
+            and np.array_equal(a, b)
+        )
+
+    if type(a) is not type(b) or not isinstance(a, (int, float, str)):
+        return False
+
+    return a == b
+
+
+class _Plan(object):
+    """A node of a compiled tween plan.
+
+    Plans are compiled once for a pair of states, and can then be evaluated for any
+    progress value without repeating any of the type reflection. Numeric leaves are
+    not interpolated by the plan nodes themselves: they read their value from `frame`,
+    the flat list of every numeric leaf of the state pair interpolated in one go.
+    """
+
+    # Whether the plan evaluates to the same value for every progress value.
+    constant = False
+
+    def evaluate(self, t: float, frame: List[float]) -> Any:
+        raise NotImplementedError
+
+
+class _ConstantPlan(_Plan):
+    constant = True
+
+    def __init__(self, value):
+        self._value = value
+
+    def evaluate(self, t: float, frame: List[float]) -> Any:
+        return self._value
+
+
+class _StepPlan(_Plan):
+    def __init__(self, a, b):
+        self._a = a
+        self._b = b
+
+    def evaluate(self, t: float, frame: List[float]) -> Any:
+        return self._a if t < 0.5 else self._b
+
+
+class _FunctionPlan(_Plan):
+    def __init__(self, a, b, fn):
+        self._a = a
+        self._b = b
+        self._fn = fn
+
+    def evaluate(self, t: float, frame: List[float]) -> Any:
+        return self._fn(self._a, self._b, t)
+
+
+class _NumberPlan(_Plan):
+    def __init__(self, index: int):
+        self._index = index
+
+    def evaluate(self, t: float, frame: List[float]) -> Any:
+        return frame[self._index]
+
+
+class _ArrayPlan(_Plan):
+    def __init__(self, index: int, shape: Tuple[int, ...]):
+        self._start = index
+        self._stop = index + int(np.prod(shape))
+        self._shape = shape
+
+    def evaluate(self, t: float, frame: List[float]) -> Any:
+        return np.array(frame[self._start : self._stop]).reshape(self._shape)
+
+
+class _PropertyPlan(_Plan):
+    def __init__(self, template: ice.AnimatableProperty, index: int, size: int):
+        self._template = template
+        self._start = index
+        self._stop = index + size
+
+    def evaluate(self, t: float, frame: List[float]) -> Any:
+        return self._template.with_numeric_components(frame[self._start : self._stop])
+
+
+class _SequencePlan(_Plan):
+    def __init__(self, plans: Sequence[_Plan], is_tuple: bool):
+        self._plans = plans
+        self._is_tuple = is_tuple
+
+    def evaluate(self, t: float, frame: List[float]) -> Any:
+        rv = [plan.evaluate(t, frame) for plan in self._plans]
+        if self._is_tuple:
+            return tuple(rv)
+        return rv
+
+
+class _DrawablePlan(_Plan):
+    def __init__(self, cls, field_plans: Dict[str, _Plan]):
+        self._cls = cls
+        self._field_plans = list(field_plans.items())
+
+    def evaluate(self, t: float, frame: List[float]) -> Any:
+        return self._cls.from_fields(
+            **{name: plan.evaluate(t, frame) for name, plan in self._field_plans}
+        )
+
+
+class _NumericLeaves(object):
+    """Collects the numeric leaves of a state pair into two flat lists."""
+
+    def __init__(self):
+        self.start = []
+        self.end = []
+
+    def add(self, start: Sequence[float], end: Sequence[float]) -> int:
+        """Add leaves and return the index of the first one in the flat lists."""
+
+        index = len(self.start)
+        self.start.extend(start)
+        self.end.extend(end)
+        return index
+
+
+def _is_numeric_array(value) -> bool:
+    return isinstance(value, np.ndarray) and np.issubdtype(value.dtype, np.number)
+
+
+def _compile(
+    sceneA, sceneB, leaves: _NumericLeaves, a_type=None, b_type=None
+) -> _Plan:
+    # Recursively walk through the scene graph and record how to interpolate between
+    # the two scenes. Everything is a dataclass, so we can use the dataclass fields
+    # (and their type hints) to find out what to interpolate.
+
+    if sceneA is sceneB:
+        return _ConstantPlan(sceneA)
 
     if sceneA is None or sceneB is None:
-        return sceneA if t < 0.5 else sceneB
+        return _StepPlan(sceneA, sceneB)
 
     a_hint = a_type if a_type is not None else None
 
@@ -50,6 +199,7 @@ def _interpolate(sceneA, sceneB, t, a_type=None, b_type=None):
 
     if a_type == typing.Union or a_type == typing.Optional or a_type == Ellipsis:
         a_type = type(sceneA)
+        a_hint = None
 
     if issubclass(a_type, ice.Drawable):
         fieldsA = dataclasses.fields(sceneA)
@@ -60,7 +210,7 @@ def _interpolate(sceneA, sceneB, t, a_type=None, b_type=None):
                 f"Scene graphs don't have the same structure. {sceneA} has fields {fieldsA}, but {sceneB} has fields {fieldsB}."
             )
 
-        new_scene_fields = {}
+        field_plans = {}
 
         for field, fieldB in zip(fieldsA, fieldsB):
             fieldA_value = getattr(sceneA, field.name)
@@ -68,18 +218,33 @@ def _interpolate(sceneA, sceneB, t, a_type=None, b_type=None):
 
             if _should_not_animate(field):
                 assert _should_not_animate(fieldB)
-                new_scene_fields[field.name] = fieldA_value if t < 0.5 else fieldB_value
+                if _leaves_equal(fieldA_value, fieldB_value):
+                    field_plans[field.name] = _ConstantPlan(fieldA_value)
+                else:
+                    field_plans[field.name] = _StepPlan(fieldA_value, fieldB_value)
                 continue
 
-            new_scene_fields[field.name] = _interpolate(
+            interpolator = _field_interpolator(field)
+            if interpolator is not None:
+                field_plans[field.name] = _FunctionPlan(
+                    fieldA_value, fieldB_value, interpolator
+                )
+                continue
+
+            field_plans[field.name] = _compile(
                 fieldA_value,
                 fieldB_value,
-                t,
+                leaves,
                 a_type=field.type,
                 b_type=fieldB.type,
             )
 
-        return sceneA.__class__.from_fields(**new_scene_fields)
+        # If every field is the same in both states, the subtrees are equal and
+        # sceneA is reused as-is, instead of being rebuilt (and set up) every frame.
+        if all(plan.constant for plan in field_plans.values()):
+            return _ConstantPlan(sceneA)
+
+        return _DrawablePlan(sceneA.__class__, field_plans)
     # Sequence captures a lot, excluding str is a hack for now.
     elif issubclass(a_type, (list, tuple, Sequence)) and not issubclass(a_type, str):
         sub_type = [None] * len(sceneA)
@@ -89,22 +254,129 @@ def _interpolate(sceneA, sceneB, t, a_type=None, b_type=None):
             elif len(a_hint.__args__) == 1:
                 sub_type = [a_hint.__args__[0]] * len(sceneA)
 
-        rv = [
-            _interpolate(a, b, t, a_type=s, b_type=s)
+        plans = [
+            _compile(a, b, leaves, a_type=s, b_type=s)
             for a, b, s in zip(sceneA, sceneB, sub_type)
         ]
-        if isinstance(sceneA, tuple):
-            return tuple(rv)
-        return rv
+
+        if len(sceneA) == len(sceneB) and all(plan.constant for plan in plans):
+            return _ConstantPlan(sceneA)
+
+        return _SequencePlan(plans, isinstance(sceneA, tuple))
     elif issubclass(a_type, (int, float, np.ndarray)):
+        if _leaves_equal(sceneA, sceneB):
+            return _ConstantPlan(sceneA)
+
         for type_, func in _PRIMITIVE_INTERPOLATORS.items():
             if issubclass(a_type, type_):
-                return func(sceneA, sceneB, t)
+                break
+
+        if type_ is np.ndarray:
+            if (
+                _is_numeric_array(sceneA)
+                and _is_numeric_array(sceneB)
+                and sceneA.shape == sceneB.shape
+            ):
+                index = leaves.add(sceneA.ravel().tolist(), sceneB.ravel().tolist())
+                return _ArrayPlan(index, sceneA.shape)
+        elif isinstance(sceneA, _NUMBER_TYPES) and isinstance(sceneB, _NUMBER_TYPES):
+            return _NumberPlan(leaves.add([float(sceneA)], [float(sceneB)]))
+
+        return _FunctionPlan(sceneA, sceneB, func)
     elif issubclass(a_type, ice.AnimatableProperty):
-        sceneA: ice.AnimatableProperty = sceneA
-        return sceneA.__class__.interpolate(sceneA, sceneB, t)
+        componentsA = sceneA.numeric_components()
+        componentsB = sceneB.numeric_components()
+
+        if componentsA is None or componentsB is None:
+            return _FunctionPlan(sceneA, sceneB, sceneA.__class__.interpolate)
+
+        if componentsA == componentsB:
+            return _ConstantPlan(sceneA)
+
+        index = leaves.add(componentsA, componentsB)
+        return _PropertyPlan(sceneA, index, len(componentsA))
+
+    if _leaves_equal(sceneA, sceneB):
+        return _ConstantPlan(sceneA)
+
+    return _StepPlan(sceneA, sceneB)
+
 
-    return sceneA if t < 0.5 else sceneB
+class TweenPlan(object):
+    """A tween between two states, compiled once and evaluated many times.
+
+    Compiling walks both states a single time and records which leaves differ,
+    which interpolator each of them uses and which subtrees are shared, so that
+    evaluating a frame only has to run the recorded plan. All numeric leaves
+    (numbers, numpy arrays and the numeric components of properties such as `Bounds`,
+    `Color` and `PathStyle`) are gathered into flat arrays and interpolated with one
+    vectorized operation per frame.
+
+    The states are treated as immutable once compiled. If you mutate one of them
+    afterwards, compile a new plan.
+    """
+
+    def __init__(self, start, end):
+        """Compile a tween plan between two states.
+
+        Args:
+            start: The start state.
+            end: The end state.
+
+        Raises:
+            ValueError: If the two states don't have the same structure.
+        """
+
+        leaves = _NumericLeaves()
+        self._root = _compile(start, end, leaves)
+
+        # Every numeric leaf is interpolated with a single vectorized operation.
+        self._start_values = np.array(leaves.start, dtype=np.float64)
+        self._deltas = np.array(leaves.end, dtype=np.float64) - self._start_values
+
+    def __call__(self, progress: float):
+        """Evaluate the plan.
+
+        Args:
+            progress: The (already eased) progress between 0 and 1.
+
+        Returns:
+            The interpolated state.
+        """
+
+        frame = (self._start_values + self._deltas * progress).tolist()
+        return self._root.evaluate(progress, frame)
+
+
+# Plans compiled by `tween`, keyed by the ids of the two states. The entries hold
+# weak references to the states, so they disappear together with the states.
+_plan_cache = {}
+
+
+def _get_plan(start, end) -> TweenPlan:
+    if not isinstance(start, ice.Drawable) or not isinstance(end, ice.Drawable):
+        # Plain values such as numbers are cheap to compile, so they are not cached.
+        return TweenPlan(start, end)
+
+    key = (id(start), id(end))
+    entry = _plan_cache.get(key)
+    if entry is not None and entry[0]() is start and entry[1]() is end:
+        return entry[2]
+
+    def _evict(_, key=key):
+        _plan_cache.pop(key, None)
+
+    plan = TweenPlan(start, end)
+    _plan_cache[key] = (
+        weakref.ref(start, _evict),
+        weakref.ref(end, _evict),
+        plan,
+    )
+    return plan
+
+
+def _interpolate(sceneA, sceneB, t):
+    return _get_plan(sceneA, sceneB)(t)
 
 
 def tween(
@@ -117,6 +389,9 @@ def tween(
 ):
     """Tween between two values.
 
+    The tween plan between `start` and `end` is compiled on the first call and reused
+    for every later call with the same pair of states.
+
     Args:
         start: The start value either as a scalar or a numpy array.
         end: The end value either as a scalar or a numpy array.
@@ -4,12 +4,14 @@ from .helpers import ArrowHeadStyle, ArrowHead, ArrowPath
 
 from .arrows import (
     Arrow,
+    ArrowBundle,
     ArrowAlignDirection,
     LabelArrow,
 )
 
 __all__ = [
     "Arrow",
+    "ArrowBundle",
     "ArrowAlignDirection",
     "LabelArrow",
     "ArrowHeadStyle",
@@ -1,12 +1,13 @@
 from enum import Enum
-from typing import Tuple
+from typing import Sequence, Tuple
 
 import numpy as np
+import skia
 
 from iceberg import Drawable, DrawableWithChild, PathStyle
-from iceberg.primitives import Compose, Line, PartialPath, Transform
+from iceberg.primitives import Compose, Line, PartialPath, Path, Transform
 
-from .helpers import ArrowHead, ArrowHeadStyle
+from .helpers import ArrowHead, ArrowHeadStyle, arrow_head_extent
 
 
 def arrow_corners_from_direction_and_point(
@@ -119,8 +120,8 @@ class Arrow(DrawableWithChild):
 
     def setup(self):
         self._midpoint = (np.array(self.start) + np.array(self.end)) / 2
-        self._start = np.array(self.start)
-        self._end = np.array(self.end)
+        self._start = np.array(self.start, dtype=np.float64)
+        self._end = np.array(self.end, dtype=np.float64)
         self._path_style = self.line_path_style
         self._head_length = self.head_length
         self._angle = self.angle
@@ -142,16 +143,12 @@ class Arrow(DrawableWithChild):
         backup_length = 0
 
         if self._arrow_head_end or self._arrow_head_start:
-            # Create a fake arrow head to measure its length.
-            fake_head = ArrowHead(
-                (0, 0),
-                (1, 0),
+            backup_length = arrow_head_extent(
                 self._path_style,
                 self._angle,
                 self._head_length,
                 self._arrow_head_style,
             )
-            backup_length = fake_head.bounds.right
 
         # Modified start and end points.
         # By default there is no modification.
@@ -180,15 +177,10 @@ class Arrow(DrawableWithChild):
         items.append(line)
 
         # Draw the arrow heads.
-        head_start = line.points[0]
-        head_end = line.points[-1]
-        head_start_tangent = line.tangents[0]
-        head_end_tangent = line.tangents[-1]
-
-        head_start = tuple(head_start)
-        head_end = tuple(head_end)
-        head_start_tangent = tuple(head_start_tangent)
-        head_end_tangent = tuple(head_end_tangent)
+        # Only the ends of the line are needed, so the line isn't subdivided.
+        points, tangents = line.sample([0, 1])
+        head_start, head_end = map(tuple, points.tolist())
+        head_start_tangent, head_end_tangent = map(tuple, tangents.tolist())
 
         if self._arrow_head_end:
             items.append(
@@ -226,6 +218,155 @@ class Arrow(DrawableWithChild):
         return self._midpoint
 
 
+class ArrowBundle(DrawableWithChild):
+    """Many straight arrows with the same style, built in a single pass.
+
+    This draws the same arrows as creating an `Arrow` for each pair of points, but all
+    the lines and all the heads are computed at once and drawn as two paths. It is
+    much faster for diagrams with thousands of arrows, e.g. connecting every node of
+    a layer to every node of the next one. Overlapping arrows are drawn as one shape,
+    so translucent colors don't accumulate where they cross.
+
+    Args:
+        starts: The start coordinates of the arrows.
+        ends: The end coordinates of the arrows.
+        line_path_style: The style of the lines and heads.
+        head_length: The length of the arrow heads.
+        angle: The angle of the arrow heads in degrees.
+        arrow_head_style: The style of the arrow heads.
+        arrow_head_start: Whether to draw arrow heads at the starts.
+        arrow_head_end: Whether to draw arrow heads at the ends.
+        partial_start: The fraction of the arrows to draw at the start.
+        partial_end: The fraction of the arrows to draw at the end.
+    """
+
+    starts: Sequence[Tuple[float, float]]
+    ends: Sequence[Tuple[float, float]]
+    line_path_style: PathStyle
+    head_length: float = 20
+    angle: float = 30
+    arrow_head_style: ArrowHeadStyle = ArrowHeadStyle.TRIANGLE
+    arrow_head_start: bool = False
+    arrow_head_end: bool = True
+    partial_start: float = 0
+    partial_end: float = 1
+
+    def __init__(
+        self,
+        starts: Sequence[Tuple[float, float]],
+        ends: Sequence[Tuple[float, float]],
+        line_path_style: PathStyle,
+        head_length: float = 20,
+        angle: float = 30,
+        arrow_head_style: ArrowHeadStyle = ArrowHeadStyle.TRIANGLE,
+        arrow_head_start: bool = False,
+        arrow_head_end: bool = True,
+        partial_start: float = 0,
+        partial_end: float = 1,
+    ):
+        self.init_from_fields(
+            starts=starts,
+            ends=ends,
+            line_path_style=line_path_style,
+            head_length=head_length,
+            angle=angle,
+            arrow_head_style=arrow_head_style,
+            arrow_head_start=arrow_head_start,
+            arrow_head_end=arrow_head_end,
+            partial_start=partial_start,
+            partial_end=partial_end,
+        )
+
+    def setup(self):
+        starts = np.asarray(self.starts, dtype=np.float64).reshape(-1, 2)
+        ends = np.asarray(self.ends, dtype=np.float64).reshape(-1, 2)
+        assert len(starts) == len(ends), "There must be as many starts as ends."
+
+        # Compute the direction of every arrow.
+        deltas = ends - starts
+        lengths = np.linalg.norm(deltas, axis=1, keepdims=True)
+        directions = np.divide(
+            deltas, lengths, out=np.zeros_like(deltas), where=lengths > 0
+        )
+
+        # Shorten the lines so that the tips of the heads land on the end points, see
+        # `Arrow`. All the heads are the same, so this is computed once.
+        backup_length = 0
+        if self.arrow_head_end or self.arrow_head_start:
+            backup_length = arrow_head_extent(
+                self.line_path_style,
+                self.angle,
+                self.head_length,
+                self.arrow_head_style,
+            )
+
+        line_starts = starts
+        line_ends = ends
+        if self.arrow_head_end:
+            line_ends = line_ends - directions * backup_length
+        if self.arrow_head_start:
+            line_starts = line_starts + directions * backup_length
+
+        line_deltas = line_ends - line_starts
+        line_starts, line_ends = (
+            line_starts + line_deltas * self.partial_start,
+            line_starts + line_deltas * self.partial_end,
+        )
+
+        lines_path = skia.Path()
+        for (x1, y1), (x2, y2) in zip(line_starts.tolist(), line_ends.tolist()):
+            lines_path.moveTo(x1, y1)
+            lines_path.lineTo(x2, y2)
+
+        # The heads point along the arrows at the ends, and backwards at the starts.
+        tips = []
+        head_directions = []
+        if self.arrow_head_end:
+            tips.append(line_ends)
+            head_directions.append(directions)
+        if self.arrow_head_start:
+            tips.append(line_starts)
+            head_directions.append(-directions)
+
+        items = [Path.from_skia(lines_path, self.line_path_style)]
+
+        if tips:
+            tips = np.concatenate(tips)
+            backwards = -np.concatenate(head_directions)
+            normals = np.stack([-backwards[:, 1], backwards[:, 0]], axis=1)
+
+            angle = np.deg2rad(self.angle)
+            along = tips + self.head_length * np.cos(angle) * backwards
+            across = self.head_length * np.sin(angle) * normals
+            corners1 = along + across
+            corners2 = along - across
+
+            close = self.arrow_head_style == ArrowHeadStyle.FILLED_TRIANGLE
+            heads_path = skia.Path()
+            for (x1, y1), (x, y), (x2, y2) in zip(
+                corners1.tolist(), tips.tolist(), corners2.tolist()
+            ):
+                heads_path.moveTo(x1, y1)
+                heads_path.lineTo(x, y)
+                heads_path.lineTo(x2, y2)
+                if close:
+                    heads_path.close()
+
+            if self.arrow_head_style == ArrowHeadStyle.FILLED_TRIANGLE:
+                head_fill_style = PathStyle(
+                    color=self.line_path_style.color,
+                    stroke=False,
+                    anti_alias=self.line_path_style.anti_alias,
+                )
+                items.append(Path.from_skia(heads_path, head_fill_style))
+            elif self.arrow_head_style != ArrowHeadStyle.TRIANGLE:
+                raise ValueError(f"Unknown arrow head style {self.arrow_head_style}.")
+
+            items.append(Path.from_skia(heads_path, self.line_path_style))
+
+        self.set_child(Compose(items))
+
+
 class ArrowAlignDirection(Enum):
     ABOVE = 0
     BELOW = 1
@@ -1,3 +1,5 @@
+import collections
+import threading
 from copy import copy
 from enum import Enum
 from typing import Optional, Tuple
@@ -142,6 +144,71 @@ class ArrowHead(DrawableWithChild):
         self.set_child(Compose(items))
 
 
+# The default miter limit of Skia, which the paints of path styles use.
+_MITER_LIMIT = 4
+
+# Extents of arrow heads that had to be measured, keyed by the head's parameters.
+_HEAD_EXTENT_CACHE = collections.OrderedDict()
+_HEAD_EXTENT_CACHE_SIZE = 1024
+_HEAD_EXTENT_CACHE_LOCK = threading.Lock()
+
+
+def arrow_head_extent(
+    path_style: PathStyle,
+    angle: float,
+    head_length: float,
+    arrow_head_style: ArrowHeadStyle = ArrowHeadStyle.TRIANGLE,
+) -> float:
+    """How far an arrow head extends past its point, because of the thickness of its
+    stroke. Lines are shortened by this much so that the tip of the head lands exactly
+    on the end of the line.
+
+    Args:
+        path_style: The style of the arrow head.
+        angle: The angle of the arrow head in degrees.
+        head_length: The length of the arrow head.
+        arrow_head_style: The style of the arrow head.
+
+    Returns:
+        The extent of the arrow head past its point.
+    """
+
+    half_thickness = path_style.thickness / 2 if path_style.stroke else 0
+    sin = np.sin(np.deg2rad(angle))
+    cos = np.cos(np.deg2rad(angle))
+
+    # Dashes can end before the tip, so dashed heads are always measured.
+    if sin > 0 and not path_style.dashed:
+        # The stroke is mitered at the tip, or beveled past the miter limit.
+        if 1 / sin <= _MITER_LIMIT:
+            tip_extent = half_thickness / sin
+        else:
+            tip_extent = half_thickness * sin
+
+        # Nothing at the corners can reach past the tip, whatever the caps and joins.
+        if -head_length * cos + _MITER_LIMIT * half_thickness <= tip_extent:
+            return tip_extent
+
+    # Otherwise, measure an actual arrow head, only once for the same parameters. The
+    # color doesn't change the outline, so arrows of every color share their extents.
+    key = (path_style.stroke_geometry, angle, head_length, arrow_head_style)
+    with _HEAD_EXTENT_CACHE_LOCK:
+        extent = _HEAD_EXTENT_CACHE.get(key)
+        if extent is not None:
+            _HEAD_EXTENT_CACHE.move_to_end(key)
+            return extent
+
+    head = ArrowHead((0, 0), (1, 0), path_style, angle, head_length, arrow_head_style)
+    extent = head.bounds.right
+
+    with _HEAD_EXTENT_CACHE_LOCK:
+        _HEAD_EXTENT_CACHE[key] = extent
+        if len(_HEAD_EXTENT_CACHE) > _HEAD_EXTENT_CACHE_SIZE:
+            _HEAD_EXTENT_CACHE.popitem(last=False)
+
+    return extent
+
+
 class ArrowPath(DrawableWithChild):
     child_path: Path
     arrow_head_start: bool = False
@@ -189,25 +256,11 @@ class ArrowPath(DrawableWithChild):
         backup_t = 0
 
         if self.arrow_head_end or self.arrow_head_start:
-            # Create a fake arrow head to measure its length.
-            fake_head = ArrowHead(
-                (0, 0),
-                (1, 0),
-                _arrow_path_style,
-                self.angle,
-                self.head_length,
-                self.arrow_head_style,
+            backup_length = arrow_head_extent(
+                _arrow_path_style, self.angle, self.head_length, self.arrow_head_style
             )
-            backup_length = fake_head.bounds.right
-            # Create a fake line to figure out where to backup to
-            fake_line = PartialPath(
-                self.child_path,
-                self.partial_start,
-                self.partial_end,
-                self.subdivide_increment,
-                interpolation=self.interpolation,
-            )
-            backup_t = backup_length / fake_line.total_length
+            # The length of the child path is cached, so this doesn't measure it again.
+            backup_t = backup_length / self.child_path.total_length
 
         # Modified start and end points.
         # By default there is no modification.
@@ -244,16 +297,17 @@ class ArrowPath(DrawableWithChild):
         available_length = line.total_length * (self._partial_end - self._partial_start)
         if self.arrow_head_start and self.arrow_head_end:
             available_length /= 2
+        head_length = self.head_length
         cos = np.cos(np.deg2rad(self.angle))
         if cos > 0:
             max_head_length = available_length / cos
             head_length = min(self.head_length, max_head_length)
 
         # Draw the arrow heads.
-        head_start = tuple(line.points[0])
-        head_end = tuple(line.points[-1])
-        head_start_tangent = tuple(line.tangents[0])
-        head_end_tangent = tuple(line.tangents[-1])
+        # Only the ends of the line are needed, so the line isn't subdivided.
+        points, tangents = line.sample([0, 1])
+        head_start, head_end = map(tuple, points.tolist())
+        head_start_tangent, head_end_tangent = map(tuple, tangents.tolist())
 
         if self.arrow_head_end:
             items.append(
@@ -293,12 +347,26 @@ class ArrowPath(DrawableWithChild):
     def points(self):
         return self._line.points
 
+    @property
+    def tangents_array(self) -> np.ndarray:
+        return self._line.tangents_array
+
+    @property
+    def points_array(self) -> np.ndarray:
+        return self._line.points_array
+
     @property
     def midpoints(self):
+        points = self.points_array.tolist()
         return [
             ((x1 + x2) / 2, (y1 + y2) / 2)
-            for (x1, y1), (x2, y2) in zip(self.points[:-1], self.points[1:])
+            for (x1, y1), (x2, y2) in zip(points[:-1], points[1:])
         ]
 
-    def point_and_tangent_at(self, t: float):
+    def sample(self, ts) -> Tuple[np.ndarray, np.ndarray]:
+        """Sample points and unit tangents along the line of the arrow, see
+        `PartialPath.sample`."""
+        return self._line.sample(ts)
+
+    def point_and_tangent_at(self, t: float) -> Tuple[np.ndarray, np.ndarray]:
         return self._line.point_and_tangent_at(t)
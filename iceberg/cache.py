@@ -0,0 +1,690 @@
+"""A cache of compiled assets (LaTeX and Typst SVGs, rasterized images, ...), shared by
+processes and machines.
+
+The cache lives in a configurable directory, `~/.cache/iceberg` by default, and is
+safe to use from parallel workers: entries are written atomically, and `lock` lets
+workers agree on which of them produces an entry. The cache is kept under a maximum
+size by evicting the least recently used entries.
+
+Entries are files in the cache directory by default, or rows of a single SQLite
+database if `use_sqlite` is set, which is easier to copy between machines. SQLite
+relies on file locks that network file systems often don't implement correctly, so a
+cache shared over the network should use the file store.
+
+Files that tools need on disk, such as precompiled LaTeX formats, live in
+subdirectories of the cache, see `AssetCache.subdirectory`. They count towards the
+size of the cache and are evicted like entries.
+
+The cache is configured with `configure_cache`, or with the environment variables
+`ICEBERG_CACHE_DIR`, `ICEBERG_CACHE_MAX_SIZE` (in bytes) and `ICEBERG_CACHE_SQLITE`.
+"""
+
+import atexit
+import contextlib
+import os
+import shutil
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Optional
+
+from absl import logging
+
+try:
+    import fcntl
+except ImportError:
+    # Not available on Windows, where locks are taken with msvcrt instead.
+    fcntl = None
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+
+_DEFAULT_MAX_SIZE = 1 << 30
+
+# After eviction, the cache is at most this fraction of its maximum size, so that it
+# isn't evicted again on the next write.
+_EVICTION_TARGET = 0.9
+
+# Reads only mark an entry as used if it wasn't marked in this many seconds, so that
+# most reads don't write anything. Eviction doesn't need to be more precise.
+_ACCESS_TIME_RESOLUTION = 60
+
+# Subdirectories that don't hold files of their own entries: the file store, the
+# locks, and the scratch directories.
+_UNTRACKED_SUBDIRECTORIES = ("assets", "locks", "work")
+
+
+def _default_directory() -> str:
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(cache_home, "iceberg")
+
+
+class AssetCache(object):
+    """A size-bounded cache of named assets, safe to share between processes.
+
+    Example:
+        >>> cache = AssetCache("/shared/iceberg-cache", max_size=10 << 30)
+        >>> with cache.lock("formula.svg"):
+        ...     if not cache.contains("formula.svg"):
+        ...         cache.put("formula.svg", compile_formula())
+        >>> svg = cache.get("formula.svg")
+    """
+
+    def __init__(
+        self,
+        directory: str = None,
+        max_size: int = _DEFAULT_MAX_SIZE,
+        use_sqlite: bool = False,
+    ):
+        """A size-bounded cache of named assets, safe to share between processes.
+
+        Args:
+            directory: The directory of the cache. Defaults to `~/.cache/iceberg`.
+            max_size: The maximum total size of the entries, in bytes.
+            use_sqlite: Whether to store the entries in a single SQLite database
+                instead of one file per entry. The database should be on a local file
+                system.
+        """
+
+        self._directory = os.path.abspath(directory or _default_directory())
+        self._max_size = max_size
+        self._use_sqlite = use_sqlite
+
+        # Approximate size of the entries, to know when to evict without scanning
+        # the cache on every write. Other processes' writes are only seen on scans.
+        self._size = None
+        self._size_lock = threading.Lock()
+
+        self._local = threading.local()
+        self._work_directory = None
+        self._work_directory_pid = None
+
+        os.makedirs(self._directory, exist_ok=True)
+
+    @property
+    def directory(self) -> str:
+        return self._directory
+
+    @property
+    def max_size(self) -> int:
+        return self._max_size
+
+    @property
+    def use_sqlite(self) -> bool:
+        return self._use_sqlite
+
+    def subdirectory(self, name: str) -> str:
+        """Get a subdirectory of the cache, for files that tools need on disk.
+
+        The files count towards the size of the cache once they are added with
+        `add_file`, and are evicted like entries. Mark them as used with `mark_used`.
+
+        Args:
+            name: The name of the subdirectory.
+
+        Returns:
+            The path of the subdirectory, which is created if it doesn't exist.
+        """
+
+        path = os.path.join(self._directory, name)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def work_directory(self) -> str:
+        """Get a scratch directory for this process, removed when the process exits.
+
+        Returns:
+            The path of the scratch directory.
+        """
+
+        # Forked workers get their own directory, so they never share scratch files.
+        if self._work_directory_pid != os.getpid():
+            _remove_stale_work_directories(self.subdirectory("work"))
+            self._work_directory = os.path.join(
+                self.subdirectory("work"),
+                f"{socket.gethostname()}_{os.getpid()}_{uuid.uuid4().hex[:8]}",
+            )
+            self._work_directory_pid = os.getpid()
+            os.makedirs(self._work_directory, exist_ok=True)
+            atexit.register(_remove_work_directory, self._work_directory, os.getpid())
+
+        return self._work_directory
+
+    def scratch_path(self, stem: str) -> str:
+        """Get a unique path in the scratch directory.
+
+        Args:
+            stem: The start of the file name.
+
+        Returns:
+            The path, without an extension.
+        """
+
+        return os.path.join(self.work_directory(), f"{stem}_{uuid.uuid4().hex[:8]}")
+
+    def _entry_path(self, name: str) -> str:
+        return os.path.join(self._directory, "assets", name)
+
+    def _connection(self) -> sqlite3.Connection:
+        # SQLite connections can't be shared between threads, or with forked workers.
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(
+                os.path.join(self._directory, "cache.sqlite"), timeout=60
+            )
+            # The default rollback journal, rather than WAL, which needs shared memory
+            # between the processes.
+            connection.execute("PRAGMA journal_mode=DELETE")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS assets "
+                "(name TEXT PRIMARY KEY, data BLOB, size INTEGER, accessed REAL)"
+            )
+            connection.commit()
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def contains(self, name: str) -> bool:
+        """Check whether the cache has an entry.
+
+        Args:
+            name: The name of the entry.
+
+        Returns:
+            True if the entry is cached.
+        """
+
+        if self._use_sqlite:
+            row = (
+                self._connection()
+                .execute("SELECT 1 FROM assets WHERE name = ?", (name,))
+                .fetchone()
+            )
+            return row is not None
+
+        return os.path.exists(self._entry_path(name))
+
+    def get(self, name: str) -> Optional[bytes]:
+        """Read an entry, marking it as recently used.
+
+        Args:
+            name: The name of the entry.
+
+        Returns:
+            The content of the entry, or None if it isn't cached.
+        """
+
+        if self._use_sqlite:
+            connection = self._connection()
+            row = connection.execute(
+                "SELECT data, accessed FROM assets WHERE name = ?", (name,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            data, accessed = row
+            now = time.time()
+            if now - accessed >= _ACCESS_TIME_RESOLUTION:
+                with connection:
+                    connection.execute(
+                        "UPDATE assets SET accessed = ? WHERE name = ?", (now, name)
+                    )
+            return bytes(data)
+
+        path = self._entry_path(name)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+                modified = os.fstat(f.fileno()).st_mtime
+        except FileNotFoundError:
+            return None
+
+        self._mark_used(path, modified)
+        return data
+
+    def mark_used(self, path: str) -> None:
+        """Mark a file of a subdirectory of the cache as recently used.
+
+        Args:
+            path: The path of the file.
+        """
+
+        try:
+            self._mark_used(path, os.stat(path).st_mtime)
+        except FileNotFoundError:
+            pass
+
+    def _mark_used(self, path: str, modified: float) -> None:
+        # The modification time doubles as the last access time.
+        if time.time() - modified < _ACCESS_TIME_RESOLUTION:
+            return
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            # Evicted by another process in the meantime.
+            pass
+
+    def add_file(self, path: str) -> None:
+        """Count a new file of a subdirectory of the cache towards its size, evicting
+        old entries if the cache is too big.
+
+        Args:
+            path: The path of the file.
+        """
+
+        self._grow(os.path.getsize(path))
+
+    def get_file(self, name: str) -> Optional[str]:
+        """Get an entry as a file, for tools that need a path, marking it as recently
+        used.
+
+        With the file store, this is the file of the entry itself. With SQLite, the
+        entry is copied to the `files` subdirectory of the cache. Either way, the file
+        may be evicted later on, so it should be read soon after.
+
+        Args:
+            name: The name of the entry.
+
+        Returns:
+            The path of the file, or None if the entry isn't cached.
+        """
+
+        if self._use_sqlite:
+            data = self.get(name)
+            if data is None:
+                return None
+
+            path = os.path.join(self.subdirectory("files"), name)
+            if os.path.exists(path):
+                self.mark_used(path)
+            else:
+                temp_path = self.scratch_path("file")
+                with open(temp_path, "wb") as f:
+                    f.write(data)
+                os.replace(temp_path, path)
+                self._grow(len(data))
+            return path
+
+        path = self._entry_path(name)
+        try:
+            self._mark_used(path, os.stat(path).st_mtime)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, name: str, data: bytes) -> None:
+        """Write an entry atomically, evicting old entries if the cache is too big.
+
+        Args:
+            name: The name of the entry.
+            data: The content of the entry.
+        """
+
+        if self._use_sqlite:
+            connection = self._connection()
+            with connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO assets VALUES (?, ?, ?, ?)",
+                    (name, data, len(data), time.time()),
+                )
+        else:
+            path = self.scratch_path("put")
+            with open(path, "wb") as f:
+                f.write(data)
+            self._move_into_place(name, path)
+
+        self._grow(len(data))
+
+    def put_file(self, name: str, filename: str) -> None:
+        """Move a file into the cache atomically, evicting old entries if the cache is
+        too big.
+
+        The file should be in the scratch directory, so that it can be renamed into
+        place.
+
+        Args:
+            name: The name of the entry.
+            filename: The file, which is moved into the cache.
+        """
+
+        if self._use_sqlite:
+            with open(filename, "rb") as f:
+                data = f.read()
+            os.remove(filename)
+            self.put(name, data)
+            return
+
+        size = os.path.getsize(filename)
+        self._move_into_place(name, filename)
+        self._grow(size)
+
+    def _move_into_place(self, name: str, filename: str) -> None:
+        os.makedirs(os.path.join(self._directory, "assets"), exist_ok=True)
+        try:
+            os.replace(filename, self._entry_path(name))
+        except OSError:
+            # Not on the same file system as the cache, so copy it next to the entry
+            # first, and rename that.
+            temp_path = f"{self._entry_path(name)}.{uuid.uuid4().hex[:8]}.tmp"
+            shutil.copyfile(filename, temp_path)
+            os.replace(temp_path, self._entry_path(name))
+            os.remove(filename)
+
+    @contextlib.contextmanager
+    def lock(self, name: str):
+        """Hold a lock on an entry, shared with other threads and processes.
+
+        Use the lock to check and produce an entry, so that only one worker produces
+        it. Reading and writing entries doesn't need the lock.
+
+        Args:
+            name: The name of the entry.
+        """
+
+        path = self._lock_path(name)
+        while True:
+            f = open(path, "a+b")
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+                # The lock file may have been removed with its entry while waiting, in
+                # which case the lock is on a file that no one else sees anymore.
+                try:
+                    locked = os.fstat(f.fileno()).st_ino == os.stat(path).st_ino
+                except FileNotFoundError:
+                    locked = False
+                if not locked:
+                    f.close()
+                    continue
+            elif msvcrt is not None:
+                f.seek(0)
+                while True:
+                    try:
+                        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        # LK_LOCK gives up after 10 seconds, so keep waiting.
+                        pass
+            break
+
+        with f:
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                elif msvcrt is not None:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _lock_path(self, name: str) -> str:
+        return os.path.join(self.subdirectory("locks"), name + ".lock")
+
+    def _remove_lock(self, name: str) -> None:
+        """Remove the lock file of an entry, unless someone is holding it."""
+
+        # Files that are open can't be removed on Windows, so the locks are kept.
+        if fcntl is None:
+            return
+
+        path = self._lock_path(name)
+        try:
+            fd = os.open(path, os.O_RDWR)
+        except FileNotFoundError:
+            return
+
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return
+
+        # Whoever is waiting for the lock opens the file again, see `lock`.
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        finally:
+            os.close(fd)
+
+    @property
+    def size(self) -> int:
+        """The total size of the entries, in bytes."""
+
+        size = 0
+        for entry in self._scan_files():
+            try:
+                size += entry.stat().st_size
+            except FileNotFoundError:
+                pass
+
+        if self._use_sqlite:
+            (entries_size,) = (
+                self._connection()
+                .execute("SELECT COALESCE(SUM(size), 0) FROM assets")
+                .fetchone()
+            )
+            return size + entries_size
+
+        for entry in self._scan_entries():
+            try:
+                size += entry.stat().st_size
+            except FileNotFoundError:
+                pass
+        return size
+
+    def _scan_entries(self):
+        return _scan_directory(os.path.join(self._directory, "assets"))
+
+    def _scan_files(self):
+        """The files of the subdirectories, see `subdirectory`."""
+
+        files = []
+        with os.scandir(self._directory) as entries:
+            for entry in entries:
+                if entry.is_dir() and entry.name not in _UNTRACKED_SUBDIRECTORIES:
+                    files.extend(_scan_directory(entry.path))
+        return files
+
+    def _grow(self, size: int) -> None:
+        with self._size_lock:
+            if self._size is None:
+                self._size = self.size
+            else:
+                self._size += size
+
+            if self._size <= self._max_size:
+                return
+
+        self.evict()
+
+    def evict(self) -> None:
+        """Evict the least recently used entries and files, until the cache is well
+        under its maximum size."""
+
+        target = int(self._max_size * _EVICTION_TARGET)
+
+        with self.lock("_evict"):
+            # (last access time, size, entry name or None, file path or None)
+            candidates = []
+            for entry in self._scan_files():
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                candidates.append((stat.st_mtime, stat.st_size, None, entry.path))
+
+            if self._use_sqlite:
+                for name, entry_size, accessed in (
+                    self._connection()
+                    .execute("SELECT name, size, accessed FROM assets")
+                    .fetchall()
+                ):
+                    candidates.append((accessed, entry_size, name, None))
+            else:
+                for entry in self._scan_entries():
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    candidates.append((stat.st_mtime, stat.st_size, entry.name, None))
+
+            size = sum(entry_size for _, entry_size, _, _ in candidates)
+            evicted_names = []
+            evicted_files = []
+            for _, entry_size, name, path in sorted(candidates, key=lambda c: c[0]):
+                if size <= target:
+                    break
+                if name is not None:
+                    evicted_names.append(name)
+                else:
+                    evicted_files.append(path)
+                size -= entry_size
+
+            self._remove(evicted_names, evicted_files)
+
+        evicted = len(evicted_names) + len(evicted_files)
+        if evicted:
+            logging.info(f"Evicted {evicted} entries from the iceberg cache.")
+
+        with self._size_lock:
+            self._size = size
+
+    def _remove(self, names, files) -> None:
+        """Remove entries, with their locks, and files of the subdirectories."""
+
+        if self._use_sqlite:
+            connection = self._connection()
+            with connection:
+                connection.executemany(
+                    "DELETE FROM assets WHERE name = ?", [(name,) for name in names]
+                )
+        else:
+            files = [*files, *(self._entry_path(name) for name in names)]
+
+        for path in files:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+        for name in names:
+            self._remove_lock(name)
+
+    def clear(self) -> None:
+        """Remove all the entries and the files of the subdirectories."""
+
+        with self.lock("_evict"):
+            if self._use_sqlite:
+                names = [
+                    name
+                    for (name,) in self._connection()
+                    .execute("SELECT name FROM assets")
+                    .fetchall()
+                ]
+            else:
+                names = [entry.name for entry in self._scan_entries()]
+
+            self._remove(names, [entry.path for entry in self._scan_files()])
+
+        with self._size_lock:
+            self._size = 0
+
+
+def _scan_directory(path: str):
+    """The files of a directory, without the temporary ones being written."""
+
+    try:
+        with os.scandir(path) as entries:
+            return [
+                entry
+                for entry in entries
+                if entry.is_file() and not entry.name.endswith(".tmp")
+            ]
+    except FileNotFoundError:
+        return []
+
+
+def _remove_work_directory(path: str, pid: int) -> None:
+    # Forked workers inherit the exit handlers, but the directory is their parent's.
+    if os.getpid() == pid:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def _remove_stale_work_directories(work_directory: str) -> None:
+    """Remove the scratch directories of processes of this machine that are gone, such
+    as pool workers, which exit without running exit handlers."""
+
+    # Probing processes with a signal only works on POSIX.
+    if os.name != "posix":
+        return
+
+    hostname = socket.gethostname()
+    for entry in os.scandir(work_directory):
+        entry_hostname, _, rest = entry.name.rpartition("_")[0].rpartition("_")
+        if entry_hostname != hostname or not rest.isdigit():
+            continue
+
+        try:
+            os.kill(int(rest), 0)
+        except ProcessLookupError:
+            shutil.rmtree(entry.path, ignore_errors=True)
+        except PermissionError:
+            # The process exists, but belongs to someone else.
+            pass
+
+
+_CACHE = None
+
+
+def get_cache() -> AssetCache:
+    """Get the shared cache, configured from the environment the first time.
+
+    Returns:
+        The shared cache.
+    """
+
+    global _CACHE
+    if _CACHE is None:
+        _CACHE = AssetCache(
+            directory=os.environ.get("ICEBERG_CACHE_DIR") or None,
+            max_size=int(os.environ.get("ICEBERG_CACHE_MAX_SIZE", _DEFAULT_MAX_SIZE)),
+            use_sqlite=os.environ.get("ICEBERG_CACHE_SQLITE", "") not in ("", "0"),
+        )
+    return _CACHE
+
+
+def configure_cache(
+    directory: str = None,
+    max_size: int = _DEFAULT_MAX_SIZE,
+    use_sqlite: bool = False,
+) -> AssetCache:
+    """Configure the shared cache.
+
+    The configuration is also exported to the environment, so that worker processes
+    use the same cache.
+
+    Args:
+        directory: The directory of the cache. Defaults to `~/.cache/iceberg`.
+        max_size: The maximum total size of the entries, in bytes.
+        use_sqlite: Whether to store the entries in a single SQLite database instead
+            of one file per entry.
+
+    Returns:
+        The shared cache.
+    """
+
+    global _CACHE
+    _CACHE = AssetCache(directory=directory, max_size=max_size, use_sqlite=use_sqlite)
+
+    os.environ["ICEBERG_CACHE_DIR"] = _CACHE.directory
+    os.environ["ICEBERG_CACHE_MAX_SIZE"] = str(max_size)
+    os.environ["ICEBERG_CACHE_SQLITE"] = "1" if use_sqlite else "0"
+
+    return _CACHE
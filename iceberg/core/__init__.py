@@ -9,6 +9,7 @@ from .properties import (
     AnimatableProperty,
 )
 from .drawable import Drawable, DrawableWithChild, drawable_field, dont_animate
+from .profiler import RenderProfiler
 from .renderer import Renderer, render_svg
 
 __all__ = [
@@ -24,6 +25,7 @@ __all__ = [
     "DrawableWithChild",
     "drawable_field",
     "dont_animate",
+    "RenderProfiler",
     "Renderer",
     "render_svg",
 ]
@@ -4,6 +4,7 @@ import typing
 import typing_extensions as tpe
 import types
 import functools
+import copy
 
 from abc import ABC, abstractmethod, abstractproperty
 from dataclasses import dataclass, MISSING
@@ -33,6 +34,18 @@ def copy_func(f):
 _scene_context_stack = []
 
 
+def _replace_drawables(value: Any, replacements: Dict[int, "Drawable"]) -> Any:
+    """Swap the drawables in `value`, looking inside lists and tuples."""
+
+    if isinstance(value, (list, tuple)):
+        new_value = [_replace_drawables(item, replacements) for item in value]
+        if all(new is old for new, old in zip(new_value, value)):
+            return value
+        return type(value)(new_value) if isinstance(value, tuple) else new_value
+
+    return replacements.get(id(value), value)
+
+
 class ChildNotFoundError(ValueError):
     """Raised when a child is not found in a drawable tree."""
 
@@ -126,8 +139,14 @@ class Drawable(ABC, DrawableBase):
 
         pass
 
+    # Whether the drawable depends on time by itself. Drawables that use `self._time` to
+    # draw themselves, without overriding `set_time` or `at`, should set this to True, so
+    # that `at` evaluates them. `set_time` always reaches every drawable in the tree.
+    time_dependent = False
+
     def __post_init__(self) -> None:
         self._time = 0
+        self._is_time_dependent = None
 
         self.setup()
 
@@ -193,6 +212,90 @@ class Drawable(ABC, DrawableBase):
         for child in self.children:
             child.set_time(t)
 
+    @property
+    def is_time_dependent(self) -> bool:
+        """Whether the drawable or any drawable below it depends on time.
+
+        This is computed once per drawable, as the tree of a drawable doesn't change after
+        it is set up.
+        """
+
+        if self._is_time_dependent is None:
+            cls = type(self)
+            self._is_time_dependent = (
+                cls.time_dependent
+                or cls.set_time is not Drawable.set_time
+                or cls.at is not Drawable.at
+                or any(child.is_time_dependent for child in self.children)
+            )
+
+        return self._is_time_dependent
+
+    def at(self, t: float) -> "Drawable":
+        """Evaluate the drawable at time t, without mutating it.
+
+        Unlike `set_time`, this returns a time-resolved tree and leaves the original tree
+        untouched, so the same drawable can be evaluated at several times concurrently.
+        Subtrees that don't depend on time are shared with the original tree, and only
+        the nodes above a time-dependent drawable are (shallowly) copied.
+
+        Drawables that override `set_time` or set `time_dependent` are copied, and
+        `set_time` is called on the copy, so they animate just like with `set_time`.
+        Drawables can override this method to return a static drawable for time t.
+
+        Args:
+            t: The time in seconds.
+
+        Returns:
+            The drawable at time t.
+        """
+
+        # Static subtrees are shared as they are.
+        if not self.is_time_dependent:
+            return self
+
+        children = self.children
+        resolved = [child.at(t) for child in children]
+        replacements = {
+            id(old): new for old, new in zip(children, resolved) if new is not old
+        }
+
+        cls = type(self)
+        if cls.time_dependent or cls.set_time is not Drawable.set_time:
+            drawable = self.with_time(t, replacements)
+            drawable.set_time(t)
+            return drawable
+
+        if not replacements:
+            return self
+
+        return self.with_time(t, replacements)
+
+    def with_time(
+        self, t: float, replacements: Optional[Dict[int, "Drawable"]] = None
+    ) -> "Drawable":
+        """Return a shallow copy of the drawable with its time set to t.
+
+        Args:
+            t: The time in seconds.
+            replacements: Drawables referenced by this drawable to swap in the copy, keyed
+                by the id of the drawable they replace.
+
+        Returns:
+            The copy of the drawable.
+        """
+
+        drawable = copy.copy(self)
+
+        if replacements:
+            for name, value in vars(self).items():
+                new_value = _replace_drawables(value, replacements)
+                if new_value is not value:
+                    setattr(drawable, name, new_value)
+
+        drawable._time = t
+        return drawable
+
     @property
     def relative_bounds(self) -> Bounds:
         """Get the bounds of the drawable relative to the current scene context.
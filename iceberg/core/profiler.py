@@ -0,0 +1,221 @@
+import contextlib
+import csv
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+
+class RenderProfiler(object):
+    """Records how long each stage of rendering takes, frame by frame.
+
+    The stages recorded by `Scene.render` and `Renderer` are:
+
+    - `make_frame`: Building the drawable tree of the frame (tweening, setup, layout).
+    - `draw`: Drawing the tree on the canvas.
+    - `readback`: Reading the pixels back from the surface.
+    - `convert`: Converting the pixels to the format of the encoder.
+    - `encode`: Encoding and writing the frame.
+
+    Example:
+        >>> profiler = RenderProfiler()
+        >>> scene.render("video.mp4", profiler=profiler)
+        >>> profiler.print_report()
+        >>> profiler.to_csv("profile.csv")
+    """
+
+    def __init__(self):
+        """Records how long each stage of rendering takes, frame by frame."""
+
+        self._frames: List[Dict[str, float]] = []
+        self._frame_indices: List[int] = []
+        self._current: Optional[Dict[str, float]] = None
+        # Time spent outside of any frame, e.g. flushing the encoder.
+        self._overhead: Dict[str, float] = {}
+        self._stages: List[str] = []
+
+    def begin_frame(self, index: int) -> None:
+        """Start recording a new frame.
+
+        Args:
+            index: The index of the frame.
+        """
+
+        self._current = {}
+        self._frames.append(self._current)
+        self._frame_indices.append(index)
+
+    def end_frame(self) -> None:
+        """Stop recording the current frame."""
+
+        self._current = None
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        """Time a stage of the current frame.
+
+        Stages timed outside of a frame are recorded as overhead, which counts towards
+        the totals but not towards the per-frame timings.
+
+        Args:
+            name: The name of the stage.
+        """
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+
+            if name not in self._stages:
+                self._stages.append(name)
+
+            record = self._current if self._current is not None else self._overhead
+            record[name] = record.get(name, 0.0) + elapsed
+
+    @property
+    def stages(self) -> List[str]:
+        """The names of the recorded stages, in the order they were first recorded."""
+
+        return list(self._stages)
+
+    @property
+    def num_frames(self) -> int:
+        return len(self._frames)
+
+    def records(self) -> List[Dict[str, float]]:
+        """The timings of every frame, in seconds.
+
+        Returns:
+            A list with one dictionary per frame, mapping `frame` to the frame index
+            and each stage to its duration.
+        """
+
+        return [
+            {"frame": index, **{stage: frame.get(stage, 0.0) for stage in self._stages}}
+            for index, frame in zip(self._frame_indices, self._frames)
+        ]
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Aggregate the timings of each stage.
+
+        Returns:
+            A dictionary mapping each stage to its `total`, `mean` and `max` durations
+            in seconds, its `share` of the total time, and the frames per second the
+            stage alone would run at.
+        """
+
+        totals = {
+            stage: sum(frame.get(stage, 0.0) for frame in self._frames)
+            + self._overhead.get(stage, 0.0)
+            for stage in self._stages
+        }
+        total_time = sum(totals.values())
+
+        summary = {}
+        for stage in self._stages:
+            per_frame = [frame.get(stage, 0.0) for frame in self._frames]
+            total = totals[stage]
+            summary[stage] = {
+                "total": total,
+                "mean": total / len(per_frame) if per_frame else 0.0,
+                "max": max(per_frame, default=0.0),
+                "share": total / total_time if total_time > 0 else 0.0,
+                "fps": len(per_frame) / total if total > 0 else float("inf"),
+            }
+
+        return summary
+
+    def report(self) -> str:
+        """Format the summary as a table.
+
+        Returns:
+            The table, with one row per stage and a row with the totals.
+        """
+
+        summary = self.summary()
+        total_time = sum(stats["total"] for stats in summary.values())
+
+        rows = [("stage", "total (s)", "mean (ms)", "max (ms)", "share", "fps")]
+        for stage, stats in summary.items():
+            rows.append(
+                (
+                    stage,
+                    f"{stats['total']:.3f}",
+                    f"{stats['mean'] * 1000:.2f}",
+                    f"{stats['max'] * 1000:.2f}",
+                    f"{stats['share'] * 100:.1f}%",
+                    f"{stats['fps']:.1f}",
+                )
+            )
+        rows.append(
+            (
+                "all",
+                f"{total_time:.3f}",
+                f"{total_time / self.num_frames * 1000:.2f}" if self.num_frames else "-",
+                "-",
+                "100.0%",
+                f"{self.num_frames / total_time:.1f}" if total_time > 0 else "-",
+            )
+        )
+
+        widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+        lines = [
+            "  ".join(
+                cell.ljust(width) if i == 0 else cell.rjust(width)
+                for i, (cell, width) in enumerate(zip(row, widths))
+            )
+            for row in rows
+        ]
+        lines.insert(1, "-" * len(lines[0]))
+
+        return "\n".join(lines)
+
+    def print_report(self) -> None:
+        """Print the summary table."""
+
+        print(self.report())
+
+    def to_csv(self, path: Union[str, Path]) -> None:
+        """Export the timings of every frame to a CSV file.
+
+        Args:
+            path: The path of the CSV file.
+        """
+
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=["frame"] + self._stages)
+            writer.writeheader()
+            writer.writerows(self.records())
+
+    def to_json(self, path: Union[str, Path]) -> None:
+        """Export the summary and the timings of every frame to a JSON file.
+
+        Args:
+            path: The path of the JSON file.
+        """
+
+        data = {
+            "summary": self.summary(),
+            "overhead": dict(self._overhead),
+            "frames": self.records(),
+        }
+
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
+
+
+def profile_stage(profiler: Optional[RenderProfiler], name: str):
+    """Time a stage with the profiler, or do nothing if there is no profiler.
+
+    Args:
+        profiler: The profiler, or None.
+        name: The name of the stage.
+
+    Returns:
+        A context manager timing the stage.
+    """
+
+    if profiler is None:
+        return contextlib.nullcontext()
+    return profiler.stage(name)
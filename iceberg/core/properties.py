@@ -1,6 +1,8 @@
+import collections
+import threading
 from dataclasses import dataclass
 
-from typing import List, Optional, Tuple
+from typing import FrozenSet, List, Optional, Sequence, Tuple
 from typing_extensions import Self
 from enum import Enum
 from abc import ABC, abstractclassmethod
@@ -30,6 +32,30 @@ class AnimatableProperty(ABC):
     def interpolate(cls, start: Self, end: Self, progress: float):
         pass
 
+    def numeric_components(self) -> Optional[Tuple[float, ...]]:
+        """The components of the property that are interpolated linearly.
+
+        Properties that return components here are tweened in bulk with every other
+        numeric value of the scene, instead of calling `interpolate` per frame.
+
+        Returns:
+            The components, or None if the property must be tweened with `interpolate`.
+        """
+
+        return None
+
+    def with_numeric_components(self, components: Sequence[float]) -> Self:
+        """Create a copy of the property with new numeric components.
+
+        Args:
+            components: The new components, in the order of `numeric_components`.
+
+        Returns:
+            The new property.
+        """
+
+        raise NotImplementedError
+
 
 def _interpolate_tuple(start, end, progress):
     return tuple(start[i] + (end[i] - start[i]) * progress for i in range(len(start)))
@@ -178,6 +204,12 @@ class Bounds(AnimatableProperty):
         vectors = _interpolate_tuple(vectorsA, vectorsB, progress)
         return Bounds(*vectors)
 
+    def numeric_components(self) -> Tuple[float, ...]:
+        return (self.top, self.left, self.bottom, self.right)
+
+    def with_numeric_components(self, components: Sequence[float]) -> "Bounds":
+        return Bounds(*components)
+
     def inset(self, dx: float, dy: Optional[float] = None) -> "Bounds":
         """Inset the bounds by the specified amount.
 
@@ -345,6 +377,12 @@ class Color(AnimatableProperty):
         vectors = _interpolate_tuple(vectorsA, vectorsB, progress)
         return Color(*vectors)
 
+    def numeric_components(self) -> Tuple[float, ...]:
+        return (self.r, self.g, self.b, self.a)
+
+    def with_numeric_components(self, components: Sequence[float]) -> "Color":
+        return Color(*components)
+
     @property
     def r(self) -> float:
         return self._r
@@ -507,6 +545,16 @@ class StrokeCap(Enum):
     SQUARE = skia.Paint.kSquare_Cap
 
 
+# Paints keyed by the values of the path styles that use them. Paints are immutable
+# once created, so all path styles with the same values share a single paint.
+_PAINT_CACHE = collections.OrderedDict()
+_PAINT_CACHE_SIZE = 4096
+
+# Guards the paint, typeface and font caches, as frames may be built from several
+# threads, e.g. by the preview server. Values are created outside of the lock.
+_STYLE_CACHE_LOCK = threading.Lock()
+
+
 class PathStyle(AnimatableProperty):
     """A style for drawing paths."""
 
@@ -543,21 +591,43 @@ class PathStyle(AnimatableProperty):
         self._dash_intervals = dash_intervals
         self._dash_phase = dash_phase
 
-        self._skia_paint = skia.Paint(
-            Style=skia.Paint.kStroke_Style if stroke else skia.Paint.kFill_Style,
-            AntiAlias=anti_alias,
-            StrokeWidth=thickness,
-            Color4f=color.to_skia(),
-            StrokeCap=stroke_cap.value,
+        # Created on first use, see `skia_paint`.
+        self._skia_paint = None
+
+    def _paint_key(self) -> Tuple:
+        return (
+            self._color,
+            self._thickness,
+            self._anti_alias,
+            self._stroke,
+            self._stroke_cap,
+            self._dashed,
+            tuple(self._dash_intervals) if self._dashed else None,
+            self._dash_phase if self._dashed else None,
+        )
+
+    def _make_skia_paint(self) -> skia.Paint:
+        return skia.Paint(
+            Style=skia.Paint.kStroke_Style if self._stroke else skia.Paint.kFill_Style,
+            AntiAlias=self._anti_alias,
+            StrokeWidth=self._thickness,
+            Color4f=self._color.to_skia(),
+            StrokeCap=self._stroke_cap.value,
             PathEffect=skia.DashPathEffect.Make(
-                intervals=dash_intervals, phase=dash_phase
+                intervals=self._dash_intervals, phase=self._dash_phase
             )
-            if dashed
+            if self._dashed
             else None,
         )
 
     @classmethod
     def interpolate(cls, start: Self, end: Self, progress: float):
+        # Nothing to interpolate, the non-numeric values are always taken from start.
+        if start is end or (
+            start.color == end.color and start.thickness == end.thickness
+        ):
+            return start
+
         return PathStyle(
             Color.interpolate(start.color, end.color, progress),
             start.thickness + (end.thickness - start.thickness) * progress,
@@ -569,6 +639,22 @@ class PathStyle(AnimatableProperty):
             start._dash_phase,
         )
 
+    def numeric_components(self) -> Tuple[float, ...]:
+        return (*self.color.numeric_components(), self.thickness)
+
+    def with_numeric_components(self, components: Sequence[float]) -> "PathStyle":
+        r, g, b, a, thickness = components
+        return PathStyle(
+            Color(r, g, b, a),
+            thickness,
+            self.anti_alias,
+            self._stroke,
+            self._stroke_cap,
+            self._dashed,
+            self._dash_intervals,
+            self._dash_phase,
+        )
+
     @property
     def color(self) -> Color:
         return self._color
@@ -581,14 +667,91 @@ class PathStyle(AnimatableProperty):
     def anti_alias(self) -> bool:
         return self._anti_alias
 
+    @property
+    def stroke(self) -> bool:
+        return self._stroke
+
+    @property
+    def stroke_cap(self) -> StrokeCap:
+        return self._stroke_cap
+
+    @property
+    def dashed(self) -> bool:
+        return self._dashed
+
+    @property
+    def stroke_geometry(self) -> Tuple:
+        """The values that determine the outline of a stroked path, unlike the color:
+        whether the path is stroked, the thickness, the cap, the join, the miter limit
+        and the dashes.
+        """
+
+        paint = self.skia_paint
+        return (
+            self._stroke,
+            self._thickness,
+            self._stroke_cap,
+            paint.getStrokeJoin(),
+            paint.getStrokeMiter(),
+            self._dashed,
+            tuple(self._dash_intervals) if self._dashed else None,
+            self._dash_phase if self._dashed else None,
+        )
+
     @property
     def skia_paint(self) -> skia.Paint:
+        """The paint of the path style, shared by all path styles with the same values.
+
+        The paint should not be modified.
+        """
+
+        if self._skia_paint is None:
+            key = self._paint_key()
+            with _STYLE_CACHE_LOCK:
+                paint = _PAINT_CACHE.get(key)
+                if paint is not None:
+                    _PAINT_CACHE.move_to_end(key)
+
+            if paint is None:
+                paint = self._make_skia_paint()
+                with _STYLE_CACHE_LOCK:
+                    paint = _PAINT_CACHE.setdefault(key, paint)
+                    if len(_PAINT_CACHE) > _PAINT_CACHE_SIZE:
+                        _PAINT_CACHE.popitem(last=False)
+
+            self._skia_paint = paint
+
         return self._skia_paint
 
     def __repr__(self) -> str:
         return f"PathStyle({self.color}, {self.thickness}, {self.anti_alias}, {self._stroke}, {self._stroke_cap})"
 
 
+# Typefaces loaded so far, keyed by (filename or family, style). Loading a typeface
+# parses the font file, so it is only done once per process.
+_TYPEFACE_CACHE = {}
+
+# Fonts keyed by (typeface key, size). Animated texts can go through many sizes, so
+# only the most recently used fonts are kept.
+_FONT_CACHE = collections.OrderedDict()
+_FONT_CACHE_SIZE = 1024
+
+# The families of the system fonts, listed once per process.
+_AVAILABLE_FONTS: Optional[FrozenSet[str]] = None
+_AVAILABLE_FONTS_LIST: Optional[List[str]] = None
+
+
+def _available_font_families() -> FrozenSet[str]:
+    global _AVAILABLE_FONTS, _AVAILABLE_FONTS_LIST
+
+    # Listing the fonts goes through the system font manager, which is slow.
+    if _AVAILABLE_FONTS is None:
+        _AVAILABLE_FONTS_LIST = list(skia.FontMgr())
+        _AVAILABLE_FONTS = frozenset(_AVAILABLE_FONTS_LIST)
+
+    return _AVAILABLE_FONTS
+
+
 @dataclass
 class FontStyle(object):
     class Style(Enum):
@@ -606,8 +769,7 @@ class FontStyle(object):
     anti_alias: bool = True
 
     def __post_init__(self):
-        families = set(FontStyle.available_fonts())
-        if self.filename is None and self.family not in families:
+        if self.filename is None and self.family not in _available_font_families():
             raise ValueError(
                 f"Invalid font family: {self.family}. Please call FontStyle.available_fonts() to get the list of available fonts."
             )
@@ -619,18 +781,65 @@ class FontStyle(object):
             Color4f=self.color.to_skia(),
         )
 
-    def get_skia_font(self) -> skia.Font:
+    def _typeface_key(self):
         if self.filename is not None:
-            return skia.Font(
-                skia.Typeface.MakeFromFile(self.filename),
-                self.size,
-            )
+            return ("file", self.filename)
+        return ("family", self.family, self.font_style)
 
-        return skia.Font(
-            skia.Typeface(self.family, self.font_style.value),
-            self.size,
-        )
+    def get_skia_typeface(self) -> skia.Typeface:
+        """Get the typeface of the font style, loading it only once per process."""
+
+        key = self._typeface_key()
+        with _STYLE_CACHE_LOCK:
+            typeface = _TYPEFACE_CACHE.get(key)
+
+        if typeface is None:
+            if self.filename is not None:
+                typeface = skia.Typeface.MakeFromFile(self.filename)
+            else:
+                typeface = skia.Typeface(self.family, self.font_style.value)
+            with _STYLE_CACHE_LOCK:
+                typeface = _TYPEFACE_CACHE.setdefault(key, typeface)
+
+        return typeface
+
+    def get_skia_font(self) -> skia.Font:
+        """Get the font of the font style.
+
+        Fonts are cached and shared by all font styles with the same typeface and size,
+        so the returned font should not be modified.
+        """
+
+        key = (self._typeface_key(), self.size)
+        with _STYLE_CACHE_LOCK:
+            font = _FONT_CACHE.get(key)
+            if font is not None:
+                _FONT_CACHE.move_to_end(key)
+
+        if font is None:
+            font = skia.Font(self.get_skia_typeface(), self.size)
+            with _STYLE_CACHE_LOCK:
+                font = _FONT_CACHE.setdefault(key, font)
+                if len(_FONT_CACHE) > _FONT_CACHE_SIZE:
+                    _FONT_CACHE.popitem(last=False)
+
+        return font
+
+    @staticmethod
+    def warm_up(*font_styles: "FontStyle") -> None:
+        """Load the available fonts and the typefaces of the given font styles ahead of
+        time, e.g. at startup, so that the first frames don't pay for it.
+
+        Args:
+            font_styles: The font styles to load.
+        """
+
+        _available_font_families()
+
+        for font_style in font_styles:
+            font_style.get_skia_font()
 
     @staticmethod
     def available_fonts() -> List[str]:
-        return list(skia.FontMgr())
+        _available_font_families()
+        return list(_AVAILABLE_FONTS_LIST)
@@ -1,6 +1,8 @@
+import contextlib
 from pathlib import Path
-from typing import Union
+from typing import Optional, Union
 from .drawable import Drawable
+from .profiler import RenderProfiler, profile_stage
 from .properties import Color
 
 import skia
@@ -54,12 +56,19 @@ def _canvas_draw_commands(canvas, drawable: Drawable, background_color: Color =
 
 
 class Renderer(object):
-    def __init__(self, gpu: bool = False, skia_surface=None):
+    def __init__(
+        self,
+        gpu: bool = False,
+        skia_surface=None,
+        profiler: Optional[RenderProfiler] = None,
+    ):
         """Creates a new Renderer.
 
         Args:
             gpu: Whether to use the GPU for rendering.
             skia_surface: A Skia surface to render to. If None, a new surface will be created.
+            profiler: If specified, the time spent drawing and reading back pixels is
+                recorded with this profiler.
 
         Returns:
             A new Renderer.
@@ -73,6 +82,26 @@ class Renderer(object):
         self._skia_surface = skia_surface
         self._bounds = None
         self._drawable = None
+        self.profiler = profiler
+
+    @contextlib.contextmanager
+    def use_profiler(self, profiler: Optional[RenderProfiler]):
+        """Temporarily record the rendering stages with the given profiler.
+
+        Args:
+            profiler: The profiler to use. If None, the current profiler is kept.
+        """
+
+        if profiler is None:
+            yield
+            return
+
+        previous_profiler = self.profiler
+        self.profiler = profiler
+        try:
+            yield
+        finally:
+            self.profiler = previous_profiler
 
     def _try_create_skia_surface(self, drawable: Drawable):
         self._drawable = drawable
@@ -99,10 +128,11 @@ class Renderer(object):
             background_color: The background color to use. If None, the background will be transparent.
         """
 
-        self._try_create_skia_surface(drawable)
+        with profile_stage(self.profiler, "draw"):
+            self._try_create_skia_surface(drawable)
 
-        with self._skia_surface as canvas:
-            _canvas_draw_commands(canvas, drawable, background_color)
+            with self._skia_surface as canvas:
+                _canvas_draw_commands(canvas, drawable, background_color)
 
     def get_rendered_image(self) -> np.ndarray:
         """Returns the rendered image as a numpy array.
@@ -112,8 +142,9 @@ class Renderer(object):
         """
 
         # TODO(revalo): Convert BGR to RGB via Skia.
-        image = self._skia_surface.makeImageSnapshot()
-        array = image.toarray(colorType=skia.ColorType.kRGBA_8888_ColorType)
+        with profile_stage(self.profiler, "readback"):
+            image = self._skia_surface.makeImageSnapshot()
+            array = image.toarray(colorType=skia.ColorType.kRGBA_8888_ColorType)
 
         return array
 
@@ -23,8 +23,16 @@ from .layout import (
 )
 from .text import SimpleText, Text
 from .svg import SVG, SVGPath
-from .latex import Tex, MathTex, Brace
-from .typst import Typst, MathTypst
+from .latex import (
+    Tex,
+    MathTex,
+    Brace,
+    compile_tex_batch,
+    compile_tex_batch_svgs,
+    prefetch_tex,
+    prefetch_tex_async,
+)
+from .typst import Typst, MathTypst, prefetch_typst, prefetch_typst_async
 from .filters import Blur, Opacity
 from .image import Image
 from .splines import SmoothPath, CubicBezier
@@ -69,4 +77,10 @@ __all__ = [
     "CubicBezier",
     "SVGPath",
     "Brace",
+    "compile_tex_batch",
+    "compile_tex_batch_svgs",
+    "prefetch_tex",
+    "prefetch_tex_async",
+    "prefetch_typst",
+    "prefetch_typst_async",
 ]
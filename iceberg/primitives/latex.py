@@ -2,85 +2,265 @@
 https://github.com/ManimCommunity/manim
 """
 
+import asyncio
+import concurrent.futures
+import glob
 import os
 import re
 import shutil
+import subprocess
+import threading
+from typing import Callable, Dict, List, Sequence, Tuple, TypeVar
 
 from absl import logging
 
 from iceberg import Color, Colors, DrawableWithChild
+from iceberg.cache import get_cache
 from iceberg.primitives.svg import SVG, SVGPath
-from iceberg.utils import temp_directory, temp_filename
+from iceberg.utils import (
+    CommandSteps,
+    asset_file,
+    in_flight_future,
+    process_pool,
+    run_commands,
+    run_commands_async,
+    temp_filename,
+    track_in_flight,
+)
 
 
 class LatexError(Exception):
     pass
 
 
-def _create_tex_svg(full_tex: str, svg_file: str, compiler: str):
+T = TypeVar("T")
+
+
+def _tex_program(compiler: str) -> Tuple[List[str], str]:
     if compiler == "latex":
-        program = "latex"
+        program = ["latex"]
         dvi_ext = ".dvi"
     elif compiler == "xelatex":
-        program = "xelatex -no-pdf"
+        program = ["xelatex", "-no-pdf"]
         dvi_ext = ".xdv"
     else:
         raise NotImplementedError(f"Compiler '{compiler}' is not implemented")
 
-    # Check if program is installed.
-    if shutil.which(program.split()[0]) is None:
-        raise LatexError(
-            f"Program '{program.split()[0]}' is not installed for LaTeX rendering. "
-            f"Please install it and make it available in your PATH environment variable."
-        )
+    # Check if the programs are installed.
+    for executable in (program[0], "dvisvgm"):
+        if shutil.which(executable) is None:
+            raise LatexError(
+                f"Program '{executable}' is not installed for LaTeX rendering. "
+                f"Please install it and make it available in your PATH environment "
+                f"variable."
+            )
+
+    return program, dvi_ext
+
+
+def _run_tex(
+    program: List[str], tex: str, root: str, format_file: str = None
+) -> CommandSteps:
+    """Run LaTeX on a document.
+
+    Args:
+        program: The LaTeX program to run, with its arguments.
+        tex: The LaTeX document.
+        root: The path of the document, without the extension.
+        format_file: The precompiled format to load, without the extension, or None
+            to use the default format of the program.
+
+    Returns:
+        None if the document compiled, or else the error from the log.
+    """
 
     # Write tex file
-    root, _ = os.path.splitext(svg_file)
     with open(root + ".tex", "w", encoding="utf-8") as tex_file:
-        tex_file.write(full_tex)
+        tex_file.write(tex)
 
     # tex to dvi
-    if os.system(
-        " ".join(
-            (
-                program,
-                "-interaction=batchmode",
-                "-halt-on-error",
-                f'-output-directory="{os.path.dirname(svg_file)}"',
-                f'"{root}.tex"',
-                ">",
-                os.devnull,
-            )
-        )
-    ):
-        logging.error("LaTeX Error!  Not a worry, it happens to the best of us.")
-        error_str = ""
+    returncode, _ = yield [
+        *program,
+        *((f"-fmt={format_file}",) if format_file is not None else ()),
+        "-interaction=batchmode",
+        "-halt-on-error",
+        f"-output-directory={os.path.dirname(root)}",
+        f"{root}.tex",
+    ]
+    if returncode == 0:
+        return None
+
+    error_str = ""
+    try:
         with open(root + ".log", "r", encoding="utf-8") as log_file:
             error_match_obj = re.search(r"(?<=\n! ).*\n.*\n", log_file.read())
-            if error_match_obj:
-                error_str = error_match_obj.group()
-                logging.debug(
-                    f"The error could be:\n`{error_str}`",
-                )
-        raise LatexError(error_str)
+    except FileNotFoundError:
+        error_match_obj = None
+    if error_match_obj:
+        error_str = error_match_obj.group()
+    return error_str
 
-    # dvi to svg
-    os.system(
-        " ".join(
-            (
-                "dvisvgm",
-                f'"{root}{dvi_ext}"',
-                "-n",
-                "-v",
-                "0",
-                "-o",
-                f'"{svg_file}"',
-                ">",
-                os.devnull,
+
+# Preambles whose precompiled format turned out not to work in this process.
+_BROKEN_FORMATS = set()
+
+# The first line of `<program> --version`, keyed by the program.
+_ENGINE_VERSIONS: Dict[str, str] = {}
+
+
+def _engine_version(executable: str) -> str:
+    """The version of a TeX engine, which formats are only compatible with."""
+
+    version = _ENGINE_VERSIONS.get(executable)
+    if version is None:
+        try:
+            process = subprocess.run(
+                [executable, "--version"], capture_output=True, text=True
             )
-        )
+            version = process.stdout.partition("\n")[0]
+        except OSError:
+            version = ""
+        _ENGINE_VERSIONS[executable] = version
+    return version
+
+
+def _preamble_format(header: str, compiler: str) -> CommandSteps:
+    """Get a precompiled format of a preamble, dumping it if it doesn't exist yet.
+
+    Loading a format is much faster than loading the packages of the preamble again
+    for every document. Formats are cached by the hash of the preamble and of the
+    version of the engine, as a format only works with the engine that dumped it.
+
+    Args:
+        header: The document class and preamble of the document.
+        compiler: The LaTeX compiler to use.
+
+    Returns:
+        The format file without the extension, or None if the preamble couldn't be
+        precompiled.
+    """
+
+    program, _ = _tex_program(compiler)
+    name = "preamble_" + temp_filename(
+        preamble=header, compiler=compiler, version=_engine_version(program[0])
+    )
+    cache = get_cache()
+    format_file = os.path.join(cache.subdirectory("formats"), name)
+
+    if format_file in _BROKEN_FORMATS:
+        return None
+    if os.path.exists(format_file + ".fmt"):
+        cache.mark_used(format_file + ".fmt")
+        return format_file
+
+    # Dump in the scratch directory and move the format into place when it's complete,
+    # so concurrent compilations never load a partial format.
+    job_file = cache.scratch_path(name)
+    job_name = os.path.basename(job_file)
+    with open(job_file + ".tex", "w", encoding="utf-8") as tex_file:
+        tex_file.write(header + "\n\n\\dump\n")
+
+    # Load the default format of the program, read the preamble, and dump the state.
+    returncode, _ = yield [
+        program[0],
+        "-ini",
+        "-interaction=batchmode",
+        "-halt-on-error",
+        f"-jobname={job_name}",
+        f"-output-directory={os.path.dirname(job_file)}",
+        f"&{program[0]}",
+        f"{job_file}.tex",
+    ]
+
+    for ext in (".tex", ".log"):
+        try:
+            os.remove(job_file + ext)
+        except FileNotFoundError:
+            pass
+
+    if returncode or not os.path.exists(job_file + ".fmt"):
+        logging.warning("Couldn't precompile the LaTeX preamble, loading it every time.")
+        _BROKEN_FORMATS.add(format_file)
+        try:
+            os.remove(job_file + ".fmt")
+        except FileNotFoundError:
+            pass
+        return None
+
+    os.replace(job_file + ".fmt", format_file + ".fmt")
+    cache.add_file(format_file + ".fmt")
+    return format_file
+
+
+def _compile_tex(header: str, body: str, root: str, compiler: str) -> CommandSteps:
+    """Compile a LaTeX document to DVI, using a precompiled format of its preamble.
+
+    Args:
+        header: The document class and preamble of the document.
+        body: The document environment of the document.
+        root: The path of the document, without the extension.
+        compiler: The LaTeX compiler to use.
+
+    Returns:
+        The extension of the DVI file.
+    """
+
+    program, dvi_ext = _tex_program(compiler)
+
+    format_file = yield from _preamble_format(header, compiler)
+    if format_file is not None:
+        error_str = yield from _run_tex(program, body, root, format_file)
+        if error_str is None:
+            return dvi_ext
+
+        # TeX only writes errors to the log once the format is loaded, so an error in
+        # the log is in the document itself, which the full document won't fix.
+        if error_str:
+            _raise_tex_error(error_str, root, dvi_ext)
+
+    error_str = yield from _run_tex(program, header + "\n\n" + body, root)
+    if error_str is None:
+        if format_file is not None:
+            # The document is fine, so the format is to blame, at least on this
+            # machine. It is shared with other machines, where it may work, so it is
+            # only skipped by this process. Unless it was just evicted, in which case
+            # it is dumped again next time.
+            if os.path.exists(format_file + ".fmt"):
+                logging.warning(
+                    "The precompiled LaTeX preamble doesn't work, loading it every time."
+                )
+                _BROKEN_FORMATS.add(format_file)
+        return dvi_ext
+
+    _raise_tex_error(error_str, root, dvi_ext)
+
+
+def _raise_tex_error(error_str: str, root: str, dvi_ext: str):
+    logging.error("LaTeX Error!  Not a worry, it happens to the best of us.")
+    logging.debug(
+        f"The error could be:\n`{error_str}`",
     )
+    _cleanup_tex(root, dvi_ext)
+    raise LatexError(error_str)
 
+
+def _dvi_to_svg(
+    root: str, dvi_ext: str, svg_file: str, pages: str = None
+) -> CommandSteps:
+    # dvi to svg
+    yield [
+        "dvisvgm",
+        f"{root}{dvi_ext}",
+        *((f"--page={pages}",) if pages is not None else ()),
+        "-n",
+        "-v",
+        "0",
+        "-o",
+        svg_file,
+    ]
+
+
+def _cleanup_tex(root: str, dvi_ext: str):
     # Cleanup superfluous documents
     for ext in (".tex", dvi_ext, ".log", ".aux"):
         try:
@@ -89,28 +269,461 @@ def _create_tex_svg(full_tex: str, svg_file: str, compiler: str):
             pass
 
 
+_DOCUMENT_CLASS = "\\documentclass[preview]{standalone}"
+
+# Puts each standalone environment on its own page.
+_MULTI_PAGE_DOCUMENT_CLASS = "\\documentclass[preview,multi=true]{standalone}"
+
+
+def _tex_header(document_class: str, preamble: str) -> str:
+    return document_class + "\n\n" + preamble
+
+
+def _tex_body(*contents: str) -> str:
+    return "\n\n".join(("\\begin{document}", *contents, "\\end{document}")) + "\n"
+
+
+def _tex_document(content: str, preamble: str) -> str:
+    return _tex_header(_DOCUMENT_CLASS, preamble) + "\n\n" + _tex_body(content)
+
+
+def _put_svg(svg_name: str, svg_file: str) -> bytes:
+    """Move a compiled SVG into the cache.
+
+    Args:
+        svg_name: The name of the SVG in the cache.
+        svg_file: The compiled SVG file, which is moved into the cache.
+
+    Returns:
+        The content of the SVG.
+    """
+
+    if not os.path.exists(svg_file):
+        raise LatexError(f"dvisvgm couldn't convert the LaTeX output to {svg_file}.")
+
+    with open(svg_file, "rb") as f:
+        svg = f.read()
+    get_cache().put_file(svg_name, svg_file)
+    return svg
+
+
+def _tex_svg_steps(
+    content: str, preamble: str, svg_name: str, compiler: str
+) -> CommandSteps:
+    # Compile in the scratch directory, whose files no other process touches.
+    root = get_cache().scratch_path(os.path.splitext(svg_name)[0])
+    dvi_ext = yield from _compile_tex(
+        _tex_header(_DOCUMENT_CLASS, preamble), _tex_body(content), root, compiler
+    )
+    yield from _dvi_to_svg(root, dvi_ext, root + ".svg")
+    _cleanup_tex(root, dvi_ext)
+    return _put_svg(svg_name, root + ".svg")
+
+
+def _create_tex_svg(content: str, preamble: str, svg_name: str, compiler: str) -> bytes:
+    return run_commands(_tex_svg_steps(content, preamble, svg_name, compiler))
+
+
+def _tex_svg_name(content: str, preamble: str) -> str:
+    full_tex = _tex_document(content, preamble)
+    return temp_filename(tex=full_tex) + ".svg"
+
+
+def _create_tex_svgs(contents: Sequence[str], preamble: str, compiler: str):
+    """Compile many expressions with one run of LaTeX and one of dvisvgm.
+
+    The expressions are put on the pages of one multi-page standalone document, whose
+    pages are then split into the same SVGs that compiling each expression on its
+    own would produce.
+
+    Args:
+        contents: The LaTeX code of each expression.
+        preamble: The LaTeX preamble shared by the expressions.
+        compiler: The LaTeX compiler to use.
+    """
+
+    cache = get_cache()
+    svg_names = [_tex_svg_name(content, preamble) for content in contents]
+
+    header = _tex_header(_MULTI_PAGE_DOCUMENT_CLASS, preamble)
+    body = _tex_body(
+        *(
+            f"\\begin{{standalone}}\n{content}\n\\end{{standalone}}"
+            for content in contents
+        )
+    )
+    root = cache.scratch_path(temp_filename(tex_batch=header + body))
+
+    def _create_one_by_one():
+        for content, svg_name in zip(contents, svg_names):
+            if not cache.contains(svg_name):
+                _create_tex_svg(content, preamble, svg_name, compiler)
+
+    try:
+        dvi_ext = run_commands(_compile_tex(header, body, root, compiler))
+    except LatexError:
+        # Compile the expressions one by one, so the error points to the right one.
+        _create_one_by_one()
+        return
+
+    # dvisvgm replaces %p with the number of each page.
+    run_commands(_dvi_to_svg(root, dvi_ext, f"{root}-%p.svg", pages="1-"))
+    _cleanup_tex(root, dvi_ext)
+
+    pages = {}
+    for page_file in glob.glob(glob.escape(root) + "-*.svg"):
+        page_number = page_file[len(root) + 1 : -len(".svg")]
+        if page_number.isdigit():
+            pages[int(page_number)] = page_file
+
+    if sorted(pages) == list(range(1, len(contents) + 1)):
+        for page_number, svg_name in enumerate(svg_names, start=1):
+            _put_svg(svg_name, pages[page_number])
+        return
+
+    # An expression didn't produce exactly one page, so the pages can't be matched.
+    logging.warning(
+        f"Expected {len(contents)} pages from the batched LaTeX document, but got "
+        f"{len(pages)}. Compiling the expressions one by one instead."
+    )
+    for page_file in pages.values():
+        os.remove(page_file)
+    _create_one_by_one()
+
+
+class _TexCollector(object):
+    """Collects the expressions that aren't cached yet, while a build is being
+    dry-run by `build_with_tex_batch`."""
+
+    def __init__(self):
+        # Keyed by (preamble, compiler), so each group can share one document.
+        self.pending: Dict[Tuple[str, str], Dict[str, None]] = {}
+
+    def add(self, content: str, preamble: str, compiler: str):
+        self.pending.setdefault((preamble, compiler), {})[content] = None
+
+    def compile(self):
+        for (preamble, compiler), contents in self.pending.items():
+            compile_tex_batch_svgs(list(contents), preamble, compiler)
+
+
+# The collectors of the builds that are currently being dry-run, per thread, so that
+# drawables built by other threads in the meantime are compiled as usual.
+_TEX_COLLECTORS = threading.local()
+
+
+def _tex_collectors() -> List[_TexCollector]:
+    collectors = getattr(_TEX_COLLECTORS, "stack", None)
+    if collectors is None:
+        collectors = _TEX_COLLECTORS.stack = []
+    return collectors
+
+# Stands in for expressions that aren't compiled yet during a dry run.
+_PLACEHOLDER_SVG = (
+    '<svg xmlns="http://www.w3.org/2000/svg" width="1" height="1" viewBox="0 0 1 1"/>'
+)
+
+
+def compile_tex_batch(
+    contents: Sequence[str],
+    preamble: str = None,
+    compiler: str = "latex",
+) -> List[str]:
+    """Compile many LaTeX expressions at once, see `compile_tex_batch_svgs`.
+
+    Args:
+        contents: The LaTeX code of each expression, as passed to `Tex`.
+        preamble: The LaTeX preamble to use. Defaults to the preamble of `Tex`.
+        compiler: The LaTeX compiler to use.
+
+    Returns:
+        The SVG file of each expression.
+    """
+
+    if preamble is None:
+        preamble = _DEFAULT_PREAMBLE
+
+    svgs = compile_tex_batch_svgs(contents, preamble, compiler)
+    return [
+        asset_file(_tex_svg_name(content, preamble), svg)
+        for content, svg in zip(contents, svgs)
+    ]
+
+
+def compile_tex_batch_svgs(
+    contents: Sequence[str],
+    preamble: str = None,
+    compiler: str = "latex",
+) -> List[str]:
+    """Compile many LaTeX expressions at once.
+
+    Expressions that aren't cached yet are compiled together, with a single run of
+    LaTeX and dvisvgm, which is much faster than compiling them one at a time.
+
+    Args:
+        contents: The LaTeX code of each expression, as passed to `Tex`.
+        preamble: The LaTeX preamble to use. Defaults to the preamble of `Tex`.
+        compiler: The LaTeX compiler to use.
+
+    Returns:
+        The SVG of each expression.
+    """
+
+    if preamble is None:
+        preamble = _DEFAULT_PREAMBLE
+
+    cache = get_cache()
+
+    missing = {}
+    for content in contents:
+        svg_name = _tex_svg_name(content, preamble)
+        if not cache.contains(svg_name):
+            missing[content] = svg_name
+
+    if len(missing) == 1:
+        ((content, svg_name),) = missing.items()
+        _create_tex_svg(content, preamble, svg_name, compiler)
+    elif missing:
+        _create_tex_svgs(list(missing), preamble, compiler)
+
+    return [tex_content_to_svg(content, preamble, compiler) for content in contents]
+
+
+def build_with_tex_batch(build: Callable[[], T]) -> T:
+    """Call a function that builds drawables, compiling all of their LaTeX at once.
+
+    The function is first dry-run with placeholders for the expressions that aren't
+    cached, which are then compiled in one batch before the function is called again.
+    If everything is already cached, the result of the first call is returned.
+
+    The function must work with 1x1 placeholders in place of the expressions and must
+    be safe to call twice. Exceptions raised by the dry run are raised as they are.
+    Otherwise, compile the expressions ahead of time with `prefetch_tex` instead.
+
+    Args:
+        build: The function building the drawables. It may be called twice.
+
+    Returns:
+        The result of the function.
+    """
+
+    collector = _TexCollector()
+    collectors = _tex_collectors()
+    collectors.append(collector)
+    try:
+        result = build()
+    finally:
+        collectors.remove(collector)
+
+    if not collector.pending:
+        return result
+
+    collector.compile()
+    return build()
+
+
+# The SVGs being compiled on the process pool, and the futures compiling them.
+_IN_FLIGHT: Dict[str, concurrent.futures.Future] = {}
+
+# The SVGs being compiled with asyncio subprocesses, and the tasks compiling them.
+_ASYNC_IN_FLIGHT: Dict[str, asyncio.Future] = {}
+
+
+def tex_content_to_svg(
+    content: str,
+    preamble: str,
+    compiler: str = "latex",
+) -> str:
+    cache = get_cache()
+    svg_name = _tex_svg_name(content, preamble)
+
+    svg = cache.get(svg_name)
+    future = in_flight_future(_IN_FLIGHT, svg_name) if svg is None else None
+    if future is not None:
+        # Already being compiled in the background. If that fails, it's compiled
+        # again below, to raise the error here.
+        concurrent.futures.wait([future])
+        svg = cache.get(svg_name)
+
+    if svg is None:
+        collectors = _tex_collectors()
+        if collectors:
+            # Dry run: compile later, together with the rest of the build.
+            collectors[-1].add(content, preamble, compiler)
+            return _PLACEHOLDER_SVG
+
+        with cache.lock(svg_name):
+            # Another process may have compiled it while this one waited for the lock.
+            svg = cache.get(svg_name)
+            if svg is None:
+                svg = _create_tex_svg(content, preamble, svg_name, compiler)
+
+    return svg.decode("utf-8")
+
+
 def tex_content_to_svg_file(
     content: str,
     preamble: str,
     compiler: str = "latex",
 ) -> str:
-    full_tex = (
-        "\n\n".join(
-            (
-                "\\documentclass[preview]{standalone}",
-                preamble,
-                "\\begin{document}",
-                content,
-                "\\end{document}",
+    svg = tex_content_to_svg(content, preamble, compiler)
+    return asset_file(_tex_svg_name(content, preamble), svg)
+
+
+async def tex_content_to_svg_async(
+    content: str,
+    preamble: str = None,
+    compiler: str = "latex",
+) -> str:
+    """Compile a LaTeX expression with asyncio subprocesses.
+
+    Args:
+        content: The LaTeX code of the expression, as passed to `Tex`.
+        preamble: The LaTeX preamble to use. Defaults to the preamble of `Tex`.
+        compiler: The LaTeX compiler to use.
+
+    Returns:
+        The SVG of the expression.
+    """
+
+    if preamble is None:
+        preamble = _DEFAULT_PREAMBLE
+
+    cache = get_cache()
+    svg_name = _tex_svg_name(content, preamble)
+
+    svg = cache.get(svg_name)
+    future = in_flight_future(_IN_FLIGHT, svg_name) if svg is None else None
+    if future is not None:
+        await asyncio.gather(asyncio.wrap_future(future), return_exceptions=True)
+        svg = cache.get(svg_name)
+
+    if svg is None:
+        # Entries are written atomically, so compiling the same expression as another
+        # process is only wasted work. Holding the lock would block the event loop.
+        task = in_flight_future(_ASYNC_IN_FLIGHT, svg_name)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(
+                run_commands_async(
+                    _tex_svg_steps(content, preamble, svg_name, compiler)
+                )
             )
-        )
-        + "\n"
+            track_in_flight(_ASYNC_IN_FLIGHT, [svg_name], task)
+        svg = await task
+
+    return svg.decode("utf-8")
+
+
+async def tex_content_to_svg_file_async(
+    content: str,
+    preamble: str = None,
+    compiler: str = "latex",
+) -> str:
+    """Compile a LaTeX expression with asyncio subprocesses.
+
+    Args:
+        content: The LaTeX code of the expression, as passed to `Tex`.
+        preamble: The LaTeX preamble to use. Defaults to the preamble of `Tex`.
+        compiler: The LaTeX compiler to use.
+
+    Returns:
+        The SVG file of the expression.
+    """
+
+    if preamble is None:
+        preamble = _DEFAULT_PREAMBLE
+
+    svg = await tex_content_to_svg_async(content, preamble, compiler)
+    return asset_file(_tex_svg_name(content, preamble), svg)
+
+
+def prefetch_tex(
+    contents: Sequence[str],
+    preamble: str = None,
+    compiler: str = "latex",
+) -> List[concurrent.futures.Future]:
+    """Start compiling LaTeX expressions in the background, on a pool of processes.
+
+    The expressions that aren't cached yet are split into one batch per core, and each
+    batch is compiled with `compile_tex_batch`. Constructing a `Tex` or `MathTex` whose
+    expression is still being compiled waits for it, instead of compiling it again.
+
+    Args:
+        contents: The LaTeX code of each expression, as passed to `Tex`.
+        preamble: The LaTeX preamble to use. Defaults to the preamble of `Tex`.
+        compiler: The LaTeX compiler to use.
+
+    Returns:
+        A future for each batch, resolving to the SVG files of its expressions.
+    """
+
+    if preamble is None:
+        preamble = _DEFAULT_PREAMBLE
+
+    cache = get_cache()
+
+    missing = {}
+    for content in contents:
+        svg_name = _tex_svg_name(content, preamble)
+        if cache.contains(svg_name) or in_flight_future(_IN_FLIGHT, svg_name):
+            continue
+        missing[content] = svg_name
+
+    if not missing:
+        return []
+
+    num_batches = min(len(missing), os.cpu_count() or 1)
+    batches = [list(missing)[i::num_batches] for i in range(num_batches)]
+
+    # Dump the formats the batches need up front, instead of in every worker.
+    document_classes = {
+        _DOCUMENT_CLASS if len(batch) == 1 else _MULTI_PAGE_DOCUMENT_CLASS
+        for batch in batches
+    }
+    for document_class in document_classes:
+        run_commands(_preamble_format(_tex_header(document_class, preamble), compiler))
+
+    futures = []
+    for batch in batches:
+        future = process_pool().submit(compile_tex_batch, batch, preamble, compiler)
+        track_in_flight(_IN_FLIGHT, [missing[content] for content in batch], future)
+        futures.append(future)
+
+    return futures
+
+
+async def prefetch_tex_async(
+    contents: Sequence[str],
+    preamble: str = None,
+    compiler: str = "latex",
+) -> List[str]:
+    """Compile LaTeX expressions concurrently with asyncio subprocesses, running at
+    most one compilation per core at a time.
+
+    Args:
+        contents: The LaTeX code of each expression, as passed to `Tex`.
+        preamble: The LaTeX preamble to use. Defaults to the preamble of `Tex`.
+        compiler: The LaTeX compiler to use.
+
+    Returns:
+        The SVG file of each expression.
+    """
+
+    if preamble is None:
+        preamble = _DEFAULT_PREAMBLE
+
+    # Dump the format up front, instead of in every compilation.
+    await run_commands_async(
+        _preamble_format(_tex_header(_DOCUMENT_CLASS, preamble), compiler)
     )
 
-    svg_file = os.path.join(temp_directory(), temp_filename(tex=full_tex) + ".svg")
-    if not os.path.exists(svg_file):
-        _create_tex_svg(full_tex, svg_file, compiler)
-    return svg_file
+    semaphore = asyncio.Semaphore(os.cpu_count() or 1)
+
+    async def _compile(content: str) -> str:
+        async with semaphore:
+            return await tex_content_to_svg_file_async(content, preamble, compiler)
+
+    return list(await asyncio.gather(*(_compile(content) for content in contents)))
 
 
 _DEFAULT_PREAMBLE = r"""
@@ -155,8 +768,8 @@ class Tex(DrawableWithChild):
     color: Color = Color(0, 0, 0, 1)
 
     def setup(self) -> None:
-        svg_filename = tex_content_to_svg_file(self.tex, self.preamble, self.compiler)
-        self._svg = SVG(svg_filename=svg_filename, color=self.color)
+        svg = tex_content_to_svg(self.tex, self.preamble, self.compiler)
+        self._svg = SVG(raw_svg=svg, color=self.color)
         self.set_child(self._svg.scale(self.svg_scale))
 
 
@@ -3,6 +3,7 @@ from abc import ABC
 from enum import Enum
 from typing import List, Sequence, Tuple, Union
 
+import numpy as np
 import skia
 
 from iceberg import (
@@ -74,23 +75,23 @@ class Rectangle(Drawable):
     def setup(
         self,
     ) -> None:
+        # The paints are shared with every path style with the same values.
         self._border_paint = (
-            skia.Paint(
-                Style=skia.Paint.kStroke_Style,
-                AntiAlias=self.anti_alias,
-                StrokeWidth=self.border_thickness,
-                Color4f=self.border_color.to_skia(),
-            )
+            PathStyle(
+                self.border_color,
+                self.border_thickness,
+                anti_alias=self.anti_alias,
+            ).skia_paint
             if self.border_color
             else None
         )
 
         self._fill_paint = (
-            skia.Paint(
-                Style=skia.Paint.kFill_Style,
-                AntiAlias=self.anti_alias,
-                Color4f=self.fill_color.to_skia(),
-            )
+            PathStyle(
+                self.fill_color,
+                anti_alias=self.anti_alias,
+                stroke=False,
+            ).skia_paint
             if self.fill_color
             else None
         )
@@ -171,6 +172,10 @@ class Path(Drawable, ABC):
         self._path_style.skia_paint.getFillPath(self._skia_path, self._fill_path)
         self._bounds = Bounds.from_skia(self._fill_path.computeTightBounds())
 
+        # Created on first use, see `path_measure` and `total_length`.
+        self._path_measure = None
+        self._total_length = None
+
     @classmethod
     def from_skia(cls, skia_path: skia.Path, path_style: PathStyle):
         """Initialize a standalone path from a Skia path and path style.
@@ -192,6 +197,46 @@ class Path(Drawable, ABC):
         """The Skia path."""
         return self._skia_path
 
+    @property
+    def path_measure(self) -> skia.PathMeasure:
+        """The Skia path measure of the (first contour of the) path."""
+
+        if self._path_measure is None:
+            self._path_measure = skia.PathMeasure(self._skia_path, False)
+        return self._path_measure
+
+    @property
+    def total_length(self) -> float:
+        """The length of the (first contour of the) path."""
+
+        if self._total_length is None:
+            self._total_length = self.path_measure.getLength()
+        return self._total_length
+
+    def sample(self, ts: Union[float, Sequence[float]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Sample points and tangents along the path.
+
+        Args:
+            ts: The positions to sample at, as fractions of the length of the path between
+                0 and 1.
+
+        Returns:
+            The points and the unit tangents at each position, as two (N, 2) arrays.
+        """
+
+        # Skia has no batched lookup, so each position is looked up in turn. Callers
+        # save time by asking for fewer positions, not by batching them.
+        ts = np.atleast_1d(np.asarray(ts, dtype=np.float64))
+        distances = np.clip(ts, 0, 1) * self.total_length
+
+        samples = np.empty((len(distances), 4), dtype=np.float64)
+        path_measure = self.path_measure
+        for i, distance in enumerate(distances.tolist()):
+            point, tangent = path_measure.getPosTan(distance)
+            samples[i] = (point.fX, point.fY, tangent.fX, tangent.fY)
+
+        return samples[:, :2], samples[:, 2:]
+
     @property
     def bounds(self) -> Bounds:
         return self._bounds
@@ -200,6 +245,13 @@ class Path(Drawable, ABC):
         canvas.drawPath(self._skia_path, self._path_style.skia_paint)
 
 
+# The largest increment PartialPath starts subdividing with.
+_COARSE_SUBDIVIDE_INCREMENT = 0.125
+
+# How far, in pixels, a subdivided segment may stray from the path.
+_SUBDIVIDE_TOLERANCE = 0.05
+
+
 class PartialPath(Drawable):
     """Part of a path, from start to end.
 
@@ -207,7 +259,8 @@ class PartialPath(Drawable):
         child_path: The path to draw.
         start: The start of the partial path, between 0 and 1.
         end: The end of the partial path, between 0 and 1.
-        subdivide_increment: The increment to use when subdividing the path.
+        subdivide_increment: The smallest increment to use when subdividing the path.
+            The path is subdivided adaptively, more finely where it curves.
         interpolation: The interpolation to use when drawing the path.
 
     Raises:
@@ -251,72 +304,148 @@ class PartialPath(Drawable):
         self._subdivide_increment = self.subdivide_increment
         self._interpolation = self.interpolation
 
-        self._path_measure = skia.PathMeasure(self._child_path.skia_path, False)
-        self._total_length = self._path_measure.getLength()
+        # The path measure and length are cached by the child path, so animating the
+        # start and end of the same path doesn't measure it again.
+        self._total_length = self._child_path.total_length
 
-        self._points = []
-        self._tangents = []
+        # Subdivided lazily, see `points_array`.
+        self._points = None
+        self._tangents = None
+        self._skia_points = None
+        self._skia_tangents = None
 
-        # Subdivide the path and store the points and tangents.
-        current_t = self.start
+        self._partial_path = skia.Path()
 
-        while current_t < self.end:
-            current_distance = self._total_length * current_t
+        if self.interpolation == self.Interpolation.LINEAR:
+            points = self.points_array.tolist()
+            self._partial_path.moveTo(*points[0])
+            for point in points[1:]:
+                self._partial_path.lineTo(*point)
+        elif self.interpolation == self.Interpolation.CUBIC:
+            # Extract the exact part of the path, without any subdivision.
+            self._child_path.path_measure.getSegment(
+                self._total_length * self.start,
+                self._total_length * self.end,
+                self._partial_path,
+                True,
+            )
+        else:
+            raise ValueError(f"Unknown interpolation {self.interpolation}.")
 
-            point, tangent = self._path_measure.getPosTan(current_distance)
+    def _subdivide(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Subdivide the child path between start and end.
 
-            self._points.append(point)
-            self._tangents.append(tangent)
+        The range is first split uniformly into coarse segments, which are then halved
+        wherever the interpolated segment strays from the path, until they are no
+        shorter than `subdivide_increment`. Straight parts of the path end up with few
+        samples, and curved parts with many.
 
-            current_t += self.subdivide_increment
+        Returns:
+            The points and the unit tangents of the subdivision.
+        """
 
-        # Add the end point.
-        point, tangent = self._path_measure.getPosTan(self._total_length * self.end)
+        if self.end <= self.start:
+            return self._child_path.sample(self.start)
 
-        self._points.append(point)
-        self._tangents.append(tangent)
+        coarse_increment = max(self.subdivide_increment, _COARSE_SUBDIVIDE_INCREMENT)
+        num_segments = max(1, math.ceil((self.end - self.start) / coarse_increment))
+        ts = np.linspace(self.start, self.end, num_segments + 1)
+        points, tangents = self._child_path.sample(ts)
 
-        self._partial_path = skia.Path()
-        self._partial_path.moveTo(self._points[0])
+        while True:
+            dts = np.diff(ts)
+            candidates = np.nonzero(dts / 2 >= self.subdivide_increment)[0]
+            if len(candidates) == 0:
+                break
 
-        if self.interpolation == self.Interpolation.LINEAR:
-            for point in self._points[1:]:
-                self._partial_path.lineTo(point)
-        elif self.interpolation == self.Interpolation.CUBIC:
-            segment_length = self._total_length * self.subdivide_increment
-
-            for point, tangent, next_point, next_tangent in zip(
-                self._points[:-1],
-                self._tangents[:-1],
-                self._points[1:],
-                self._tangents[1:],
-            ):
-                # The tangents are unit vectors, but we would like actual time
-                # derivatives for the conversion below. That's an underspecified
-                # problem (the original path may not even have a notion of time.
-                # But by scaling with the segment length we at least get
-                # a reasonable choice (in particular, this makes the shape of the
-                # interpolation invariant to scaling the entire path).
-                tangent = tangent * segment_length
-                next_tangent = next_tangent * segment_length
-                # Compute control points (i.e. convert from Hermite to Bezier curve):
-                p1 = point + tangent * 0.333
-                p2 = next_point - next_tangent * 0.333
-                self._partial_path.cubicTo(p1, p2, next_point)
-        else:
-            raise ValueError(f"Unknown interpolation {self.interpolation}.")
+            mid_ts = ts[candidates] + dts[candidates] / 2
+            mid_points, mid_tangents = self._child_path.sample(mid_ts)
+
+            # Where the interpolation puts the middle of each segment.
+            predicted = (points[candidates] + points[candidates + 1]) / 2
+            if self.interpolation == self.Interpolation.CUBIC:
+                lengths = dts[candidates, None] * self._total_length
+                predicted += (
+                    tangents[candidates] - tangents[candidates + 1]
+                ) * lengths / 8
+
+            errors = np.linalg.norm(predicted - mid_points, axis=1)
+            split = errors > _SUBDIVIDE_TOLERANCE
+            if not np.any(split):
+                break
+
+            order = np.argsort(np.concatenate([ts, mid_ts[split]]), kind="stable")
+            ts = np.concatenate([ts, mid_ts[split]])[order]
+            points = np.concatenate([points, mid_points[split]])[order]
+            tangents = np.concatenate([tangents, mid_tangents[split]])[order]
+
+        return points, tangents
+
+    def _child_ts(self, ts: Union[float, Sequence[float]]) -> np.ndarray:
+        ts = np.asarray(ts, dtype=np.float64)
+        return self._start + ts * (self._end - self._start)
+
+    def sample(self, ts: Union[float, Sequence[float]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Sample points and tangents along the partial path.
+
+        Args:
+            ts: The positions to sample at, as fractions of the partial path between 0
+                and 1.
+
+        Returns:
+            The points and the unit tangents at each position, as two (N, 2) arrays.
+        """
+
+        return self._child_path.sample(self._child_ts(ts))
+
+    def point_and_tangent_at(self, t: float) -> Tuple[np.ndarray, np.ndarray]:
+        """The point and the unit tangent at a position along the partial path.
+
+        Args:
+            t: The position, as a fraction of the partial path between 0 and 1.
+
+        Returns:
+            The point and the unit tangent.
+        """
+
+        points, tangents = self.sample(t)
+        return points[0], tangents[0]
 
     def draw(self, canvas: skia.Canvas):
         canvas.drawPath(self._partial_path, self._child_path._path_style.skia_paint)
 
     @property
-    def tangents(self) -> Sequence[skia.Point]:
+    def tangents_array(self) -> np.ndarray:
+        """The unit tangents at the subdivision points, as an (N, 2) array."""
+        if self._tangents is None:
+            self._points, self._tangents = self._subdivide()
         return self._tangents
 
     @property
-    def points(self) -> Sequence[skia.Point]:
+    def points_array(self) -> np.ndarray:
+        """The subdivision points, as an (N, 2) array."""
+        if self._points is None:
+            self._points, self._tangents = self._subdivide()
         return self._points
 
+    @property
+    def tangents(self) -> Sequence[skia.Point]:
+        """The unit tangents at the subdivision points, see `tangents_array`."""
+        if self._skia_tangents is None:
+            self._skia_tangents = [
+                skia.Point(x, y) for x, y in self.tangents_array.tolist()
+            ]
+        return self._skia_tangents
+
+    @property
+    def points(self) -> Sequence[skia.Point]:
+        """The subdivision points, see `points_array`."""
+        if self._skia_points is None:
+            self._skia_points = [
+                skia.Point(x, y) for x, y in self.points_array.tolist()
+            ]
+        return self._skia_points
+
     @property
     def children(self) -> Sequence[Drawable]:
         return [self._child_path]
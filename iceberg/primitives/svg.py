@@ -1,9 +1,66 @@
-import skia
+import collections
 import hashlib
-import os
+import re
+import threading
+from typing import List, Tuple
+
+import skia
 
 from iceberg import Drawable, Bounds, Color, Colors, PathStyle
-from iceberg.utils import temp_directory
+
+# Recorded pictures and bounds of the SVGs parsed so far, keyed by the hash of their
+# content, so that identical SVGs are only parsed once per process.
+_SVG_CACHE = collections.OrderedDict()
+_SVG_CACHE_SIZE = 256
+# SVGs may be parsed from several threads, e.g. by the preview server. They are parsed
+# outside of the lock.
+_SVG_CACHE_LOCK = threading.Lock()
+
+
+def _parse_svg(content: bytes) -> Tuple[skia.Picture, Bounds]:
+    """Parse an SVG and record it as a picture, using the global SVG cache.
+
+    Args:
+        content: The content of the SVG.
+
+    Returns:
+        The recorded picture and the bounds of the SVG.
+    """
+
+    key = hashlib.sha1(content).hexdigest()
+    with _SVG_CACHE_LOCK:
+        cached = _SVG_CACHE.get(key)
+        if cached is not None:
+            _SVG_CACHE.move_to_end(key)
+            return cached
+
+    skia_stream = skia.MemoryStream(content, True)
+    skia_svg = skia.SVGDOM.MakeFromStream(skia_stream)
+
+    container_size = skia_svg.containerSize()
+
+    if container_size.isEmpty():
+        container_size = skia.Size(100, 100)
+        skia_svg.setContainerSize(container_size)
+
+    bounds = Bounds(
+        left=0,
+        top=0,
+        right=container_size.width(),
+        bottom=container_size.height(),
+    )
+
+    picture_recorder = skia.PictureRecorder()
+    fake_canvas = picture_recorder.beginRecording(bounds.width, bounds.height)
+    skia_svg.render(fake_canvas)
+    picture = picture_recorder.finishRecordingAsPicture()
+
+    with _SVG_CACHE_LOCK:
+        picture, bounds = _SVG_CACHE.setdefault(key, (picture, bounds))
+        if len(_SVG_CACHE) > _SVG_CACHE_SIZE:
+            _SVG_CACHE.popitem(last=False)
+
+    return picture, bounds
 
 
 class SVG(Drawable):
@@ -26,14 +83,11 @@ class SVG(Drawable):
             raise ValueError("Cannot specify both svg_filename and raw_svg")
 
         if self.raw_svg is not None:
-            encoded_svg = self.raw_svg.encode("utf-8")
-            filename = hashlib.sha1(encoded_svg).hexdigest()
-            self._svg_filename = os.path.join(temp_directory(), filename + ".svg")
-
-            with open(self._svg_filename, "wb") as f:
-                f.write(encoded_svg)
+            content = self.raw_svg.encode("utf-8")
         else:
-            self._svg_filename = self.svg_filename
+            # The file is read every time, so that edits to it are picked up.
+            with open(self.svg_filename, "rb") as f:
+                content = f.read()
 
         self._color = self.color
         self._paint = None
@@ -45,28 +99,7 @@ class SVG(Drawable):
                 )
             )
 
-        skia_stream = skia.FILEStream.Make(self._svg_filename)
-        self._skia_svg = skia.SVGDOM.MakeFromStream(skia_stream)
-
-        container_size = self._skia_svg.containerSize()
-
-        if container_size.isEmpty():
-            container_size = skia.Size(100, 100)
-            self._skia_svg.setContainerSize(container_size)
-
-        self._bounds = Bounds(
-            left=0,
-            top=0,
-            right=container_size.width(),
-            bottom=container_size.height(),
-        )
-
-        picture_recorder = skia.PictureRecorder()
-        fake_canvas = picture_recorder.beginRecording(
-            self._bounds.width, self._bounds.height
-        )
-        self._skia_svg.render(fake_canvas)
-        self._skia_picture = picture_recorder.finishRecordingAsPicture()
+        self._skia_picture, self._bounds = _parse_svg(content)
 
         super().__init__()
 
@@ -78,30 +111,172 @@ class SVG(Drawable):
         canvas.drawPicture(self._skia_picture, paint=self._paint)
 
 
+_NUMBER_RE = re.compile(r"[\s,]*([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)")
+_FLAG_RE = re.compile(r"[\s,]*([01])")
+_COMMAND_RE = re.compile(r"[\s,]*([MmLlHhVvCcSsQqTtAaZz])")
+_END_RE = re.compile(r"[\s,]*$")
+
+# The number of arguments of each path command.
+_SVG_PATH_ARGUMENTS = {
+    "M": 2,
+    "L": 2,
+    "H": 1,
+    "V": 1,
+    "C": 6,
+    "S": 4,
+    "Q": 4,
+    "T": 2,
+    "A": 7,
+    "Z": 0,
+}
+
+# Skia paths parsed from SVG path data, keyed by the path data.
+_SVG_PATH_CACHE = collections.OrderedDict()
+_SVG_PATH_CACHE_SIZE = 4096
+_SVG_PATH_CACHE_LOCK = threading.Lock()
+
+
+def _parse_svg_path_arguments(
+    svg_path_string: str, position: int, command: str
+) -> Tuple[List[float], int]:
+    arguments = []
+
+    for i in range(_SVG_PATH_ARGUMENTS[command]):
+        # The large arc and sweep flags of arcs can be written without separators.
+        regex = _FLAG_RE if command == "A" and i in (3, 4) else _NUMBER_RE
+        match = regex.match(svg_path_string, position)
+        if match is None:
+            raise ValueError(
+                f"Invalid SVG path data at position {position}: {svg_path_string!r}"
+            )
+        arguments.append(float(match.group(1)))
+        position = match.end()
+
+    return arguments, position
+
+
 def _svg_path_to_skia(svg_path_string: str) -> skia.Path:
-    import svgelements as se
+    """Convert SVG path data to a Skia path, supporting every path command.
+
+    The path data is scanned with regular expressions and each command is added with
+    the corresponding native Skia call, including arcs. Paths are cached by their
+    path data, so the returned path should not be modified.
+
+    Args:
+        svg_path_string: The SVG path data, i.e. the `d` attribute of a path.
+
+    Returns:
+        The Skia path.
+    """
+
+    with _SVG_PATH_CACHE_LOCK:
+        cached = _SVG_PATH_CACHE.get(svg_path_string)
+        if cached is not None:
+            _SVG_PATH_CACHE.move_to_end(svg_path_string)
+            return cached
 
     skia_path = skia.Path()
-    path = se.Path(svg_path_string)
-
-    for command in path:
-        if isinstance(command, se.Move):
-            skia_path.moveTo(command.end.x, command.end.y)
-        elif isinstance(command, se.Line):
-            skia_path.lineTo(command.end.x, command.end.y)
-        elif isinstance(command, se.CubicBezier):
-            skia_path.cubicTo(
-                command.control1.x,
-                command.control1.y,
-                command.control2.x,
-                command.control2.y,
-                command.end.x,
-                command.end.y,
+
+    x, y = 0.0, 0.0
+    start_x, start_y = 0.0, 0.0
+    # The last control point, to reflect for smooth curves.
+    control_x, control_y = 0.0, 0.0
+    previous = None
+    command = None
+    position = 0
+
+    while _END_RE.match(svg_path_string, position) is None:
+        match = _COMMAND_RE.match(svg_path_string, position)
+        if match is not None:
+            command = match.group(1)
+            position = match.end()
+        elif command is None or command in "Zz":
+            raise ValueError(
+                f"Invalid SVG path data at position {position}: {svg_path_string!r}"
+            )
+
+        upper = command.upper()
+        relative = command != upper
+        arguments, position = _parse_svg_path_arguments(
+            svg_path_string, position, upper
+        )
+
+        if relative:
+            # Make the coordinates absolute.
+            if upper == "H":
+                arguments[0] += x
+            elif upper == "V":
+                arguments[0] += y
+            elif upper == "A":
+                arguments[5] += x
+                arguments[6] += y
+            else:
+                arguments = [
+                    value + (x if i % 2 == 0 else y) for i, value in enumerate(arguments)
+                ]
+
+        if upper == "M":
+            x, y = arguments
+            start_x, start_y = x, y
+            skia_path.moveTo(x, y)
+            # Further coordinate pairs are implicit line commands.
+            command = "l" if relative else "L"
+        elif upper == "L":
+            x, y = arguments
+            skia_path.lineTo(x, y)
+        elif upper == "H":
+            x = arguments[0]
+            skia_path.lineTo(x, y)
+        elif upper == "V":
+            y = arguments[0]
+            skia_path.lineTo(x, y)
+        elif upper in "CS":
+            if upper == "C":
+                x1, y1, x2, y2, x_end, y_end = arguments
+            else:
+                x2, y2, x_end, y_end = arguments
+                # Reflect the last control point of the previous cubic, if any.
+                x1, y1 = x, y
+                if previous in ("C", "S"):
+                    x1, y1 = 2 * x - control_x, 2 * y - control_y
+            skia_path.cubicTo(x1, y1, x2, y2, x_end, y_end)
+            control_x, control_y = x2, y2
+            x, y = x_end, y_end
+        elif upper in "QT":
+            if upper == "Q":
+                x1, y1, x_end, y_end = arguments
+            else:
+                x_end, y_end = arguments
+                # Reflect the control point of the previous quadratic, if any.
+                x1, y1 = x, y
+                if previous in ("Q", "T"):
+                    x1, y1 = 2 * x - control_x, 2 * y - control_y
+            skia_path.quadTo(x1, y1, x_end, y_end)
+            control_x, control_y = x1, y1
+            x, y = x_end, y_end
+        elif upper == "A":
+            rx, ry, rotation, large_arc, sweep, x, y = arguments
+            skia_path.arcTo(
+                rx,
+                ry,
+                rotation,
+                skia.Path.ArcSize.kLarge_ArcSize
+                if large_arc
+                else skia.Path.ArcSize.kSmall_ArcSize,
+                skia.PathDirection.kCW if sweep else skia.PathDirection.kCCW,
+                x,
+                y,
             )
-        elif isinstance(command, se.Close):
-            skia_path.close()
         else:
-            raise ValueError(f"Unknown command: {command}")
+            skia_path.close()
+            x, y = start_x, start_y
+
+        previous = upper
+
+    with _SVG_PATH_CACHE_LOCK:
+        skia_path = _SVG_PATH_CACHE.setdefault(svg_path_string, skia_path)
+        if len(_SVG_PATH_CACHE) > _SVG_PATH_CACHE_SIZE:
+            _SVG_PATH_CACHE.popitem(last=False)
 
     return skia_path
 
@@ -1,10 +1,92 @@
+import collections
+import threading
 from enum import Enum
+from typing import Callable, Hashable, Optional
 
 import skia
 
 from iceberg import Bounds, Drawable
 from iceberg.core.properties import FontStyle
 
+# Widths of the strings measured so far, keyed by the font and the string. Slides
+# tend to reuse the same fonts and words, so this is shared by all texts.
+_TEXT_WIDTH_CACHE = collections.OrderedDict()
+_TEXT_WIDTH_CACHE_SIZE = 65536
+
+# Shaped text blobs, keyed by the font and the string. Blobs don't hold the color, so
+# every text with the same content and font shares its blobs, e.g. across the frames
+# of an animation.
+_TEXT_BLOB_CACHE = collections.OrderedDict()
+_TEXT_BLOB_CACHE_SIZE = 4096
+
+# Guards both caches, as frames may be built from several threads, e.g. by the preview
+# server.
+_TEXT_CACHE_LOCK = threading.Lock()
+
+
+def _lru_get(
+    cache: collections.OrderedDict,
+    max_size: int,
+    key: Hashable,
+    compute: Callable[[], object],
+):
+    with _TEXT_CACHE_LOCK:
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+
+    # Computed outside of the lock, two threads may compute the same value, which is
+    # harmless.
+    value = compute()
+
+    with _TEXT_CACHE_LOCK:
+        cache[key] = value
+        cache.move_to_end(key)
+        if len(cache) > max_size:
+            cache.popitem(last=False)
+
+    return value
+
+
+def _font_key(font_style: FontStyle) -> Hashable:
+    """The properties of a font style that determine the widths of strings."""
+
+    return (
+        font_style.family,
+        font_style.filename,
+        font_style.font_style,
+        font_style.size,
+    )
+
+
+def _measure_text(
+    font_key: Hashable, font: skia.Font, paint: skia.Paint, text: str
+) -> float:
+    """Measure the width of a string, using the global width cache."""
+
+    return _lru_get(
+        _TEXT_WIDTH_CACHE,
+        _TEXT_WIDTH_CACHE_SIZE,
+        (font_key, text),
+        lambda: font.measureText(text, paint=paint),
+    )
+
+
+def _make_text_blob(
+    font_key: Hashable, font: skia.Font, text: str
+) -> Optional[skia.TextBlob]:
+    """Shape a string into a text blob, using the global blob cache.
+
+    Returns None for strings without any glyph, which don't need to be drawn.
+    """
+
+    return _lru_get(
+        _TEXT_BLOB_CACHE,
+        _TEXT_BLOB_CACHE_SIZE,
+        (font_key, text),
+        lambda: skia.TextBlob.MakeFromString(text, font),
+    )
+
 
 class SimpleText(Drawable):
     """Draw a simple text. This has no line wrapping.
@@ -21,7 +103,11 @@ class SimpleText(Drawable):
         self._skia_font = self.font_style.get_skia_font()
         self._skia_paint = self.font_style.get_skia_paint()
         self._height = self._skia_font.getSize()
-        self._width = self._skia_font.measureText(self.text, paint=self._skia_paint)
+        font_key = _font_key(self.font_style)
+        self._width = _measure_text(
+            font_key, self._skia_font, self._skia_paint, self.text
+        )
+        self._blob = _make_text_blob(font_key, self._skia_font, self.text)
         self._spacing = self._skia_font.getSpacing()
 
         self._bounds = Bounds(
@@ -36,7 +122,8 @@ class SimpleText(Drawable):
         return self._bounds
 
     def draw(self, canvas: skia.Canvas) -> None:
-        canvas.drawString(self.text, 0, self._height, self._skia_font, self._skia_paint)
+        if self._blob is not None:
+            canvas.drawTextBlob(self._blob, 0, self._height, self._skia_paint)
 
 
 class Text(Drawable):
@@ -83,46 +170,56 @@ class Text(Drawable):
         self._line_height = self.font_style.size
         self._spacing = self._skia_font.getSpacing()
 
-        self._space_width = self._skia_font.measureText(" ", paint=self._skia_paint)
+        font_key = _font_key(self.font_style)
+
+        def _measure(text: str) -> float:
+            return _measure_text(font_key, self._skia_font, self._skia_paint, text)
+
+        self._space_width = _measure(" ")
 
         # Wrap the text.
         self._lines = []
-        self._width = 0
-        self._height = 0
+        line_widths = []
 
         if self.width is None:
             # No wrapping is needed. Split the text into lines.
             self._lines = self.text.split("\n")
-            self._width = max(
-                self._skia_font.measureText(line, paint=self._skia_paint)
-                for line in self._lines
-            )
+            line_widths = [_measure(line) for line in self._lines]
         else:
-            # Wrap the text.
+            # Wrap the text greedily. Glyph advances add up, so the width of a line is
+            # the sum of the widths of its words and spaces, each measured only once.
             pre_lines = self.text.split("\n")
 
             for pre_line in pre_lines:
                 words = pre_line.split(" ")
-                line = ""
+                line_words = []
+                line_width = 0
                 for word in words:
-                    if (
-                        self._skia_font.measureText(line + word, paint=self._skia_paint)
-                        > self.width
-                    ):
-                        self._lines.append(line)
-                        self._width = max(
-                            self._width,
-                            self._skia_font.measureText(line, paint=self._skia_paint),
-                        )
-                        line = word + " "
+                    word_width = _measure(word)
+                    if line_width + word_width > self.width:
+                        self._lines.append("".join(w + " " for w in line_words))
+                        line_widths.append(line_width)
+                        line_words = [word]
+                        line_width = word_width + self._space_width
                     else:
-                        line += word + " "
-                self._lines.append(line)
+                        line_words.append(word)
+                        line_width += word_width + self._space_width
+                self._lines.append("".join(w + " " for w in line_words))
+                line_widths.append(line_width)
+
+        self._width = max(line_widths)
+
+        # Precompute the horizontal offset of each line for the alignment.
+        if self.align == Text.Align.RIGHT:
+            self._line_offsets = [self._width - width for width in line_widths]
+        elif self.align == Text.Align.CENTER:
+            self._line_offsets = [(self._width - width) / 2 for width in line_widths]
+        else:
+            self._line_offsets = [0] * len(line_widths)
 
-            self._width = max(
-                self._width,
-                self._skia_font.measureText(line, paint=self._skia_paint),
-            )
+        self._blobs = [
+            _make_text_blob(font_key, self._skia_font, line) for line in self._lines
+        ]
 
         # Calculate the height of the text using the line spacing.
         # The last line does not need extra spacing.
@@ -143,23 +240,12 @@ class Text(Drawable):
     def draw(self, canvas: skia.Canvas):
         # Draw the text.
         y = self._spacing
-        for line in self._lines:
-            x = 0
-            if self.align == Text.Align.RIGHT:
-                x = self._width - self._skia_font.measureText(
-                    line, paint=self._skia_paint
+        for blob, x in zip(self._blobs, self._line_offsets):
+            if blob is not None:
+                canvas.drawTextBlob(
+                    blob,
+                    x,
+                    y - (self._spacing - self._line_height),
+                    self._skia_paint,
                 )
-            elif self.align == Text.Align.CENTER:
-                x = (
-                    self._width
-                    - self._skia_font.measureText(line, paint=self._skia_paint)
-                ) / 2
-
-            canvas.drawString(
-                line,
-                x,
-                y - (self._spacing - self._line_height),
-                self._skia_font,
-                self._skia_paint,
-            )
             y += self._spacing * self.line_spacing
@@ -1,12 +1,24 @@
+import asyncio
+import concurrent.futures
 import os
 import shutil
-import subprocess
+from typing import Dict, List, Sequence
 
 from absl import logging
 
 from iceberg import Color, DrawableWithChild
+from iceberg.cache import get_cache
 from iceberg.primitives.svg import SVG
-from iceberg.utils import temp_directory, temp_filename
+from iceberg.utils import (
+    CommandSteps,
+    asset_file,
+    in_flight_future,
+    process_pool,
+    run_commands,
+    run_commands_async,
+    temp_filename,
+    track_in_flight,
+)
 
 
 class TypstError(Exception):
@@ -40,7 +52,7 @@ def _postprocess_typst_svg(svg_file: str):
     svg.write(svg_file, encoding="utf-8", xml_declaration=True)
 
 
-def _create_typst_svg(typst_source: str, svg_file: str):
+def _typst_svg_steps(typst_source: str, svg_name: str) -> CommandSteps:
     _PROGRAM = "typst"
 
     # Check if program is installed.
@@ -51,27 +63,18 @@ def _create_typst_svg(typst_source: str, svg_file: str):
             f"You can find instructions at https://github.com/typst/typst"
         )
 
-    # Write tex file
-    root, _ = os.path.splitext(svg_file)
+    # Write tex file, in the scratch directory whose files no other process touches.
+    root = get_cache().scratch_path(os.path.splitext(svg_name)[0])
     with open(root + ".typ", "w", encoding="utf-8") as typst_file:
         typst_file.write(typst_source)
 
     try:
-        subprocess.run(
-            [
-                _PROGRAM,
-                "compile",
-                f"{root}.typ",
-                f"{root}.svg",
-            ],
-            check=True,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.PIPE,
-        )
-    except subprocess.CalledProcessError as e:
-        error_message = e.stderr.decode("utf-8")
-        logging.error(f"Typst Error! {error_message}")
-        raise TypstError(error_message)
+        returncode, stderr = yield [
+            _PROGRAM,
+            "compile",
+            f"{root}.typ",
+            f"{root}.svg",
+        ]
     finally:
         # Cleanup superfluous documents
         for ext in [".typ"]:
@@ -80,17 +83,159 @@ def _create_typst_svg(typst_source: str, svg_file: str):
             except FileNotFoundError:
                 pass
 
+    if returncode:
+        error_message = stderr.decode("utf-8")
+        logging.error(f"Typst Error! {error_message}")
+        raise TypstError(error_message)
+
     # Postprocess SVG
-    _postprocess_typst_svg(svg_file)
+    _postprocess_typst_svg(root + ".svg")
+
+    with open(root + ".svg", "rb") as f:
+        svg = f.read()
+    get_cache().put_file(svg_name, root + ".svg")
+    return svg
+
+
+def _create_typst_svg(typst_source: str, svg_name: str) -> bytes:
+    return run_commands(_typst_svg_steps(typst_source, svg_name))
+
+
+def _typst_svg_name(content: str) -> str:
+    return temp_filename(typst=content) + ".svg"
+
+
+# The SVGs being compiled on the process pool, and the futures compiling them.
+_IN_FLIGHT: Dict[str, concurrent.futures.Future] = {}
+
+# The SVGs being compiled with asyncio subprocesses, and the tasks compiling them.
+_ASYNC_IN_FLIGHT: Dict[str, asyncio.Future] = {}
+
+
+def typst_content_to_svg(
+    content: str,
+) -> str:
+    cache = get_cache()
+    svg_name = _typst_svg_name(content)
+
+    svg = cache.get(svg_name)
+    future = in_flight_future(_IN_FLIGHT, svg_name) if svg is None else None
+    if future is not None:
+        # Already being compiled in the background. If that fails, it's compiled
+        # again below, to raise the error here.
+        concurrent.futures.wait([future])
+        svg = cache.get(svg_name)
+
+    if svg is None:
+        with cache.lock(svg_name):
+            # Another process may have compiled it while this one waited for the lock.
+            svg = cache.get(svg_name)
+            if svg is None:
+                svg = _create_typst_svg(content, svg_name)
+
+    return svg.decode("utf-8")
 
 
 def typst_content_to_svg_file(
     content: str,
 ) -> str:
-    svg_file = os.path.join(temp_directory(), temp_filename(typst=content) + ".svg")
-    if not os.path.exists(svg_file):
-        _create_typst_svg(content, svg_file)
-    return svg_file
+    svg = typst_content_to_svg(content)
+    return asset_file(_typst_svg_name(content), svg)
+
+
+async def typst_content_to_svg_async(content: str) -> str:
+    """Compile a Typst document with asyncio subprocesses.
+
+    Args:
+        content: The Typst code, as passed to `Typst`.
+
+    Returns:
+        The SVG of the document.
+    """
+
+    cache = get_cache()
+    svg_name = _typst_svg_name(content)
+
+    svg = cache.get(svg_name)
+    future = in_flight_future(_IN_FLIGHT, svg_name) if svg is None else None
+    if future is not None:
+        await asyncio.gather(asyncio.wrap_future(future), return_exceptions=True)
+        svg = cache.get(svg_name)
+
+    if svg is None:
+        # Entries are written atomically, so compiling the same document as another
+        # process is only wasted work. Holding the lock would block the event loop.
+        task = in_flight_future(_ASYNC_IN_FLIGHT, svg_name)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(
+                run_commands_async(_typst_svg_steps(content, svg_name))
+            )
+            track_in_flight(_ASYNC_IN_FLIGHT, [svg_name], task)
+        svg = await task
+
+    return svg.decode("utf-8")
+
+
+async def typst_content_to_svg_file_async(content: str) -> str:
+    """Compile a Typst document with asyncio subprocesses.
+
+    Args:
+        content: The Typst code, as passed to `Typst`.
+
+    Returns:
+        The SVG file of the document.
+    """
+
+    svg = await typst_content_to_svg_async(content)
+    return asset_file(_typst_svg_name(content), svg)
+
+
+def prefetch_typst(contents: Sequence[str]) -> List[concurrent.futures.Future]:
+    """Start compiling Typst documents in the background, on a pool of processes.
+
+    Constructing a `Typst` or `MathTypst` whose document is still being compiled waits
+    for it, instead of compiling it again.
+
+    Args:
+        contents: The Typst code of each document, as passed to `Typst`.
+
+    Returns:
+        A future for each document that isn't cached yet, resolving to its SVG file.
+    """
+
+    cache = get_cache()
+
+    futures = []
+    for content in dict.fromkeys(contents):
+        svg_name = _typst_svg_name(content)
+        if cache.contains(svg_name) or in_flight_future(_IN_FLIGHT, svg_name):
+            continue
+
+        future = process_pool().submit(typst_content_to_svg_file, content)
+        track_in_flight(_IN_FLIGHT, [svg_name], future)
+        futures.append(future)
+
+    return futures
+
+
+async def prefetch_typst_async(contents: Sequence[str]) -> List[str]:
+    """Compile Typst documents concurrently with asyncio subprocesses, running at most
+    one compilation per core at a time.
+
+    Args:
+        contents: The Typst code of each document, as passed to `Typst`.
+
+    Returns:
+        The SVG file of each document.
+    """
+
+    semaphore = asyncio.Semaphore(os.cpu_count() or 1)
+
+    async def _compile(content: str) -> str:
+        async with semaphore:
+            return await typst_content_to_svg_file_async(content)
+
+    return list(await asyncio.gather(*(_compile(content) for content in contents)))
 
 
 class Typst(DrawableWithChild):
@@ -107,8 +252,8 @@ class Typst(DrawableWithChild):
     color: Color = Color(0, 0, 0, 1)
 
     def setup(self) -> None:
-        svg_filename = typst_content_to_svg_file(self.typst)
-        self._svg = SVG(svg_filename=svg_filename, color=self.color)
+        svg = typst_content_to_svg(self.typst)
+        self._svg = SVG(raw_svg=svg, color=self.color)
         self.set_child(self._svg.scale(self.svg_scale))
 
 
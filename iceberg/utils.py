@@ -1,6 +1,15 @@
 import numpy as np
+import asyncio
+import concurrent.futures
 import hashlib
 import os
+import subprocess
+import threading
+from typing import Any, Dict, Generator, List, Sequence, Tuple
+
+# A generator yielding the commands to run, each of which is sent back the return code
+# and standard error of the command. See `run_commands`.
+CommandSteps = Generator[List[str], Tuple[int, bytes], Any]
 
 
 def direction_equal(direction_a: np.ndarray, direction_b: np.ndarray) -> bool:
@@ -40,12 +49,147 @@ def temp_filename(**kwargs):
 def temp_directory():
     """Get the temporary directory for iceberg.
 
-    This will create the directory if it does not exist.
+    This is the scratch directory of this process in the shared cache, see
+    `iceberg.cache.AssetCache.work_directory`.
 
     Returns:
         The temporary directory for iceberg.
     """
 
-    _DIR_NAME = ".iceberg"
-    os.makedirs(_DIR_NAME, exist_ok=True)
-    return _DIR_NAME
+    from iceberg.cache import get_cache
+
+    return get_cache().work_directory()
+
+
+def asset_file(name: str, content: str) -> str:
+    """Get a file with the content of an asset of the shared cache, for callers that
+    need a path.
+
+    Args:
+        name: The name of the entry in the cache.
+        content: The content of the asset, written to a scratch file if the entry
+            isn't cached, e.g. because it was evicted in the meantime.
+
+    Returns:
+        The path of the file.
+    """
+
+    from iceberg.cache import get_cache
+
+    cache = get_cache()
+    path = cache.get_file(name)
+    if path is None:
+        path = cache.scratch_path(os.path.splitext(name)[0]) + os.path.splitext(name)[1]
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+    return path
+
+
+def run_commands(steps: CommandSteps) -> Any:
+    """Run the commands yielded by a generator, one after the other.
+
+    Writing the steps of a compilation as a generator lets the same code run its
+    commands synchronously with `run_commands`, or with asyncio subprocesses with
+    `run_commands_async`.
+
+    Args:
+        steps: The generator yielding the commands.
+
+    Returns:
+        The return value of the generator.
+    """
+
+    try:
+        command = next(steps)
+        while True:
+            process = subprocess.run(
+                command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+            )
+            command = steps.send((process.returncode, process.stderr))
+    except StopIteration as e:
+        return e.value
+
+
+async def run_commands_async(steps: CommandSteps) -> Any:
+    """Run the commands yielded by a generator with asyncio subprocesses.
+
+    Args:
+        steps: The generator yielding the commands.
+
+    Returns:
+        The return value of the generator.
+    """
+
+    try:
+        command = next(steps)
+        while True:
+            process = await asyncio.create_subprocess_exec(
+                *command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+            )
+            _, stderr = await process.communicate()
+            command = steps.send((process.returncode, stderr))
+    except StopIteration as e:
+        return e.value
+
+
+_PROCESS_POOL = None
+
+
+def process_pool() -> concurrent.futures.ProcessPoolExecutor:
+    """Get the pool of processes that compile assets in the background.
+
+    The pool is created on first use, with one process per core.
+
+    Returns:
+        The pool of processes.
+    """
+
+    global _PROCESS_POOL
+    if _PROCESS_POOL is None:
+        _PROCESS_POOL = concurrent.futures.ProcessPoolExecutor(
+            max_workers=os.cpu_count()
+        )
+    return _PROCESS_POOL
+
+
+# Guards the dictionaries of futures in flight. The futures of the process pool call
+# their done callbacks from another thread.
+_IN_FLIGHT_LOCK = threading.Lock()
+
+
+def track_in_flight(in_flight: Dict[str, Any], keys: Sequence[str], future: Any):
+    """Record that a future is producing some files, until it is done.
+
+    Args:
+        in_flight: Maps each file being produced to the future producing it.
+        keys: The files the future produces.
+        future: A `concurrent.futures.Future` or an asyncio future.
+    """
+
+    with _IN_FLIGHT_LOCK:
+        for key in keys:
+            in_flight[key] = future
+
+    def _forget(_):
+        with _IN_FLIGHT_LOCK:
+            for key in keys:
+                if in_flight.get(key) is future:
+                    del in_flight[key]
+
+    # Outside of the lock, as the callback is called right away if the future is done.
+    future.add_done_callback(_forget)
+
+
+def in_flight_future(in_flight: Dict[str, Any], key: str) -> Any:
+    """Get the future producing a file, see `track_in_flight`.
+
+    Args:
+        in_flight: Maps each file being produced to the future producing it.
+        key: The file.
+
+    Returns:
+        The future producing the file, or None if it isn't being produced.
+    """
+
+    with _IN_FLIGHT_LOCK:
+        return in_flight.get(key)
@@ -0,0 +1,32 @@
+import pytest
+
+import iceberg as ice
+from iceberg import cache
+
+
+@pytest.fixture(autouse=True)
+def asset_cache(tmp_path, monkeypatch):
+    """Give every test its own asset cache, instead of `~/.cache/iceberg`."""
+
+    directory = str(tmp_path / "iceberg-cache")
+    # Worker processes configure their cache from the environment.
+    monkeypatch.setenv("ICEBERG_CACHE_DIR", directory)
+    asset_cache = ice.AssetCache(directory)
+    monkeypatch.setattr(cache, "_CACHE", asset_cache)
+    return asset_cache
+
+
+class _MovingSquare(ice.Scene):
+    def __init__(self):
+        super().__init__(duration=1.0, make_frame=self.make_frame)
+
+    def make_frame(self, t: float) -> ice.Drawable:
+        blank = ice.Blank(ice.Bounds(size=(64, 48)), ice.Colors.WHITE)
+        square = ice.Rectangle(ice.Bounds.from_size(10, 10), fill_color=ice.Colors.RED)
+        return ice.Anchor([blank, square.move(t * 40, 10)])
+
+
+@pytest.fixture
+def moving_square():
+    """A one-second scene of a red square moving right over a 64x48 white frame."""
+    return _MovingSquare()
@@ -260,3 +260,115 @@ def test_animation_within_animation():
             self.play(background + square)
 
     check_animation(Anim().combined_scene, "animation_within_animation")
+
+
+def test_at_does_not_mutate():
+    static = ice.Rectangle(ice.Bounds.from_size(10, 10), ice.Colors.BLACK)
+    moving = ice.Rectangle(ice.Bounds.from_size(10, 10), ice.Colors.RED)
+    animated = ice.Animated(
+        [moving.move(0, 0), moving.move(100, 0)],
+        1.0,
+        ease_types=ice.EaseType.LINEAR,
+    )
+    scene = ice.Compose([static, animated])
+
+    halfway = scene.at(0.5)
+    end = scene.at(1.0)
+
+    assert halfway.components[0] is static
+    assert halfway.components[1].bounds.left == 49.5
+    assert end.components[1].bounds.left == 99.5
+    assert all(drawable._time == 0 for drawable in scene.find_all(lambda d: True))
+    assert static.at(0.5) is static
+
+
+class _Blinker(ice.Drawable):
+    """A user-defined leaf that reads its time in `set_time`."""
+
+    def setup(self):
+        self._color = ice.Colors.BLACK
+
+    def set_time(self, t: float):
+        super().set_time(t)
+        self._color = ice.Colors.RED if t >= 0.5 else ice.Colors.BLACK
+
+    @property
+    def bounds(self):
+        return ice.Bounds.from_size(10, 10)
+
+    def draw(self, canvas):
+        ice.Rectangle(self.bounds, self._color).draw(canvas)
+
+
+def test_at_calls_custom_set_time():
+    blinker = _Blinker()
+    scene = ice.Compose([ice.Rectangle(ice.Bounds.from_size(5, 5)), blinker])
+
+    assert scene.at(0.75).components[1]._color == ice.Colors.RED
+    assert scene.at(0.25).components[1]._color == ice.Colors.BLACK
+    assert blinker._color == ice.Colors.BLACK and blinker._time == 0
+
+    class Anim(ice.Playbook):
+        def timeline(self):
+            self.play(scene, duration=1.0)
+
+    combined = Anim().combined_scene
+    assert combined.make_frame(0.75).components[1]._color == ice.Colors.RED
+    assert combined.make_frame(0.25).components[1]._color == ice.Colors.BLACK
+
+
+def test_frozen_resolves_once():
+    moving = ice.Rectangle(ice.Bounds.from_size(10, 10), ice.Colors.RED)
+    animated = ice.Animated(
+        [moving.move(0, 0), moving.move(100, 0)],
+        1.0,
+        ease_types=ice.EaseType.LINEAR,
+    )
+    frozen = ice.Frozen(child=animated)
+
+    assert frozen.bounds.left == 99.5
+    assert frozen.frozen is frozen.frozen
+    assert frozen.at(0.25) is frozen.frozen
+
+    # The frozen tree ignores the time of the scene, and the child isn't touched.
+    frozen.set_time(0.0)
+    assert frozen.bounds.left == 99.5
+    assert animated._time == 0
+
+
+def test_at_shares_static_subtrees():
+    static = ice.Rectangle(ice.Bounds.from_size(10, 10), ice.Colors.BLACK)
+    moving = ice.Rectangle(ice.Bounds.from_size(10, 10), ice.Colors.RED)
+    animated = ice.Animated(
+        [moving.move(0, 0), moving.move(100, 0)],
+        2.0,
+        ease_types=ice.EaseType.LINEAR,
+    )
+    scene = ice.Compose([ice.Compose([static]), animated])
+
+    assert scene.is_time_dependent
+    assert not static.is_time_dependent
+
+    scene.set_time(0.5)
+    assert animated._time == 0.5
+    assert scene.at(0.5).components[0] is scene.components[0]
+
+    assert ice.animation.scene._get_drawable_duration(scene) == 2.0
+
+
+def test_set_time_reaches_undeclared_leaves():
+    class Clock(ice.Drawable):
+        # Reads its time in draw, without declaring it.
+        @property
+        def bounds(self):
+            return ice.Bounds.from_size(10, 10)
+
+        def draw(self, canvas):
+            pass
+
+    clock = Clock()
+    scene = ice.Compose([ice.Compose([clock])])
+
+    assert not clock.is_time_dependent
+    scene.set_time(0.5)
+    assert clock._time == 0.5
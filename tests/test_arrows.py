@@ -1,3 +1,5 @@
+import numpy as np
+
 import iceberg as ice
 from .scene_tester import check_render
 
@@ -13,3 +15,69 @@ def test_arrow_path():
     scene = blank.add(arrow_path)
 
     check_render(scene, "smooth_arrow_path.png")
+
+
+def test_arrow_head_extent_matches_head():
+    for thickness in [1, 4]:
+        for angle in [20, 30, 60]:
+            style = ice.PathStyle(thickness=thickness)
+            head = ice.ArrowHead((0, 0), (1, 0), style, angle, 20)
+            extent = ice.arrows.helpers.arrow_head_extent(style, angle, 20)
+            assert abs(extent - head.bounds.right) < 1e-4
+
+
+def test_dashed_arrow_head_extent_matches_head():
+    for dash_intervals in [[20, 10], [2, 3]]:
+        style = ice.PathStyle(thickness=3, dashed=True, dash_intervals=dash_intervals)
+        head = ice.ArrowHead((0, 0), (1, 0), style, 30, 20)
+        extent = ice.arrows.helpers.arrow_head_extent(style, 30, 20)
+        assert abs(extent - head.bounds.right) < 1e-4
+
+    # Dashed and solid heads don't share their extents.
+    solid = ice.PathStyle(thickness=3)
+    dashed = ice.PathStyle(thickness=3, dashed=True)
+    assert solid.stroke_geometry != dashed.stroke_geometry
+    assert (
+        dashed.stroke_geometry
+        != ice.PathStyle(thickness=3, dashed=True, dash_phase=5).stroke_geometry
+    )
+
+
+def test_arrow_head_extents_are_shared_across_colors(monkeypatch):
+    from iceberg.arrows import helpers
+
+    monkeypatch.setattr(
+        helpers, "_HEAD_EXTENT_CACHE", helpers.collections.OrderedDict()
+    )
+    monkeypatch.setattr(helpers, "_HEAD_EXTENT_CACHE_SIZE", 4)
+
+    # A wide angle with round caps, which has to be measured.
+    for color in [ice.Colors.RED, ice.Colors.BLUE, ice.Colors.GREEN]:
+        style = ice.PathStyle(color, thickness=4, stroke_cap=ice.StrokeCap.ROUND)
+        helpers.arrow_head_extent(style, 80, 5)
+    assert len(helpers._HEAD_EXTENT_CACHE) == 1
+
+    for head_length in range(10):
+        helpers.arrow_head_extent(ice.PathStyle(thickness=4), 80, head_length)
+    assert len(helpers._HEAD_EXTENT_CACHE) == 4
+
+
+def test_arrow_bundle_matches_arrows():
+    style = ice.PathStyle(ice.Colors.BLUE, thickness=2)
+    starts = [(10, 10), (10, 100), (200, 50)]
+    ends = [(200, 100), (150, 10), (20, 180)]
+
+    arrows = ice.Compose(
+        [ice.Arrow(start, end, style) for start, end in zip(starts, ends)]
+    )
+    bundle = ice.ArrowBundle(starts, ends, style)
+
+    renderer = ice.Renderer()
+    images = []
+    for drawable in [arrows, bundle]:
+        blank = ice.Blank(ice.Bounds(size=(220, 200)), ice.Colors.WHITE)
+        renderer.render(blank + drawable)
+        images.append(renderer.get_rendered_image().astype(int))
+
+    mismatched = np.abs(images[0] - images[1]).max(axis=-1) > 40
+    assert mismatched.mean() < 0.001
@@ -0,0 +1,164 @@
+import os
+import threading
+import time
+
+import pytest
+
+import iceberg as ice
+from iceberg import cache as cache_module
+
+
+@pytest.mark.parametrize("use_sqlite", [False, True])
+def test_cache_put_get(tmp_path, use_sqlite):
+    cache = ice.AssetCache(str(tmp_path), use_sqlite=use_sqlite)
+
+    assert cache.get("a.svg") is None
+    assert not cache.contains("a.svg")
+
+    cache.put("a.svg", b"<svg/>")
+    assert cache.contains("a.svg")
+    assert cache.get("a.svg") == b"<svg/>"
+    assert cache.size == len(b"<svg/>")
+
+    # Files are moved into the cache.
+    filename = cache.scratch_path("b") + ".png"
+    with open(filename, "wb") as f:
+        f.write(b"png")
+    cache.put_file("b.png", filename)
+    assert not os.path.exists(filename)
+    assert cache.get("b.png") == b"png"
+
+    # Entries can be read as files, for tools that need a path.
+    with open(cache.get_file("b.png"), "rb") as f:
+        assert f.read() == b"png"
+    assert cache.get_file("c.png") is None
+
+    # Another cache in the same directory sees the same entries.
+    assert ice.AssetCache(str(tmp_path), use_sqlite=use_sqlite).get("a.svg") == (
+        b"<svg/>"
+    )
+
+    cache.clear()
+    assert not cache.contains("a.svg")
+
+
+@pytest.mark.parametrize("use_sqlite", [False, True])
+def test_cache_evicts_least_recently_used(tmp_path, monkeypatch, use_sqlite):
+    monkeypatch.setattr(cache_module, "_ACCESS_TIME_RESOLUTION", 0)
+    cache = ice.AssetCache(str(tmp_path), max_size=350, use_sqlite=use_sqlite)
+
+    for name in "abc":
+        cache.put(name, b"x" * 100)
+        time.sleep(0.02)
+
+    # Reading "a" makes "b" the least recently used.
+    assert cache.get("a") is not None
+    time.sleep(0.02)
+
+    cache.put("d", b"x" * 100)
+
+    assert not cache.contains("b")
+    assert all(cache.contains(name) for name in "acd")
+    assert cache.size <= 350
+
+
+@pytest.mark.parametrize("use_sqlite", [False, True])
+def test_cache_evicts_files_and_locks(tmp_path, monkeypatch, use_sqlite):
+    monkeypatch.setattr(cache_module, "_ACCESS_TIME_RESOLUTION", 0)
+    cache = ice.AssetCache(str(tmp_path), max_size=350, use_sqlite=use_sqlite)
+
+    # A format, as dumped by LaTeX, counts towards the size of the cache.
+    format_file = os.path.join(cache.subdirectory("formats"), "preamble.fmt")
+    with open(format_file, "wb") as f:
+        f.write(b"x" * 100)
+    cache.add_file(format_file)
+    assert cache.size == 100
+    time.sleep(0.02)
+
+    with cache.lock("a"):
+        cache.put("a", b"x" * 100)
+    assert os.path.exists(os.path.join(tmp_path, "locks", "a.lock"))
+    time.sleep(0.02)
+
+    cache.mark_used(format_file)
+    time.sleep(0.02)
+    cache.put("b", b"x" * 100)
+    time.sleep(0.02)
+    cache.put("c", b"x" * 100)
+
+    # The least recently used entry goes, with its lock.
+    assert not cache.contains("a")
+    assert not os.path.exists(os.path.join(tmp_path, "locks", "a.lock"))
+    assert os.path.exists(format_file)
+
+    cache.put("d", b"x" * 100)
+    assert not os.path.exists(format_file)
+    assert cache.size <= 350
+
+
+def test_cache_reads_dont_write(tmp_path):
+    cache = ice.AssetCache(str(tmp_path), use_sqlite=True)
+    cache.put("a.svg", b"<svg/>")
+
+    connection = cache._connection()
+    assert connection.execute("PRAGMA journal_mode").fetchone() == ("delete",)
+
+    changes = connection.total_changes
+    assert cache.get("a.svg") == b"<svg/>"
+    assert connection.total_changes == changes
+
+
+def test_cache_lock_survives_removal(tmp_path):
+    cache = ice.AssetCache(str(tmp_path))
+
+    with cache.lock("a.svg"):
+        # Held, so it isn't removed.
+        cache._remove_lock("a.svg")
+        assert os.path.exists(os.path.join(tmp_path, "locks", "a.svg.lock"))
+
+    cache._remove_lock("a.svg")
+    assert not os.path.exists(os.path.join(tmp_path, "locks", "a.svg.lock"))
+    with cache.lock("a.svg"):
+        pass
+
+
+def test_cache_lock_is_exclusive(tmp_path):
+    cache = ice.AssetCache(str(tmp_path))
+    produced = []
+
+    def produce():
+        with cache.lock("a.svg"):
+            if not cache.contains("a.svg"):
+                time.sleep(0.05)
+                produced.append(True)
+                cache.put("a.svg", b"<svg/>")
+
+    threads = [threading.Thread(target=produce) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert produced == [True]
+
+
+def test_configure_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(ice.cache, "_CACHE", None)
+    for variable in [
+        "ICEBERG_CACHE_DIR",
+        "ICEBERG_CACHE_MAX_SIZE",
+        "ICEBERG_CACHE_SQLITE",
+    ]:
+        monkeypatch.delenv(variable, raising=False)
+
+    cache = ice.configure_cache(str(tmp_path), max_size=1000, use_sqlite=True)
+
+    assert ice.get_cache() is cache
+    assert os.environ["ICEBERG_CACHE_DIR"] == str(tmp_path)
+
+    # Workers configure the same cache from the environment.
+    monkeypatch.setattr(ice.cache, "_CACHE", None)
+    worker_cache = ice.get_cache()
+    assert worker_cache.directory == str(tmp_path)
+    assert worker_cache.max_size == 1000
+    assert worker_cache.use_sqlite
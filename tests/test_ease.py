@@ -0,0 +1,43 @@
+import numpy as np
+
+import iceberg as ice
+
+# The values of `EaseType` are plain functions, which don't become enum members, so
+# iterating the enum itself yields nothing.
+EASE_FNS = [
+    value
+    for name, value in vars(ice.EaseType).items()
+    if name.isupper() and callable(value)
+]
+
+
+def test_ease_accepts_arrays():
+    assert len(EASE_FNS) == 22
+    progress = np.linspace(0, 1, 11)
+
+    for ease_fn in EASE_FNS:
+        before = progress.copy()
+        eased = ease_fn(progress)
+        assert isinstance(eased, np.ndarray)
+        assert eased.shape == progress.shape
+        for p, value in zip(progress, eased):
+            assert abs(value - ease_fn(float(p))) < 1e-12, ease_fn.__name__
+        assert isinstance(ease_fn(0.5), float)
+        # The caller's array is left untouched.
+        assert np.array_equal(progress, before)
+
+
+def test_ease_in_out_expo_ends():
+    assert abs(ice.EaseType.EASE_IN_OUT_EXPO(1.0) - 1) < 1e-3
+    assert abs(ice.EaseType.EASE_IN_OUT_EXPO(0.5) - 0.5) < 1e-9
+
+
+def test_cubic_bezier():
+    linear = ice.cubic_bezier(0.0, 0.0, 1.0, 1.0)
+    assert np.allclose(linear(np.linspace(0, 1, 5)), np.linspace(0, 1, 5))
+
+    ease_in_out = ice.cubic_bezier(0.42, 0, 0.58, 1)
+    assert ease_in_out(0) == 0
+    assert ease_in_out(1) == 1
+    assert abs(ease_in_out(0.5) - 0.5) < 1e-6
+    assert abs(ease_in_out(0.25) - 0.1292) < 1e-3
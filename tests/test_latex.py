@@ -0,0 +1,445 @@
+import asyncio
+import concurrent.futures
+import glob
+import os
+import re
+import sys
+import threading
+
+import pytest
+
+import iceberg as ice
+from iceberg import cache
+from iceberg.primitives import latex
+from iceberg.utils import track_in_flight
+
+_FAKE_SVG = (
+    '<svg xmlns="http://www.w3.org/2000/svg" width="20" height="10" '
+    'viewBox="0 0 20 10"><rect width="20" height="10"/></svg>'
+)
+
+
+def _fake_compilers(monkeypatch):
+    """Replace the LaTeX toolchain, recording how it is called."""
+
+    asset_cache = cache.get_cache()
+    calls = []
+
+    def create_tex_svg(content, preamble, svg_name, compiler):
+        calls.append(("single", content))
+        asset_cache.put(svg_name, _FAKE_SVG.encode("utf-8"))
+        return _FAKE_SVG.encode("utf-8")
+
+    def create_tex_svgs(contents, preamble, compiler):
+        calls.append(("batch", list(contents)))
+        for content in contents:
+            asset_cache.put(
+                latex._tex_svg_name(content, preamble), _FAKE_SVG.encode("utf-8")
+            )
+
+    monkeypatch.setattr(latex, "_create_tex_svg", create_tex_svg)
+    monkeypatch.setattr(latex, "_create_tex_svgs", create_tex_svgs)
+    return calls
+
+
+def test_compile_tex_batch_compiles_missing_at_once(monkeypatch):
+    calls = _fake_compilers(monkeypatch)
+
+    svgs = ice.compile_tex_batch_svgs(["a", "b", "a"])
+    assert calls == [("batch", ["a", "b"])]
+    assert svgs == [_FAKE_SVG] * 3
+
+    # Everything is cached now.
+    svg_files = ice.compile_tex_batch(["a", "b"])
+    assert len(calls) == 1
+    for svg_file in svg_files:
+        with open(svg_file) as f:
+            assert f.read() == _FAKE_SVG
+    assert svg_files[0] == latex.tex_content_to_svg_file("a", latex._DEFAULT_PREAMBLE)
+
+
+def test_playbook_batches_tex(monkeypatch):
+    calls = _fake_compilers(monkeypatch)
+
+    class Anim(ice.Playbook):
+        def timeline(self):
+            for i in range(3):
+                tex = ice.MathTex(f"x^{i}")
+                self.play(ice.Animated([tex.move(0, 0), tex.move(10, 0)], 1.0))
+
+    anim = Anim(batch_tex=True)
+    assert [kind for kind, _ in calls] == ["batch"]
+    assert len(calls[0][1]) == 3
+    assert anim.combined_scene.duration == 3.0
+
+    # Built for real, with the compiled SVGs rather than the placeholders.
+    frame = anim.combined_scene.make_frame(0)
+    assert frame.bounds.width > 1
+
+    # Nothing left to compile.
+    Anim(batch_tex=True)
+    assert len(calls) == 1
+
+
+def test_playbook_builds_timeline_once(monkeypatch):
+    calls = _fake_compilers(monkeypatch)
+    runs = []
+
+    class Anim(ice.Playbook):
+        def timeline(self):
+            runs.append(len(runs))
+            tex = ice.MathTex("z")
+            self.play(ice.Animated([tex.move(0, 0), tex.move(10, 0)], 1.0))
+
+    Anim()
+    assert runs == [0]
+    assert [kind for kind, _ in calls] == ["single"]
+
+
+def test_playbook_batch_dry_run_raises(monkeypatch):
+    _fake_compilers(monkeypatch)
+    runs = []
+
+    class Broken(ice.Playbook):
+        def timeline(self):
+            runs.append(len(runs))
+            ice.MathTex("w")
+            raise RuntimeError("broken timeline")
+
+    with pytest.raises(RuntimeError, match="broken timeline"):
+        Broken(batch_tex=True)
+    assert runs == [0]
+
+
+def test_tex_waits_for_compilation_in_flight(monkeypatch):
+    calls = _fake_compilers(monkeypatch)
+    svg_name = latex._tex_svg_name("y", latex._DEFAULT_PREAMBLE)
+    started = threading.Event()
+
+    def compile_in_background():
+        started.wait()
+        cache.get_cache().put(svg_name, _FAKE_SVG.encode("utf-8"))
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(compile_in_background)
+        track_in_flight(latex._IN_FLIGHT, [svg_name], future)
+        started.set()
+
+        tex = ice.Tex(tex="y")
+
+    assert calls == []
+    assert tex.bounds.width == 20
+    assert svg_name not in latex._IN_FLIGHT
+
+
+def test_tex_async_runs_subprocesses(monkeypatch):
+    _fake_compilers(monkeypatch)
+
+    def tex_svg_steps(content, preamble, svg_name, compiler):
+        # Write the SVG from a subprocess, standing in for latex and dvisvgm.
+        svg_file = cache.get_cache().scratch_path("test") + ".svg"
+        returncode, _ = yield [
+            sys.executable,
+            "-c",
+            f"open({svg_file!r}, 'w').write({_FAKE_SVG!r})",
+        ]
+        assert returncode == 0
+        return latex._put_svg(svg_name, svg_file)
+
+    monkeypatch.setattr(latex, "_tex_svg_steps", tex_svg_steps)
+    monkeypatch.setattr(latex, "_preamble_format", lambda *args: iter(()))
+
+    svg_files = asyncio.run(ice.prefetch_tex_async(["a", "b", "a"]))
+
+    for svg_file in svg_files:
+        with open(svg_file) as f:
+            assert f.read() == _FAKE_SVG
+    assert cache.get_cache().contains(
+        latex._tex_svg_name("b", latex._DEFAULT_PREAMBLE)
+    )
+    assert ice.Tex(tex="b").bounds.width == 20
+
+
+def test_tex_dry_run_only_collects_in_its_thread(monkeypatch):
+    calls = _fake_compilers(monkeypatch)
+    preamble = latex._DEFAULT_PREAMBLE
+    svgs = []
+
+    def build():
+        latex.tex_content_to_svg("p", preamble)
+        # Built by another thread while this one is dry-running.
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(latex.tex_content_to_svg, "q", preamble)
+            svgs.append(future.result())
+
+    latex.build_with_tex_batch(build)
+
+    assert svgs == [_FAKE_SVG, _FAKE_SVG]
+    assert calls == [("single", "q"), ("single", "p")]
+
+
+_PAGE_RE = re.compile(
+    r"\\begin\{standalone\}\n(.*?)\n\\end\{standalone\}", re.DOTALL
+)
+_DOCUMENT_RE = re.compile(
+    r"\\begin\{document\}\n\n(.*?)\n\n\\end\{document\}", re.DOTALL
+)
+
+
+def _page_svg(content):
+    """The SVG the fake toolchain compiles an expression to."""
+    return _FAKE_SVG.replace("<rect", f"<desc>{content}</desc><rect")
+
+
+class _FakeTex(object):
+    """Stands in for the latex and dvisvgm programs, recording the commands they are
+    run with. The DVI files list the expression on each page."""
+
+    def __init__(
+        self,
+        dump_ok=True,
+        format_ok=True,
+        body_error=None,
+        error_content=None,
+        extra_pages=0,
+    ):
+        self.dump_ok = dump_ok
+        self.format_ok = format_ok
+        self.body_error = body_error
+        # Documents containing this fail to compile.
+        self.error_content = error_content
+        self.extra_pages = extra_pages
+        self.commands = []
+
+    def run(self, steps):
+        try:
+            command = next(steps)
+            while True:
+                self.commands.append(command)
+                command = steps.send((self._run(command), b""))
+        except StopIteration as e:
+            return e.value
+
+    def _run(self, command):
+        if command[0] == "dvisvgm":
+            with open(command[1]) as dvi_file:
+                pages = dvi_file.read().split("\n")
+            svg_file = command[command.index("-o") + 1]
+            if "--page=1-" not in command:
+                pages = pages[:1]
+            for page_number, content in enumerate(pages, start=1):
+                with open(svg_file.replace("%p", str(page_number)), "w") as f:
+                    f.write(_page_svg(content))
+            return 0
+
+        options = dict(
+            arg.split("=", 1) for arg in command if arg.startswith("-") and "=" in arg
+        )
+        output_directory = options["-output-directory"]
+
+        if "-ini" in command:
+            if not self.dump_ok:
+                return 1
+            job_file = os.path.join(output_directory, options["-jobname"])
+            with open(job_file + ".fmt", "w"):
+                return 0
+
+        root = os.path.splitext(command[-1])[0]
+        with open(command[-1]) as tex_file:
+            tex = tex_file.read()
+        error = self.body_error
+        if self.error_content is not None and self.error_content in tex:
+            error = "Undefined control sequence."
+        if "-fmt" in options and not self.format_ok:
+            # TeX gives up before opening the log when it can't load the format.
+            return 1
+        if error is not None:
+            with open(root + ".log", "w") as log_file:
+                log_file.write(f"This is TeX\n! {error}\nl.3 \\foo\n\n")
+            return 1
+
+        pages = _PAGE_RE.findall(tex) or _DOCUMENT_RE.findall(tex)
+        pages += ["extra"] * self.extra_pages
+        with open(root + ".dvi", "w") as dvi_file:
+            dvi_file.write("\n".join(pages))
+        return 0
+
+
+def _compile(fake_tex, tmp_path, name="doc"):
+    root = str(tmp_path / name)
+    return fake_tex.run(
+        latex._compile_tex("\\documentclass{article}", "\\begin{document}", root, "latex")
+    )
+
+
+def _with_formats(monkeypatch):
+    monkeypatch.setattr(latex, "_tex_program", lambda compiler: (["latex"], ".dvi"))
+    monkeypatch.setattr(latex, "_BROKEN_FORMATS", set())
+    monkeypatch.setattr(latex, "_ENGINE_VERSIONS", {"latex": "pdfTeX 3.141592653"})
+
+
+def test_format_depends_on_engine_version(monkeypatch, tmp_path):
+    _with_formats(monkeypatch)
+    fake_tex = _FakeTex()
+    _compile(fake_tex, tmp_path)
+
+    # A new version of TeX can't load the formats of the old one, so it dumps its own.
+    latex._ENGINE_VERSIONS["latex"] = "pdfTeX 3.141592653-2.6-1.40.26"
+    fake_tex.commands.clear()
+    _compile(fake_tex, tmp_path)
+
+    assert "-ini" in fake_tex.commands[0]
+    assert len(_formats()) == 2
+
+
+def _formats():
+    return glob.glob(os.path.join(cache.get_cache().subdirectory("formats"), "*"))
+
+
+def _uses_format(command):
+    return any(arg.startswith("-fmt=") for arg in command)
+
+
+def test_compile_tex_dumps_format_once(monkeypatch, tmp_path):
+    _with_formats(monkeypatch)
+    fake_tex = _FakeTex()
+
+    assert _compile(fake_tex, tmp_path) == ".dvi"
+    assert ["-ini" in command for command in fake_tex.commands] == [True, False]
+    assert _uses_format(fake_tex.commands[1])
+    assert _formats()
+
+    fake_tex.commands.clear()
+    _compile(fake_tex, tmp_path)
+    assert len(fake_tex.commands) == 1 and _uses_format(fake_tex.commands[0])
+
+
+def test_compile_tex_without_format_when_dump_fails(monkeypatch, tmp_path):
+    _with_formats(monkeypatch)
+    fake_tex = _FakeTex(dump_ok=False)
+
+    assert _compile(fake_tex, tmp_path) == ".dvi"
+    assert not _uses_format(fake_tex.commands[-1])
+    assert len(latex._BROKEN_FORMATS) == 1
+    assert not _formats()
+
+    # The broken format isn't dumped again in this process.
+    fake_tex.commands.clear()
+    _compile(fake_tex, tmp_path)
+    assert len(fake_tex.commands) == 1 and not _uses_format(fake_tex.commands[0])
+
+
+def test_compile_tex_falls_back_when_format_fails(monkeypatch, tmp_path):
+    _with_formats(monkeypatch)
+    fake_tex = _FakeTex()
+    _compile(fake_tex, tmp_path)
+
+    fake_tex.format_ok = False
+    fake_tex.commands.clear()
+    assert _compile(fake_tex, tmp_path) == ".dvi"
+
+    assert [_uses_format(command) for command in fake_tex.commands] == [True, False]
+    assert len(latex._BROKEN_FORMATS) == 1
+    # The format may work for other processes sharing the cache.
+    assert _formats()
+
+    fake_tex.commands.clear()
+    _compile(fake_tex, tmp_path)
+    assert len(fake_tex.commands) == 1 and not _uses_format(fake_tex.commands[0])
+
+
+def test_compile_tex_body_error_is_not_retried(monkeypatch, tmp_path):
+    _with_formats(monkeypatch)
+    fake_tex = _FakeTex()
+    _compile(fake_tex, tmp_path)
+
+    fake_tex.body_error = "Undefined control sequence."
+    fake_tex.commands.clear()
+    with pytest.raises(latex.LatexError, match="Undefined control sequence"):
+        _compile(fake_tex, tmp_path)
+
+    assert len(fake_tex.commands) == 1
+    assert not latex._BROKEN_FORMATS
+    assert _formats()
+
+
+def test_tex_svg_steps_commands(monkeypatch, tmp_path):
+    _with_formats(monkeypatch)
+    fake_tex = _FakeTex()
+    preamble = latex._DEFAULT_PREAMBLE
+    svg_name = latex._tex_svg_name("x", preamble)
+
+    svg = fake_tex.run(latex._tex_svg_steps("x", preamble, svg_name, "latex"))
+
+    assert svg == _page_svg("x").encode("utf-8")
+    dump, tex, dvisvgm = fake_tex.commands
+    assert dump[:2] == ["latex", "-ini"]
+    assert tex[0] == "latex" and _uses_format(tex)
+    root = os.path.splitext(tex[-1])[0]
+    assert dvisvgm[:2] == ["dvisvgm", root + ".dvi"]
+    assert dvisvgm[-2:] == ["-o", root + ".svg"]
+
+    assert cache.get_cache().get(svg_name) == svg
+    # Only the cached SVG is left.
+    assert not glob.glob(root + ".*")
+
+
+def _batch(monkeypatch, fake_tex, contents):
+    _with_formats(monkeypatch)
+    monkeypatch.setattr(latex, "run_commands", fake_tex.run)
+    return ice.compile_tex_batch_svgs(contents)
+
+
+def _cached_svg(content):
+    svg = cache.get_cache().get(latex._tex_svg_name(content, latex._DEFAULT_PREAMBLE))
+    return svg and svg.decode("utf-8")
+
+
+def test_create_tex_svgs_splits_pages(monkeypatch):
+    fake_tex = _FakeTex()
+    contents = ["a", "b", "c"]
+
+    svgs = _batch(monkeypatch, fake_tex, contents)
+
+    # One dump of the preamble, and one run of latex and dvisvgm for all the pages.
+    dump, tex, dvisvgm = fake_tex.commands
+    assert "-ini" in dump
+    root = os.path.splitext(tex[-1])[0]
+    assert dvisvgm[:3] == ["dvisvgm", root + ".dvi", "--page=1-"]
+    assert dvisvgm[-1] == root + "-%p.svg"
+
+    # Each page is cached under the name of its expression.
+    assert svgs == [_page_svg(content) for content in contents]
+    assert [_cached_svg(content) for content in contents] == svgs
+    assert not glob.glob(root + "*")
+
+
+def test_create_tex_svgs_falls_back_on_page_mismatch(monkeypatch):
+    fake_tex = _FakeTex(extra_pages=1)
+    contents = ["a", "b", "c"]
+
+    svgs = _batch(monkeypatch, fake_tex, contents)
+
+    batch_root = os.path.splitext(fake_tex.commands[1][-1])[0]
+    dvisvgm = [command for command in fake_tex.commands if command[0] == "dvisvgm"]
+    assert len(dvisvgm) == 1 + len(contents)
+    assert all("--page=1-" not in command for command in dvisvgm[1:])
+
+    assert svgs == [_page_svg(content) for content in contents]
+    assert [_cached_svg(content) for content in contents] == svgs
+    assert not glob.glob(batch_root + "*")
+
+
+def test_create_tex_svgs_falls_back_on_latex_error(monkeypatch):
+    fake_tex = _FakeTex(error_content="\\undefined")
+
+    with pytest.raises(latex.LatexError, match="Undefined control sequence"):
+        _batch(monkeypatch, fake_tex, ["a", "b", "\\undefined"])
+
+    # The batch failed, and then each expression was compiled on its own, up to the
+    # one with the error.
+    dvisvgm = [command for command in fake_tex.commands if command[0] == "dvisvgm"]
+    assert len(dvisvgm) == 2
+    assert _cached_svg("a") == _page_svg("a")
+    assert _cached_svg("b") == _page_svg("b")
+    assert _cached_svg("\\undefined") is None
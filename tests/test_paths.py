@@ -1,3 +1,7 @@
+import numpy as np
+import pytest
+import skia
+
 import iceberg as ice
 from .scene_tester import check_render
 
@@ -62,3 +66,82 @@ def test_partial():
     partial_line = ice.PartialPath(line, 0, 0.8)
     scene = blank.add_centered(partial_line)
     check_render(scene, "partial_path.png")
+
+
+def test_path_style_paints_are_shared():
+    style = ice.PathStyle(ice.Colors.RED, 3, dashed=True)
+    same = ice.PathStyle(ice.Colors.RED, 3, dashed=True)
+    other = ice.PathStyle(ice.Colors.BLUE, 3, dashed=True)
+
+    assert style.skia_paint is same.skia_paint
+    assert style.skia_paint is not other.skia_paint
+    assert ice.PathStyle.interpolate(style, same, 0.5) is style
+    assert ice.PathStyle.interpolate(style, other, 0.5).color != style.color
+
+
+def test_sample():
+    line = ice.Line((0, 0), (100, 0), ice.PathStyle())
+
+    points, tangents = line.sample([0, 0.25, 1])
+    assert points.tolist() == [[0, 0], [25, 0], [100, 0]]
+    assert tangents.tolist() == [[1, 0], [1, 0], [1, 0]]
+
+    partial = ice.PartialPath(line, 0.5, 1)
+    point, tangent = partial.point_and_tangent_at(0.5)
+    assert point.tolist() == [75, 0]
+    assert tangent.tolist() == [1, 0]
+
+    # A straight line doesn't need to be subdivided finely.
+    assert len(partial.points) < 10
+
+    # The points are Skia points, also available as an array.
+    assert isinstance(partial.points[0], skia.Point)
+    assert isinstance(partial.tangents[0], skia.Point)
+    assert partial.points_array.shape == (len(partial.points), 2)
+    assert partial.points[-1].fX == partial.points_array[-1, 0] == 100
+
+
+def test_adaptive_subdivision_follows_curves():
+    curve = ice.CurvedCubicLine(
+        points=[(10, 10), (256, 10), (256, 256), (256, 500), (500, 500)],
+        path_style=ice.PathStyle(),
+    )
+    partial = ice.PartialPath(curve, subdivide_increment=0.001)
+    drawn = ice.Path.from_skia(partial._partial_path, ice.PathStyle())
+
+    # The drawn path follows the curve closely, with far fewer than 1000 segments.
+    ts = np.linspace(0, 1, 50)
+    errors = np.linalg.norm(drawn.sample(ts)[0] - curve.sample(ts)[0], axis=1)
+    assert errors.max() < 1
+    assert len(partial.points) < 100
+
+
+def test_arrow_path_point_and_tangent_at():
+    line = ice.Line((0, 0), (100, 0), ice.PathStyle())
+    arrow = ice.ArrowPath(line, arrow_head_end=False, partial_end=0.5)
+
+    point, tangent = arrow.point_and_tangent_at(1)
+    assert point.tolist() == [50, 0]
+    assert tangent.tolist() == [1, 0]
+
+
+def test_partial_path_extracts_segment():
+    curve = ice.CurvedCubicLine(
+        points=[(10, 10), (256, 10), (256, 256), (256, 500), (500, 500)],
+        path_style=ice.PathStyle(),
+    )
+
+    first = ice.PartialPath(curve, 0, 0.25)
+    second = ice.PartialPath(curve, 0, 0.5)
+
+    # The child path is only measured once, and nothing is subdivided to draw.
+    assert first._child_path.path_measure is second._child_path.path_measure
+    assert first._points is None
+
+    drawn = ice.Path.from_skia(second._partial_path, ice.PathStyle())
+    assert drawn.total_length == pytest.approx(curve.total_length / 2, rel=1e-3)
+
+    linear = ice.PartialPath(
+        curve, 0, 0.5, interpolation=ice.PartialPath.Interpolation.LINEAR
+    )
+    assert linear._partial_path.countPoints() == len(linear.points)
@@ -0,0 +1,29 @@
+import json
+import urllib.request
+
+import iceberg as ice
+
+
+def test_preview_serves_frames(moving_square):
+    server = ice.preview(moving_square, fps=10, open_browser=False, prefetch=2)
+
+    try:
+        with urllib.request.urlopen(server.url + "info") as response:
+            info = json.load(response)
+        assert info["frames"] == 10
+
+        with urllib.request.urlopen(server.url + "frame?t=0.5") as response:
+            assert response.headers["Content-Type"] == "image/jpeg"
+            jpeg = response.read()
+        assert jpeg[:2] == b"\xff\xd8"
+
+        # Served from the cache the second time.
+        assert server.frame(5) == jpeg
+
+        with urllib.request.urlopen(server.url + "stream?index=0") as response:
+            assert response.headers["Content-Type"].startswith(
+                "multipart/x-mixed-replace"
+            )
+            assert response.readline().strip() == b"--icebergframe"
+    finally:
+        server.stop()
@@ -0,0 +1,108 @@
+import os
+import sys
+
+import av
+
+import iceberg as ice
+
+
+def _frame_count(filename: str) -> int:
+    with av.open(filename) as container:
+        return sum(1 for _ in container.decode(video=0))
+
+
+def test_render_frame_range(tmp_path, moving_square):
+    filename = str(tmp_path / "partial.mp4")
+    moving_square.render(filename, fps=30, progress_bar=False, frame_range=(5, 15))
+
+    assert _frame_count(filename) == 10
+
+
+def test_render_chunked_resumes(tmp_path, moving_square):
+    filename = str(tmp_path / "chunked.mp4")
+    moving_square.render(filename, fps=30, progress_bar=False, chunk_duration=0.25)
+
+    chunk_directory = filename + ".chunks"
+    segments = sorted(f for f in os.listdir(chunk_directory) if f.endswith(".mp4"))
+    assert len(segments) == 4
+    assert _frame_count(filename) == 30
+
+    # Only the missing segment is rendered again.
+    os.remove(os.path.join(chunk_directory, segments[1]))
+    modified_times = {
+        name: os.path.getmtime(os.path.join(chunk_directory, name))
+        for name in segments
+        if name != segments[1]
+    }
+    os.remove(filename)
+    moving_square.render(filename, fps=30, progress_bar=False, chunk_duration=0.25)
+
+    assert _frame_count(filename) == 30
+    for name, modified_time in modified_times.items():
+        assert os.path.getmtime(os.path.join(chunk_directory, name)) == modified_time
+
+
+def test_render_with_encoder_settings(tmp_path, moving_square):
+    filename = str(tmp_path / "preview.mp4")
+    moving_square.render(
+        filename, fps=30, progress_bar=False, encoder=ice.VideoEncoder.preview()
+    )
+
+    assert _frame_count(filename) == 30
+
+
+def test_render_to_pipe(tmp_path, moving_square):
+    filename = str(tmp_path / "frames.raw")
+    command = [
+        sys.executable,
+        "-c",
+        "import shutil, sys; shutil.copyfileobj(sys.stdin.buffer, open(sys.argv[1], 'wb'))",
+        "{filename}",
+    ]
+    moving_square.render(
+        filename,
+        fps=30,
+        progress_bar=False,
+        encoder=ice.PipeEncoder(command, pix_fmt="rgb24"),
+    )
+
+    assert os.path.getsize(filename) == 30 * 64 * 48 * 3
+
+
+def test_render_profiler(tmp_path, moving_square):
+    profiler = ice.RenderProfiler()
+    filename = str(tmp_path / "profiled.mp4")
+    moving_square.render(filename, fps=10, progress_bar=False, profiler=profiler)
+
+    assert profiler.num_frames == 10
+    assert profiler.stages == ["make_frame", "draw", "readback", "convert", "encode"]
+    assert all(stats["total"] > 0 for stats in profiler.summary().values())
+    assert "make_frame" in profiler.report()
+
+    profiler.to_csv(tmp_path / "profile.csv")
+    with open(tmp_path / "profile.csv") as f:
+        assert len(f.readlines()) == 11
+
+
+def test_render_frame(moving_square):
+    bounds = moving_square.render_bounds()
+    assert (bounds.width, bounds.height) == (64, 48)
+
+    pixels = moving_square.render_frame(0.5)
+    assert pixels.shape == (48, 64, 4)
+    # The square has moved right by 20 pixels.
+    assert tuple(pixels[15, 25, :3]) == (255, 0, 0)
+    assert tuple(pixels[15, 5, :3]) == (255, 255, 255)
+
+
+def test_render_profiler_is_restored(tmp_path, moving_square):
+    renderer = ice.Renderer()
+    moving_square.render(
+        str(tmp_path / "profiled.mp4"),
+        renderer=renderer,
+        fps=10,
+        progress_bar=False,
+        profiler=ice.RenderProfiler(),
+    )
+
+    assert renderer.profiler is None
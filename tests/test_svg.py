@@ -0,0 +1,82 @@
+import concurrent.futures
+
+import pytest
+
+import iceberg as ice
+
+_SVG = """<svg xmlns="http://www.w3.org/2000/svg" width="40" height="30">
+<rect x="5" y="5" width="30" height="20" fill="red"/>
+</svg>"""
+
+
+def test_identical_svgs_are_parsed_once(tmp_path):
+    first = ice.SVG(raw_svg=_SVG)
+    second = ice.SVG(raw_svg=_SVG, color=ice.Colors.BLUE)
+
+    assert first._skia_picture is second._skia_picture
+    assert (first.bounds.width, first.bounds.height) == (40, 30)
+
+    svg_filename = tmp_path / "rect.svg"
+    svg_filename.write_text(_SVG)
+    from_file = ice.SVG(svg_filename=str(svg_filename))
+    assert from_file._skia_picture is first._skia_picture
+
+
+def test_svgs_parsed_concurrently_share_pictures():
+    svgs = [_SVG.replace('width="30"', f'width="{i}"') for i in range(1, 21)]
+
+    def parse(i):
+        return ice.SVG(raw_svg=svgs[i % 20])._skia_picture
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+        pictures = list(executor.map(parse, range(400)))
+
+    assert all(picture is pictures[i % 20] for i, picture in enumerate(pictures))
+
+
+def test_svg_renders():
+    renderer = ice.Renderer()
+    renderer.render(ice.SVG(raw_svg=_SVG))
+    image = renderer.get_rendered_image()
+
+    assert image.shape == (30, 40, 4)
+    assert image[15, 20].tolist() == [255, 0, 0, 255]
+
+
+def test_svg_path_commands():
+    # Relative and absolute lines, curves, smooth curves, quadratics and arcs.
+    path = ice.SVGPath(
+        "M10 10h20v20H10z m40 0 c10-20 30-20 40 0s30 20 40 0"
+        "q20-20 40 0t40 0 a20 20 0 1 1 -40 0 L10,60.5e0"
+    )
+
+    bounds = path.bounds
+    assert bounds.left == 10
+    assert bounds.top < 0
+    assert bounds.right > 200
+    assert abs(bounds.bottom - 60.5) < 1e-4
+
+    # Identical path data is parsed once.
+    assert ice.SVGPath(path.svg_path_string)._skia_path is path._skia_path
+
+
+def test_svg_paths_parsed_concurrently(monkeypatch):
+    from iceberg.primitives import svg
+
+    # A small cache, so that threads evict each other's paths.
+    monkeypatch.setattr(svg, "_SVG_PATH_CACHE", svg.collections.OrderedDict())
+    monkeypatch.setattr(svg, "_SVG_PATH_CACHE_SIZE", 4)
+
+    def parse(i):
+        return svg._svg_path_to_skia(f"M0 0 L{i % 10} 10").getBounds().width()
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+        widths = list(executor.map(parse, range(2000)))
+
+    assert widths == [i % 10 for i in range(2000)]
+    assert len(svg._SVG_PATH_CACHE) == 4
+
+
+def test_svg_path_invalid():
+    with pytest.raises(ValueError):
+        ice.SVGPath("M10 10 L20")
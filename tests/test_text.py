@@ -0,0 +1,100 @@
+import collections
+import concurrent.futures
+
+import pytest
+
+import iceberg as ice
+
+
+def _font_style():
+    family = ice.FontStyle.available_fonts()[0]
+    return ice.FontStyle(family=family, size=20)
+
+
+def test_wrapping_matches_measured_lines():
+    font_style = _font_style()
+    font = font_style.get_skia_font()
+    paint = font_style.get_skia_paint()
+    text = "the quick brown fox jumps over the lazy dog\nand keeps running " * 5
+
+    wrapped = ice.Text(text, font_style, width=150)
+
+    assert len(wrapped._lines) > 5
+    for line in wrapped._lines:
+        words = line.rstrip(" ")
+        # Every line fits, except for single words that are too long on their own.
+        assert font.measureText(words, paint=paint) <= 150 or " " not in words
+
+    assert wrapped.bounds.width == pytest.approx(
+        max(font.measureText(line, paint=paint) for line in wrapped._lines)
+    )
+
+
+def test_alignment_offsets():
+    font_style = _font_style()
+    text = "a\nmuch longer line"
+
+    left = ice.Text(text, font_style)
+    right = ice.Text(text, font_style, align=ice.Text.Align.RIGHT)
+    center = ice.Text(text, font_style, align=ice.Text.Align.CENTER)
+
+    assert left._line_offsets == [0, 0]
+    assert right._line_offsets[1] == 0
+    assert right._line_offsets[0] > 0
+    assert center._line_offsets[0] == right._line_offsets[0] / 2
+
+
+def test_identical_text_shares_blobs():
+    font_style = _font_style()
+    red = ice.FontStyle(family=font_style.family, size=20, color=ice.Colors.RED)
+
+    a = ice.Text("shared\nblobs", font_style)
+    b = ice.Text("shared\nblobs", red)
+    simple = ice.SimpleText(text="shared", font_style=font_style)
+
+    assert a._blobs[0] is b._blobs[0]
+    assert a._blobs[1] is b._blobs[1]
+    assert ice.SimpleText(text="", font_style=font_style)._blob is None
+    assert simple._blob is a._blobs[0]
+
+
+def test_text_caches_are_thread_safe(monkeypatch):
+    from iceberg.primitives import text
+
+    monkeypatch.setattr(text, "_TEXT_WIDTH_CACHE", collections.OrderedDict())
+    monkeypatch.setattr(text, "_TEXT_WIDTH_CACHE_SIZE", 16)
+    font_style = _font_style()
+
+    def build(i):
+        return ice.Text(f"word{i % 64} other{i % 32}\nline {i}", font_style, width=80)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+        texts = list(executor.map(build, range(2000)))
+
+    assert all(t.bounds.width > 0 for t in texts)
+    assert len(text._TEXT_WIDTH_CACHE) <= 16
+
+
+def test_fonts_are_cached():
+    font_style = _font_style()
+    same = ice.FontStyle(family=font_style.family, size=20, color=ice.Colors.BLUE)
+    bigger = ice.FontStyle(family=font_style.family, size=40)
+
+    ice.FontStyle.warm_up(font_style)
+
+    assert font_style.get_skia_font() is same.get_skia_font()
+    assert font_style.get_skia_typeface() is bigger.get_skia_typeface()
+    assert bigger.get_skia_font().getSize() == 40
+
+
+def test_font_caches_are_thread_safe():
+    family = _font_style().family
+
+    def get_font(i):
+        return ice.FontStyle(family=family, size=10 + i % 50).get_skia_font()
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+        fonts = list(executor.map(get_font, range(1000)))
+
+    # Every thread got the same shared font for the same size.
+    assert all(font is fonts[i % 50] for i, font in enumerate(fonts))
@@ -0,0 +1,27 @@
+import iceberg as ice
+
+
+def _constant_scene(value: float, duration: float = 1.0) -> ice.Scene:
+    return ice.Scene(duration, lambda t: (value, t))
+
+
+def test_timeline_lookup():
+    timeline = _constant_scene(0) + _constant_scene(1, 2.0) + _constant_scene(2)
+
+    assert isinstance(timeline, ice.Timeline)
+    assert timeline.duration == 4.0
+    assert [start for start, _ in timeline.segments] == [0, 1.0, 3.0]
+    assert timeline.make_frame(0.5) == (0, 0.5)
+    assert timeline.make_frame(1.0) == (1, 0.0)
+    assert timeline.make_frame(3.5) == (2, 0.5)
+
+
+def test_long_timeline_does_not_nest():
+    timeline = _constant_scene(0)
+    for i in range(1, 2000):
+        timeline = timeline + _constant_scene(i)
+
+    assert len(timeline.segments) == 2000
+    assert timeline.make_frame(1234.25) == (1234, 0.25)
+    assert timeline.reverse().make_frame(0.25) == (1999, 0.75)
+    assert timeline.freeze(2.0).make_frame(1.0) == (1999, 1.0)
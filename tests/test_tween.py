@@ -0,0 +1,69 @@
+import numpy as np
+
+import iceberg as ice
+
+
+def test_tween_numbers():
+    assert ice.tween(0, 10, 0.5, ease_type=ice.EaseType.LINEAR) == 5
+    assert ice.tween(0, 10, 1.0) == 10
+
+
+def test_tween_plan_matches_tween():
+    start = ice.Rectangle(ice.Bounds.from_size(10, 10), ice.Colors.BLACK).move(0, 0)
+    end = ice.Rectangle(ice.Bounds.from_size(20, 40), ice.Colors.RED).move(10, 5)
+    plan = ice.TweenPlan(start, end)
+
+    for progress in [0, 0.25, 0.5, 1]:
+        a = plan(progress)
+        b = ice.tween(start, end, progress, ease_type=ice.EaseType.LINEAR)
+        assert a.bounds.corners == b.bounds.corners
+
+    assert plan(0.5).bounds.right == 20.5
+
+
+def test_tween_plan_shares_identical_subtrees():
+    shared = ice.Rectangle(ice.Bounds.from_size(10, 10), ice.Colors.BLACK)
+    moving = ice.Rectangle(ice.Bounds.from_size(10, 10), ice.Colors.BLUE)
+    plan = ice.TweenPlan(
+        ice.Compose([shared, moving.move(0, 0)]),
+        ice.Compose([shared, moving.move(100, 0)]),
+    )
+
+    frame = plan(0.5)
+    assert frame.components[0] is shared
+    assert frame.components[1].bounds.left == 49.5
+
+
+def test_tween_plan_numeric_leaves():
+    start = [np.array([0.0, 2.0]), ice.PathStyle(ice.Colors.BLACK, 1), 3]
+    end = [np.array([10.0, 4.0]), ice.PathStyle(ice.Colors.WHITE, 5), 3]
+    array, style, constant = ice.TweenPlan(start, end)(0.5)
+
+    assert np.allclose(array, [5.0, 3.0])
+    assert style.thickness == 3
+    assert style.color == ice.Color(0.5, 0.5, 0.5)
+    assert constant == 3
+
+
+def test_tween_plan_reuses_equal_subtrees():
+    setup_calls = []
+
+    class Label(ice.DrawableWithChild):
+        text: str
+        color: ice.Color = ice.Colors.BLACK
+
+        def setup(self):
+            setup_calls.append(self.text)
+            self.set_child(ice.Rectangle(ice.Bounds.from_size(10, 10), self.color))
+
+    start = ice.Compose([Label(text="x"), Label(text="y").move(0, 0)])
+    end = ice.Compose([Label(text="x"), Label(text="y").move(50, 0)])
+    plan = ice.TweenPlan(start, end)
+    setup_calls.clear()
+
+    for progress in [0.1, 0.5, 0.9]:
+        frame = plan(progress)
+        assert frame.components[0] is start.components[0]
+        assert frame.components[1].child is start.components[1].child
+
+    assert setup_calls == []
@@ -0,0 +1,129 @@
+import asyncio
+import concurrent.futures
+import os
+import sys
+import threading
+
+import pytest
+
+import iceberg as ice
+from iceberg import cache
+from iceberg.primitives import typst
+from iceberg.utils import track_in_flight
+
+_FAKE_SVG = (
+    '<svg xmlns="http://www.w3.org/2000/svg" width="20" height="10" '
+    'viewBox="0 0 20 10"><rect width="20" height="10"/></svg>'
+)
+
+
+def test_typst_svg_steps_commands(monkeypatch):
+    monkeypatch.setattr(typst.shutil, "which", lambda program: "/usr/bin/" + program)
+    svg_name = typst._typst_svg_name("$x$")
+    steps = typst._typst_svg_steps("$x$", svg_name)
+
+    command = next(steps)
+    assert command[:2] == ["typst", "compile"]
+    source, svg_file = command[2:]
+    with open(source) as f:
+        assert f.read() == "$x$"
+
+    with open(svg_file, "w") as f:
+        f.write(_FAKE_SVG)
+    with pytest.raises(StopIteration) as stop:
+        steps.send((0, b""))
+    svg = stop.value.value
+
+    assert b"<rect" in svg
+    assert cache.get_cache().get(svg_name) == svg
+    assert not os.path.exists(source)
+
+
+def _fake_typst(monkeypatch, tmp_path):
+    """Put a fake `typst` command on the PATH, which logs the documents it compiles.
+
+    Returns:
+        The log file.
+    """
+
+    bin_directory = tmp_path / "bin"
+    bin_directory.mkdir()
+    log_file = tmp_path / "typst.log"
+    script = bin_directory / "typst"
+    script.write_text(
+        f"#!{sys.executable}\n"
+        "import sys\n"
+        "_, _, source, svg_file = sys.argv\n"
+        f"with open({str(log_file)!r}, 'a') as log:\n"
+        "    log.write(open(source).read() + '\\n')\n"
+        f"open(svg_file, 'w').write({_FAKE_SVG!r})\n"
+    )
+    script.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_directory}{os.pathsep}{os.environ['PATH']}")
+    log_file.touch()
+    return log_file
+
+
+def _compiled(log_file):
+    return log_file.read_text().splitlines()
+
+
+def test_prefetch_typst(monkeypatch, tmp_path):
+    log_file = _fake_typst(monkeypatch, tmp_path)
+    # A pool of its own, whose workers see the fake command and the test's cache.
+    pool = concurrent.futures.ProcessPoolExecutor(max_workers=2)
+    monkeypatch.setattr(typst, "process_pool", lambda: pool)
+
+    with pool:
+        futures = typst.prefetch_typst(["a", "b", "a"])
+        assert len(futures) == 2
+        assert typst.prefetch_typst(["a"]) == []
+
+        for future in futures:
+            with open(future.result()) as f:
+                assert "<rect" in f.read()
+
+    assert sorted(_compiled(log_file)) == ["a", "b"]
+    assert ice.Typst(typst="b").bounds.width == 20
+    assert len(_compiled(log_file)) == 2
+
+
+def test_typst_waits_for_compilation_in_flight(monkeypatch):
+    calls = []
+    monkeypatch.setattr(typst, "_create_typst_svg", lambda *args: calls.append(args))
+    svg_name = typst._typst_svg_name("y")
+    started = threading.Event()
+
+    def compile_in_background():
+        started.wait()
+        cache.get_cache().put(svg_name, _FAKE_SVG.encode("utf-8"))
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(compile_in_background)
+        track_in_flight(typst._IN_FLIGHT, [svg_name], future)
+        started.set()
+
+        drawable = ice.Typst(typst="y")
+
+    assert calls == []
+    assert drawable.bounds.width == 20
+    assert svg_name not in typst._IN_FLIGHT
+
+
+def test_typst_async_runs_subprocesses(monkeypatch, tmp_path):
+    log_file = _fake_typst(monkeypatch, tmp_path)
+
+    svg = asyncio.run(typst.typst_content_to_svg_async("c"))
+    assert "<rect" in svg
+
+    svg_files = asyncio.run(ice.prefetch_typst_async(["a", "b", "a", "c"]))
+
+    assert len(svg_files) == 4
+    assert svg_files[0] == svg_files[2]
+    for svg_file in svg_files:
+        with open(svg_file) as f:
+            assert "<rect" in f.read()
+    # Each document is compiled once, also when it's requested twice at the same time.
+    assert sorted(_compiled(log_file)) == ["a", "b", "c"]
+    assert ice.Typst(typst="b").bounds.width == 20
+    assert not typst._ASYNC_IN_FLIGHT